@@ -0,0 +1,322 @@
+"""
+Бенчмарк расчёта наград
+
+Сравнивает на сессии 200 игроков × 50 вопросов (временная тестовая БД):
+- legacy: каждый check_* для каждого игрока по полному списку ответов
+  (как считал calculate_awards раньше) — O(игроки × ответы × награды)
+- calculate_awards: один сгруппированный проход (aggregate_answers)
+- calculate_awards повторно: завершённая сессия берётся из кеша
+- calculate_awards с --custom своими наградами (CustomAward): правила
+  компилируются в общий проход, время почти не растёт
+
+Проверяет, что победители встроенных наград совпадают.
+
+Запуск: python diag/bench_awards.py [--players 200] [--questions 50] [--custom 40]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import django
+
+# Добавляем путь к проекту
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Настраиваем Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_project.settings')
+django.setup()
+
+from django.conf import settings
+
+# Без Redis: кеш в памяти процесса (проверка идёт в одном процессе)
+settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+from quiz_app.models import Quiz, GameSession, Player, Answer, CustomAward
+from quiz_app.generation import QuestionSchema, save_questions_to_quiz
+from quiz_app import awards
+
+DIFFICULTIES = ['easy', 'medium', 'hard', 'very_hard', 'fun']
+
+
+def make_session(player_count, question_count, seed=42):
+    """Завершённая сессия со случайными ответами всех игроков на все вопросы"""
+    rng = random.Random(seed)
+
+    quiz = Quiz.objects.create(title='Бенчмарк наград', topic='Бенчмарк')
+    save_questions_to_quiz(quiz, [
+        QuestionSchema(
+            text=f'Вопрос для бенчмарка номер {i}?',
+            choices=['один', 'два', 'три', f'четыре {i}'],
+            correct_index=i % 4,
+            difficulty=DIFFICULTIES[i % len(DIFFICULTIES)]
+        )
+        for i in range(question_count)
+    ])
+    session = GameSession.objects.create(quiz=quiz, state='finished')
+
+    questions = list(quiz.questions.prefetch_related('choices'))
+    players = Player.objects.bulk_create([
+        Player(session=session, name=f'Игрок {i}', max_streak=rng.randint(0, 10))
+        for i in range(player_count)
+    ])
+
+    answers = []
+    for player in players:
+        skill = rng.random()
+        speed = rng.choice([0.1, 1.0])  # часть игроков отвечает очень быстро
+        for question in questions:
+            choices = list(question.choices.all())
+            is_correct = rng.random() < skill
+            choice = next(c for c in choices if c.is_correct == is_correct)
+            answers.append(Answer(
+                player=player,
+                question=question,
+                choice=choice,
+                is_correct=is_correct,
+                time_taken=round(0.5 + rng.random() * question.time_limit * speed, 2),
+                points_earned=0,
+            ))
+    Answer.objects.bulk_create(answers, batch_size=2000)
+
+    return session
+
+
+def make_custom_awards(count):
+    """count своих наград: разные метрики и пороги поверх нескольких фильтров"""
+    filters = [
+        {'correct': True},
+        {'correct': False},
+        {'correct': True, 'difficulties': ['hard', 'very_hard']},
+        {'correct': True, 'last_seconds': 5},
+        {'time_under': 2},
+    ]
+    metrics = [('count', 'max'), ('avg', 'min'), ('sum', 'max'), ('ratio', 'max')]
+    CustomAward.objects.bulk_create([
+        CustomAward(
+            key=f'custom-{i}',
+            name=f'Своя {i}',
+            emoji='🏅',
+            metric=metrics[i % len(metrics)][0],
+            winner=metrics[i % len(metrics)][1],
+            threshold=i % 3 or None,
+            **filters[i % len(filters)]
+        )
+        for i in range(count)
+    ])
+    # bulk_create не вызывает сигналы — сбрасываем кеш правил сами
+    awards.invalidate_custom_rules()
+
+
+# ============================================================================
+# СТАРЫЕ ПРОВЕРКИ НАГРАД (до aggregate_answers)
+# ============================================================================
+
+def check_fastest(player, all_answers, threshold=3.0):
+    """
+    Проверка награды 'Молния' ⚡
+
+    Критерий: средняя скорость ответа < 3 секунды (только правильные ответы)
+
+    Args:
+        player: экземпляр Player
+        all_answers: список всех Answer в сессии
+        threshold: порог в секундах
+
+    Returns:
+        tuple: (bool, float) - (заслужил награду?, среднее время)
+    """
+    correct_answers = [
+        a for a in all_answers
+        if a.player == player and a.is_correct
+    ]
+
+    if not correct_answers:
+        return False, 0
+
+    avg_time = sum(a.time_taken for a in correct_answers) / len(correct_answers)
+
+    return avg_time < threshold, avg_time
+
+
+def check_accurate(player, all_answers, threshold=0.85):
+    """
+    Проверка награды 'Снайпер' 🎯
+
+    Критерий: точность > 85% правильных ответов
+
+    Args:
+        player: экземпляр Player
+        all_answers: список всех Answer в сессии
+        threshold: минимальная точность (0.0 - 1.0)
+
+    Returns:
+        tuple: (bool, float) - (заслужил награду?, точность)
+    """
+    player_answers = [a for a in all_answers if a.player == player]
+
+    if not player_answers:
+        return False, 0
+
+    correct = sum(1 for a in player_answers if a.is_correct)
+    accuracy = correct / len(player_answers)
+
+    return accuracy >= threshold, accuracy
+
+
+def check_clutch(player, all_answers, min_clutch=2):
+    """
+    Проверка награды 'Clutch мастер' 🔥
+
+    Критерий: минимум 2 правильных ответа в последние 3 секунды таймера
+
+    Args:
+        player: экземпляр Player
+        all_answers: список всех Answer в сессии
+        min_clutch: минимальное количество clutch ответов
+
+    Returns:
+        tuple: (bool, int) - (заслужил награду?, количество clutch)
+    """
+    clutch_answers = [
+        a for a in all_answers
+        if a.player == player
+           and a.is_correct
+           and a.time_taken >= (a.question.time_limit - 3)
+    ]
+
+    clutch_count = len(clutch_answers)
+
+    return clutch_count >= min_clutch, clutch_count
+
+
+def check_strategist(player, all_answers, min_streak=5):
+    """
+    Проверка награды 'Стратег' 🧠
+
+    Критерий: максимальный streak ≥ 5 правильных ответов подряд
+
+    Args:
+        player: экземпляр Player
+        all_answers: список всех Answer в сессии
+        min_streak: минимальный streak
+
+    Returns:
+        tuple: (bool, int) - (заслужил награду?, максимальный streak)
+    """
+    max_streak = player.max_streak
+
+    return max_streak >= min_streak, max_streak
+
+
+def check_lucky(player, all_answers, min_lucky=2):
+    """
+    Проверка награды 'Везунчик' 🎲
+
+    Критерий: минимум 2 правильных ответа на hard/very_hard вопросы
+              при времени ответа > 15 секунд
+
+    Args:
+        player: экземпляр Player
+        all_answers: список всех Answer в сессии
+        min_lucky: минимальное количество "везучих" ответов
+
+    Returns:
+        tuple: (bool, int) - (заслужил награду?, количество)
+    """
+    lucky_answers = [
+        a for a in all_answers
+        if a.player == player
+           and a.is_correct
+           and a.question.difficulty in ['hard', 'very_hard']
+           and a.time_taken > 15
+    ]
+
+    lucky_count = len(lucky_answers)
+
+    return lucky_count >= min_lucky, lucky_count
+
+
+def legacy_awards(session):
+    """Победители по check_* (как раньше: каждый игрок × полный список ответов)"""
+    players = list(session.players.all())
+    all_answers = list(Answer.objects.filter(player__session=session).select_related('question', 'player'))
+
+    checks = [
+        ('fastest', check_fastest, min),
+        ('accurate', check_accurate, max),
+        ('clutch', check_clutch, max),
+        ('strategist', check_strategist, max),
+        ('lucky', check_lucky, max),
+    ]
+
+    results = {}
+    for key, check, best in checks:
+        candidates = []
+        for player in players:
+            eligible, value = check(player, all_answers)
+            if eligible:
+                candidates.append((player, value))
+        if candidates:
+            results[key] = best(candidates, key=lambda x: x[1])[0].id
+    return results
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--questions', type=int, default=50)
+    parser.add_argument('--custom', type=int, default=40, help='своих наград для замера')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        session = make_session(args.players, args.questions)
+        cache.delete(awards.awards_cache_key(session.id))
+
+        legacy, legacy_time = timed(lambda: legacy_awards(session))
+        current, cold_time = timed(lambda: awards.calculate_awards(session))
+        _, warm_time = timed(lambda: awards.calculate_awards(session))
+
+        make_custom_awards(args.custom)
+        cache.delete(awards.awards_cache_key(session.id))
+        with_custom, custom_time = timed(lambda: awards.calculate_awards(session))
+        rules = awards.active_rules()
+        filter_count = len(awards.compile_rules(tuple(rules)).filters)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print("=" * 60)
+    print(f"Игроков: {args.players}, вопросов: {args.questions}, ответов: {args.players * args.questions}")
+    print("=" * 60)
+    print(f"legacy (check_* × игроки):   {legacy_time * 1000:10.1f} мс")
+    print(f"calculate_awards:            {cold_time * 1000:10.1f} мс  (x{legacy_time / cold_time:.0f})")
+    print(f"calculate_awards (кеш):      {warm_time * 1000:10.3f} мс")
+    print(
+        f"{f'+ {args.custom} своих наград:':<29}{custom_time * 1000:10.1f} мс  "
+        f"(правил: {len(rules)}, фильтров: {filter_count}, выдано: {len(with_custom)})"
+    )
+
+    winners = {key: award['player_id'] for key, award in current.items()}
+    builtin = {key: with_custom[key]['player_id'] for key in winners if key in with_custom}
+    if winners != legacy or builtin != winners:
+        print(f"\n❌ Победители отличаются: {winners} != {legacy}")
+        sys.exit(1)
+    print(f"\n✅ Победители совпадают: {', '.join(sorted(winners)) or 'нет наград'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Бенчмарк рассылки событий комнате
+
+Сравнивает затраты CPU на одно broadcast-событие:
+- per-consumer: каждый consumer делает json.dumps(event) сам
+- frame: событие кодируется один раз (frames.frame), consumer'ы пересылают строку
+- frame + orjson: то же с быстрым энкодером (если orjson установлен)
+
+Запуск: python diag/bench_broadcast.py
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import django
+
+# Добавляем путь к проекту
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Настраиваем Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_project.settings')
+django.setup()
+
+from channels.layers import InMemoryChannelLayer
+
+from quiz_app import frames
+
+PLAYER_COUNTS = [10, 50, 200]
+EVENTS_PER_RUN = 50
+
+
+def make_leaderboard(players):
+    return [
+        {
+            'position': idx + 1,
+            'player_id': idx + 1,
+            'name': f'Игрок {idx + 1}',
+            'score': 10000 - idx * 37,
+            'current_streak': idx % 5,
+            'connected': True,
+            'is_host': idx == 0,
+        }
+        for idx in range(players)
+    ]
+
+
+def make_question_result(players):
+    return {
+        'type': 'question_result',
+        'question': {
+            'id': 1,
+            'uuid': '5b0c8f0e-3d7a-4b55-9a39-4f7c4b2f3a10',
+            'order': 1,
+            'text': 'Какой актёр сыграл главную роль в фильме «Берегись автомобиля»?',
+            'difficulty': 'hard',
+            'explanation': 'Иннокентий Смоктуновский сыграл страхового агента Деточкина',
+            'image_url': '',
+            'time_limit': 30,
+            'choices': [
+                {'id': i, 'text': f'Вариант {i}', 'is_correct': i == 1, 'order': i}
+                for i in range(1, 5)
+            ],
+            'correct_choice': 1,
+        },
+        'leaderboard': make_leaderboard(players),
+    }
+
+
+async def run(players, mode):
+    """Возвращает CPU-секунды на одно событие для всей комнаты"""
+    layer = InMemoryChannelLayer(capacity=EVENTS_PER_RUN * 2)
+    channels = [await layer.new_channel() for _ in range(players)]
+    for channel in channels:
+        await layer.group_add('bench', channel)
+
+    event = make_question_result(players)
+
+    started = time.process_time()
+    for _ in range(EVENTS_PER_RUN):
+        if mode == 'per-consumer':
+            await layer.group_send('bench', dict(event))
+            for channel in channels:
+                message = await layer.receive(channel)
+                json.dumps(message)
+        else:
+            await layer.group_send('bench', frames.frame(event))
+            for channel in channels:
+                message = await layer.receive(channel)
+                message['text']
+    elapsed = time.process_time() - started
+
+    await layer.flush()
+    return elapsed / EVENTS_PER_RUN
+
+
+def main():
+    modes = [('per-consumer', False), ('frame', False)]
+    if frames.orjson is not None:
+        modes.append(('frame + orjson', True))
+    else:
+        print("orjson не установлен — режим frame + orjson пропущен")
+
+    print("=" * 60)
+    print(f"{'Игроков':>8} | {'режим':<16} | {'CPU мс/событие':>15}")
+    print("=" * 60)
+
+    for players in PLAYER_COUNTS:
+        for mode, fast in modes:
+            frames.USE_FAST_JSON = fast
+            per_event = asyncio.run(run(players, mode))
+            print(f"{players:>8} | {mode:<16} | {per_event * 1000:>15.3f}")
+        print("-" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Бенчмарк пакетного подсчёта очков
+
+Для N случайных ответов сравнивает:
+- calculate_score по одному ответу (как в игре)
+- score_batch одним вызовом (векторно с numpy, без него — циклом)
+
+Проверяет, что очки и разбивка совпадают с get_score_breakdown поэлементно.
+БД не нужна.
+
+Запуск: python diag/bench_scoring.py [--answers 100000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Добавляем путь к проекту
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quiz_app import scoring
+from quiz_app.scoring import ScoringConfig, calculate_score, get_score_breakdown, score_batch
+
+DIFFICULTIES = ['easy', 'medium', 'hard', 'very_hard', 'fun']
+
+
+def make_answers(count, seed=42):
+    """Столбцы (is_correct, time_taken, time_limit, streak, difficulty)"""
+    rng = random.Random(seed)
+    time_limit = [rng.choice([10, 15, 20, 30]) for _ in range(count)]
+    return (
+        [rng.random() < 0.6 for _ in range(count)],
+        [round(rng.random() * limit * 1.1, 2) for limit in time_limit],  # бывают ответы после таймера
+        time_limit,
+        [rng.randint(0, 10) for _ in range(count)],
+        [rng.choice(DIFFICULTIES) for _ in range(count)],
+    )
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def mismatches(columns, batch, config):
+    """Индексы ответов, где score_batch расходится с get_score_breakdown"""
+    bad = []
+    for i, row in enumerate(zip(*columns)):
+        expected = get_score_breakdown(*row, config=config)
+        if any(float(batch[key][i]) != float(value) for key, value in expected.items()):
+            bad.append(i)
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--answers', type=int, default=100000)
+    args = parser.parse_args()
+
+    columns = make_answers(args.answers)
+    configs = [
+        scoring.DEFAULT_CONFIG,
+        ScoringConfig(base_points=800, speed_bonus=700, streak_bonus=50).with_multipliers(hard=1.4, fun=0.7),
+        ScoringConfig(speed_curve='quadratic', streak_cap=3),
+        ScoringConfig(speed_curve='sqrt', streak_cap=0, speed_bonus=1000),
+    ]
+
+    _, single_time = timed(lambda: [calculate_score(*row) for row in zip(*columns)])
+    batch, batch_time = timed(lambda: score_batch(*columns))
+
+    print("=" * 60)
+    print(f"Ответов: {args.answers}, numpy: {'да' if scoring.np is not None else 'нет'}")
+    print("=" * 60)
+    print(f"calculate_score × N:   {single_time * 1000:10.1f} мс")
+    print(f"score_batch:           {batch_time * 1000:10.1f} мс  (x{single_time / batch_time:.1f})")
+
+    failed = False
+    for config in configs:
+        bad = mismatches(columns, score_batch(*columns, config=config), config)
+        if bad:
+            failed = True
+            print(f"\n❌ Расхождений: {len(bad)} (первый — ответ {bad[0]}) для {config}")
+
+    if failed:
+        sys.exit(1)
+    print("\n✅ score_batch совпадает с get_score_breakdown")
+
+
+if __name__ == '__main__':
+    main()
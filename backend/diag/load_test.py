@@ -0,0 +1,282 @@
+"""
+Нагрузочный тест: сотни игроков в нескольких комнатах одновременно
+
+Через REST создаёт квиз (импорт пака) и M сессий, подключает по N игроков
+к ws/game/{code}/, ведущий каждой комнаты запускает игру, игроки отвечают
+со случайной задержкой (логнормальное распределение, часть не отвечает).
+
+Отчёт:
+- answer_received: от отправки ответа до подтверждения
+- question: доставка вопроса (время получения − sent_at сервера)
+- CPU сервера (по /proc, если указан --server-pid и сервер на этой машине)
+
+Сервер (один процесс, слой каналов в памяти или локальный Redis):
+    QUIZ_CHANNEL_LAYER=memory daphne -p 8000 quiz_project.asgi:application
+    daphne -p 8000 quiz_project.asgi:application
+
+Запуск (нужен pip install websockets):
+    python diag/load_test.py --rooms 10 --players 30 --server-pid $(pgrep -f daphne)
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import urllib.error
+import urllib.request
+
+try:
+    import websockets
+except ImportError:  # websockets — необязательная зависимость (только для нагрузочного теста)
+    websockets = None
+
+# Сложность вопросов пака: у 'fun' самое короткое время (10 с)
+QUESTION_DIFFICULTY = 'fun'
+
+# Попыток создать сессию (4-значные коды могут совпасть)
+SESSION_CREATE_ATTEMPTS = 5
+
+# Heartbeat как у фронтенда (frontend/src/utils/websocket.js): без него
+# планировщик через QUIZ_HEARTBEAT_TIMEOUT считает игроков отключёнными
+HEARTBEAT_INTERVAL = 5
+
+
+# ============================================================================
+# REST
+# ============================================================================
+
+def api_post(base_url, path, payload):
+    """POST JSON → dict"""
+    request = urllib.request.Request(
+        f'{base_url}/api/{path}',
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def create_quiz(base_url, question_count):
+    """Квиз для теста (импорт JSON-пака)"""
+    return api_post(base_url, 'quizzes/import/', {
+        'topic': 'Нагрузочный тест',
+        'questions': [
+            {
+                'text': f'Нагрузочный вопрос номер {i}?',
+                'choices': ['один', 'два', 'три', f'четыре {i}'],
+                'correct_index': i % 4,
+                'difficulty': QUESTION_DIFFICULTY,
+            }
+            for i in range(question_count)
+        ],
+    })
+
+
+def create_session(base_url, quiz_id):
+    """Сессия квиза (повтор при совпадении кода)"""
+    for attempt in range(SESSION_CREATE_ATTEMPTS):
+        try:
+            return api_post(base_url, 'sessions/', {'quiz': quiz_id})['code']
+        except urllib.error.HTTPError:
+            if attempt == SESSION_CREATE_ATTEMPTS - 1:
+                raise
+
+
+# ============================================================================
+# МЕТРИКИ
+# ============================================================================
+
+def percentile(values, p):
+    """Перцентиль (nearest-rank)"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def process_cpu_seconds(pid):
+    """user + system время процесса из /proc (Linux) или None"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        ticks = os.sysconf('SC_CLK_TCK')
+        return (int(fields[11]) + int(fields[12])) / ticks
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Metrics:
+    """Задержки и счётчики по всем клиентам"""
+
+    def __init__(self):
+        self.answer_latency = []
+        self.question_latency = []
+        self.errors = []
+        self.games_finished = 0
+
+    def report(self, elapsed, server_cpu, client_cpu):
+        print("=" * 60)
+        print(f"Время: {elapsed:.1f} с, завершено игр: {self.games_finished}, ошибок: {len(self.errors)}")
+        print("=" * 60)
+        print(f"{'событие':<18}{'n':>8}{'p50 мс':>10}{'p95 мс':>10}{'p99 мс':>10}{'max мс':>10}")
+        for name, values in [('answer_received', self.answer_latency), ('question', self.question_latency)]:
+            ms = [v * 1000 for v in values]
+            print(
+                f"{name:<18}{len(ms):>8}{percentile(ms, 50):>10.1f}{percentile(ms, 95):>10.1f}"
+                f"{percentile(ms, 99):>10.1f}{max(ms, default=float('nan')):>10.1f}"
+            )
+
+        if server_cpu is not None:
+            print(f"\nCPU сервера: {server_cpu:.1f} с ({100 * server_cpu / elapsed:.0f}% ядра)")
+        # Если генератор нагрузки сам упёрся в CPU, задержки завышены
+        print(f"CPU генератора: {client_cpu:.1f} с ({100 * client_cpu / elapsed:.0f}% ядра)")
+
+        for error in self.errors[:10]:
+            print(f"❌ {error}")
+
+
+# ============================================================================
+# ИГРОКИ
+# ============================================================================
+
+class Room:
+    """Комната: ведущий стартует игру, когда все игроки присоединились"""
+
+    def __init__(self, code, player_count):
+        self.code = code
+        self.player_count = player_count
+        self.joined = 0
+        self.all_joined = asyncio.Event()
+
+    def player_joined(self):
+        self.joined += 1
+        if self.joined == self.player_count:
+            self.all_joined.set()
+
+
+async def play(ws_url, room, index, args, metrics):
+    """Один игрок: join → ответы на вопросы → game_over"""
+    rng = random.Random(f'{args.seed}-{room.code}-{index}')
+    answer_sent_at = None  # у игрока не больше одного неподтверждённого ответа
+    tasks = []
+
+    async def answer(ws, question):
+        nonlocal answer_sent_at
+        # Логнормальная задержка «на подумать», не дольше времени на вопрос
+        delay = min(rng.lognormvariate(args.think_mu, args.think_sigma), question['time_limit'] - 0.5)
+        await asyncio.sleep(max(delay, 0.1))
+        answer_sent_at = time.perf_counter()
+        await ws.send(json.dumps({
+            'type': 'answer',
+            'question_uuid': question['uuid'],
+            'choice_id': rng.choice(question['choices'])['id'],
+            'time_taken': delay,
+        }))
+
+    async def heartbeat(ws):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await ws.send(json.dumps({'type': 'ping'}))
+
+    try:
+        async with websockets.connect(f'{ws_url}/ws/game/{room.code}/', open_timeout=30) as ws:
+            await ws.send(json.dumps({'type': 'join', 'player_name': f'Игрок {index}'}))
+            tasks.append(asyncio.create_task(heartbeat(ws)))
+
+            async for raw in ws:
+                message = json.loads(raw)
+                kind = message['type']
+
+                if kind == 'joined':
+                    room.player_joined()
+                    if index == 0:
+                        await room.all_joined.wait()
+                        await ws.send(json.dumps({'type': 'become_host'}))
+                        await ws.send(json.dumps({'type': 'start_game'}))
+
+                elif kind == 'question':
+                    if 'sent_at' in message:
+                        metrics.question_latency.append(time.time() - message['sent_at'])
+                    if rng.random() >= args.skip:
+                        tasks.append(asyncio.create_task(answer(ws, message['question'])))
+
+                elif kind == 'answer_received':
+                    if answer_sent_at is not None:
+                        metrics.answer_latency.append(time.perf_counter() - answer_sent_at)
+                        answer_sent_at = None
+
+                elif kind == 'game_over':
+                    metrics.games_finished += index == 0
+                    break
+
+                elif kind == 'error':
+                    answer_sent_at = None
+                    metrics.errors.append(f"{room.code}/{index}: {message.get('message')}")
+
+    except Exception as e:
+        metrics.errors.append(f"{room.code}/{index}: {type(e).__name__}: {e}")
+        room.player_joined()  # не блокируем старт комнаты
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def run(args, metrics):
+    base_url = args.url.rstrip('/')
+    ws_url = base_url.replace('http', 'ws', 1)
+
+    quiz = await asyncio.to_thread(create_quiz, base_url, args.questions)
+    codes = [await asyncio.to_thread(create_session, base_url, quiz['id']) for _ in range(args.rooms)]
+    print(f"Квиз {quiz['id']}, комнат: {len(codes)}, игроков: {args.rooms * args.players}")
+
+    rooms = [Room(code, args.players) for code in codes]
+    players = []
+    for room in rooms:
+        for index in range(args.players):
+            players.append(play(ws_url, room, index, args, metrics))
+            if args.ramp:
+                await asyncio.sleep(args.ramp)
+    await asyncio.gather(*[asyncio.ensure_future(p) for p in players])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='адрес сервера')
+    parser.add_argument('--rooms', type=int, default=5, help='комнат (M)')
+    parser.add_argument('--players', type=int, default=20, help='игроков в комнате (N)')
+    parser.add_argument('--questions', type=int, default=5, help='вопросов в квизе')
+    parser.add_argument('--think-mu', type=float, default=1.2, help='lognormal mu задержки ответа (медиана e^mu ≈ 3.3 с)')
+    parser.add_argument('--think-sigma', type=float, default=0.5, help='lognormal sigma задержки ответа')
+    parser.add_argument('--skip', type=float, default=0.05, help='доля вопросов без ответа')
+    parser.add_argument('--ramp', type=float, default=0.0, help='пауза между подключениями игроков, с')
+    parser.add_argument('--server-pid', type=int, help='PID сервера для замера CPU (/proc)')
+    parser.add_argument('--seed', default='load', help='seed случайных задержек')
+    args = parser.parse_args()
+
+    if websockets is None:
+        print("❌ Нужен пакет websockets: pip install websockets")
+        sys.exit(1)
+
+    metrics = Metrics()
+    server_cpu_start = process_cpu_seconds(args.server_pid) if args.server_pid else None
+    client_cpu_start = time.process_time()
+    started = time.perf_counter()
+
+    asyncio.run(run(args, metrics))
+
+    elapsed = time.perf_counter() - started
+    server_cpu = None
+    if server_cpu_start is not None:
+        server_cpu = process_cpu_seconds(args.server_pid) - server_cpu_start
+    metrics.report(elapsed, server_cpu, time.process_time() - client_cpu_start)
+
+    sys.exit(1 if metrics.errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Бюджет SQL-запросов и задержки для событий игры
+
+Прогоняет полную игру через GameConsumer (WebsocketCommunicator,
+InMemoryChannelLayer, временная тестовая БД) и для каждого события
+считает SQL-запросы (во всех потоках) и время ответа:
+- join:      join → joined и session_state
+- answer:    answer → answer_received
+- results:   последний ответ → question_result
+- game_over: последний question_result → game_over
+
+Бюджет запросов проверяется по медиане события, а максимум может
+превышать его на BACKGROUND_QUERIES: фоновые записи (пакет ответов,
+номер текущего вопроса) идут по таймеру и попадают в любое окно.
+У событий с меньше чем MIN_MEDIAN_SAMPLES замерами (game_over — один)
+медиана и есть единственный замер, поэтому запас действует и для неё —
+иначе результат зависит от того, успел ли таймер записи сработать до окна.
+
+Если событие превысило бюджет — код возврата 1.
+
+Запуск: python diag/query_budget.py [--players 20] [--questions 5]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import django
+
+# Добавляем путь к проекту
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Настраиваем Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_project.settings')
+django.setup()
+
+from django.conf import settings
+
+# До импорта планировщика: без Redis и без пауз между вопросами —
+# в задержку событий попадает только обработка
+settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+settings.QUIZ_RESULT_DELAY = 0
+settings.QUIZ_RESULTS_DURATION = 0
+
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import setup_test_environment
+
+from quiz_project.asgi import application
+from quiz_app.models import Quiz, GameSession
+from quiz_app.generation import QuestionSchema, save_questions_to_quiz
+
+# Бюджеты на одно событие: (SQL-запросов по медиане, миллисекунд max)
+BUDGETS = {
+    'join': (6, 250),       # игрок + session_state
+    'answer': (0, 50),      # ответ только в памяти
+    'results': (0, 250),    # payload'ы вопросов из кеша (question_payloads)
+    'game_over': (12, 500), # финальная запись ответов, очков, наград и снимка статистики
+}
+
+# Фоновые записи, которые могут попасть в окно любого события:
+# транзакция пакета ответов (BEGIN, INSERT, UPDATE) и current_question
+BACKGROUND_QUERIES = 4
+
+# С меньшим числом замеров медиана не сглаживает фоновые записи
+MIN_MEDIAN_SAMPLES = 3
+
+RECEIVE_TIMEOUT = 30
+
+
+class QueryCounter:
+    """Считает SQL-запросы всех соединений (в любом потоке)"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        connection_created.connect(self._on_connection_created, weak=False)
+        for conn in connections.all():
+            self._wrap(conn)
+
+    def _on_connection_created(self, sender, connection, **kwargs):
+        self._wrap(connection)
+
+    def _wrap(self, conn):
+        if self not in conn.execute_wrappers:
+            conn.execute_wrappers.append(self)
+
+
+class EventStats:
+    """Запросы и задержка по событиям"""
+
+    def __init__(self, counter):
+        self.counter = counter
+        self.samples = {name: [] for name in BUDGETS}
+
+    def start(self):
+        return self.counter.count, time.perf_counter()
+
+    def stop(self, name, started):
+        queries, t0 = started
+        self.samples[name].append((self.counter.count - queries, (time.perf_counter() - t0) * 1000))
+
+
+async def receive(comm, event_type):
+    """Ждёт событие нужного типа (остальные пропускает)"""
+    while True:
+        message = json.loads(await comm.receive_from(timeout=RECEIVE_TIMEOUT))
+        if message['type'] == event_type:
+            return message
+
+
+@database_sync_to_async
+def create_session(question_count):
+    quiz = Quiz.objects.create(title='Бюджет запросов', topic='Проверка', time_per_question=30)
+    save_questions_to_quiz(quiz, [
+        QuestionSchema(
+            text=f'Проверочный вопрос номер {i}?',
+            choices=['один', 'два', 'три', f'четыре {i}'],
+            correct_index=i % 4,
+            difficulty='medium'
+        )
+        for i in range(question_count)
+    ])
+    return GameSession.objects.create(quiz=quiz).code
+
+
+async def play(stats, player_count, question_count):
+    """Полная игра: все игроки отвечают на каждый вопрос"""
+    code = await create_session(question_count)
+
+    players = []
+    for i in range(player_count):
+        comm = WebsocketCommunicator(application, f'/ws/game/{code}/')
+        connected, _ = await comm.connect()
+        assert connected, 'WebSocket не подключился'
+        await receive(comm, 'session_state')
+
+        started = stats.start()
+        await comm.send_json_to({'type': 'join', 'player_name': f'Игрок {i}'})
+        await receive(comm, 'joined')
+        await receive(comm, 'session_state')
+        stats.stop('join', started)
+        players.append(comm)
+
+    host = players[0]
+    await host.send_json_to({'type': 'become_host'})
+    await receive(host, 'host_assigned')
+    await host.send_json_to({'type': 'start_game'})
+
+    for _ in range(question_count):
+        events = [await receive(comm, 'question') for comm in players]
+        question = events[0]['question']
+
+        for i, comm in enumerate(players):
+            started = stats.start()
+            await comm.send_json_to({
+                'type': 'answer',
+                'question_uuid': question['uuid'],
+                'choice_id': question['choices'][i % 4]['id'],
+                'time_taken': 1.0,
+            })
+            await receive(comm, 'answer_received')
+            stats.stop('answer', started)
+
+        started = stats.start()
+        await receive(host, 'question_result')
+        stats.stop('results', started)
+
+    started = stats.start()
+    await receive(host, 'game_over')
+    stats.stop('game_over', started)
+
+    for comm in players:
+        await comm.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=10)
+    parser.add_argument('--questions', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    counter = QueryCounter()
+    counter.install()
+    stats = EventStats(counter)
+
+    try:
+        asyncio.run(play(stats, args.players, args.questions))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print("=" * 60)
+    print(f"Игроков: {args.players}, вопросов: {args.questions}")
+    print("=" * 60)
+    print(
+        f"{'событие':<12}{'n':>5}{'SQL p50':>9}{'SQL max':>9}{'бюджет':>8}"
+        f"{'мс p50':>9}{'мс max':>9}{'бюджет':>8}"
+    )
+
+    failed = []
+    for name, samples in stats.samples.items():
+        query_budget, ms_budget = BUDGETS[name]
+        queries = sorted(q for q, _ in samples)
+        latencies = sorted(ms for _, ms in samples)
+        q50, q_max = queries[len(queries) // 2], queries[-1]
+        p50, worst = latencies[len(latencies) // 2], latencies[-1]
+        median_budget = query_budget if len(samples) >= MIN_MEDIAN_SAMPLES else query_budget + BACKGROUND_QUERIES
+        ok = (
+            q50 <= median_budget
+            and q_max <= query_budget + BACKGROUND_QUERIES
+            and worst <= ms_budget
+        )
+        if not ok:
+            failed.append(name)
+        print(
+            f"{name:<12}{len(samples):>5}{q50:>9}{q_max:>9}{query_budget:>8}"
+            f"{p50:>9.1f}{worst:>9.1f}{ms_budget:>8}" + ('' if ok else '   ❌')
+        )
+
+    if failed:
+        print(f"\n❌ Превышен бюджет: {', '.join(failed)}")
+        sys.exit(1)
+    print("\n✅ Все события в бюджете")
+
+
+if __name__ == '__main__':
+    main()
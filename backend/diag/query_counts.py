@@ -0,0 +1,119 @@
+"""
+Проверка количества SQL-запросов при сериализации квизов
+
+Для квизов разного размера считает запросы:
+- GET /api/quizzes/{id}/           (QuizDetailSerializer)
+- GET /api/quizzes/{id}/questions/ (QuestionSerializer)
+- payload'ы вопросов (question_payloads): сборка при промахе кеша и выдача из кеша
+
+Число запросов не должно зависеть от количества вопросов — иначе это N+1.
+Работает на временной тестовой БД (рабочие данные не трогает).
+
+Запуск: python diag/query_counts.py
+Код возврата 1, если где-то найден рост запросов.
+"""
+
+import os
+import sys
+import django
+
+# Добавляем путь к проекту
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Настраиваем Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_project.settings')
+django.setup()
+
+from django.conf import settings
+
+# Без Redis: кеш в памяти процесса (проверка идёт в одном процессе)
+settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+from django.db import connection
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from quiz_app.models import Quiz
+from quiz_app.generation import QuestionSchema, save_questions_to_quiz
+from quiz_app import question_payloads
+
+QUIZ_SIZES = [1, 10, 50]
+
+
+def make_quiz(size):
+    """Квиз с size вопросами"""
+    quiz = Quiz.objects.create(title=f'Квиз на {size}', topic=f'Проверка {size}')
+    save_questions_to_quiz(quiz, [
+        QuestionSchema(
+            text=f'Проверочный вопрос номер {i}?',
+            choices=['один', 'два', 'три', f'четыре {i}'],
+            correct_index=i % 4,
+            difficulty='medium'
+        )
+        for i in range(size)
+    ])
+    return quiz
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as ctx:
+        func()
+    return len(ctx.captured_queries)
+
+
+def measure(quiz):
+    """Количество запросов по каждому пути для квиза"""
+    client = APIClient()
+    last_order = quiz.questions.order_by('-order').values_list('order', flat=True).first()
+
+    def get(url):
+        def call():
+            response = client.get(url)
+            assert response.status_code == 200, f'{url}: {response.status_code}'
+        return call
+
+    def payload():
+        question_payloads.question_payload(quiz.id, last_order, question_payloads.HOST)
+
+    def cold_payload():
+        question_payloads.invalidate(quiz.id)
+        payload()
+
+    return {
+        'quiz detail': count_queries(get(f'/api/quizzes/{quiz.id}/')),
+        'quiz questions': count_queries(get(f'/api/quizzes/{quiz.id}/questions/')),
+        'payloads (build)': count_queries(cold_payload),
+        'payload (cached)': count_queries(payload),
+    }
+
+
+def main():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        results = {size: measure(make_quiz(size)) for size in QUIZ_SIZES}
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print("=" * 60)
+    print("SQL-запросы по размеру квиза:")
+    print("=" * 60)
+    print(f"{'путь':<24}" + ''.join(f"{size:>8}" for size in QUIZ_SIZES))
+
+    failed = []
+    for path in results[QUIZ_SIZES[0]]:
+        counts = [results[size][path] for size in QUIZ_SIZES]
+        ok = len(set(counts)) == 1
+        if not ok:
+            failed.append(path)
+        print(f"{path:<24}" + ''.join(f"{c:>8}" for c in counts) + ('' if ok else '   ❌ N+1'))
+
+    if failed:
+        print(f"\n❌ Количество запросов растёт с размером квиза: {', '.join(failed)}")
+        sys.exit(1)
+    print("\n✅ Количество запросов не зависит от размера квиза")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Проверка команд ведущего, отправленных во время паузы
+
+Пропуск (skip) или переход к результатам (next), присланные на паузе,
+должны сработать сразу после resume, а не потеряться до конца таймера
+вопроса:
+- pause → skip → resume: ожидание вопроса возвращает 'skip',
+  результаты вопроса не показываются, сразу идёт следующий вопрос;
+- pause → next → resume: ожидание возвращает 'next', результаты
+  показываются без ожидания таймера.
+
+Планировщик комнаты запускается напрямую (InMemoryChannelLayer,
+временная тестовая БД). Если команда потерялась — код возврата 1.
+
+Запуск: python diag/scheduler_pause.py
+"""
+
+import os
+import sys
+import asyncio
+import django
+
+# Добавляем путь к проекту
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Настраиваем Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_project.settings')
+django.setup()
+
+from django.conf import settings
+
+# До импорта планировщика: без Redis и без пауз между фазами
+settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+settings.QUIZ_RESULT_DELAY = 0
+settings.QUIZ_RESULTS_DURATION = 0
+
+from channels.db import database_sync_to_async
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+from quiz_app.models import Quiz, GameSession
+from quiz_app.generation import QuestionSchema, save_questions_to_quiz
+from quiz_app.scheduler import get_scheduler
+
+# Таймер вопроса заведомо длиннее проверки: 'timeout' значит, что команда потерялась
+TIME_PER_QUESTION = 60
+STEP_TIMEOUT = 10
+
+
+@database_sync_to_async
+def create_session():
+    quiz = Quiz.objects.create(title='Пауза', topic='Проверка', time_per_question=TIME_PER_QUESTION)
+    save_questions_to_quiz(quiz, [
+        QuestionSchema(
+            text=f'Проверочный вопрос номер {i}?',
+            choices=['один', 'два', 'три', f'четыре {i}'],
+            correct_index=0,
+            difficulty='medium'
+        )
+        for i in range(3)
+    ])
+    return GameSession.objects.create(quiz=quiz, state='playing').code
+
+
+async def until(condition):
+    """Ждёт выполнения condition() не дольше STEP_TIMEOUT секунд"""
+    deadline = asyncio.get_running_loop().time() + STEP_TIMEOUT
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+async def check(command):
+    """pause → command → resume на первом вопросе"""
+    code = await create_session()
+    scheduler = get_scheduler(code)
+
+    question_waits = []
+    results_shown = []
+
+    wait = scheduler._wait
+    show_results = scheduler.show_question_results
+
+    async def recording_wait(seconds, track_deadline=False):
+        action = await wait(seconds, track_deadline)
+        if track_deadline:
+            question_waits.append(action)
+        return action
+
+    async def recording_show_results(game, question):
+        results_shown.append(question.order)
+        await show_results(game, question)
+
+    scheduler._wait = recording_wait
+    scheduler.show_question_results = recording_show_results
+
+    scheduler.start()
+    ok = await until(lambda: scheduler.phase == 'question')
+
+    scheduler.pause()
+    # Планировщик успевает уйти в ожидание resume до команды
+    await asyncio.sleep(0.1)
+    getattr(scheduler, command)()
+    await scheduler.resume()
+
+    ok = ok and await until(lambda: question_waits)
+    if command == 'skip':
+        # Следующий вопрос уже разослан
+        ok = ok and await until(lambda: scheduler.phase == 'question')
+        ok = ok and question_waits[0] == 'skip' and 1 not in results_shown
+    else:
+        ok = ok and await until(lambda: results_shown)
+        ok = ok and question_waits[0] == 'next' and results_shown[0] == 1
+
+    await scheduler.stop()
+
+    print(
+        f"{'✅' if ok else '❌'} pause → {command} → resume: ожидание вопроса "
+        f"{question_waits[0] if question_waits else '—'}, результаты вопросов {results_shown}"
+    )
+    return ok
+
+
+async def run():
+    return [await check('skip'), await check('next')]
+
+
+def main():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if not all(results):
+        print("\n❌ Команда, отправленная на паузе, потерялась")
+        sys.exit(1)
+    print("\n✅ Команды на паузе срабатывают после resume")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Проверка сопоставления похожих тем
+
+Темы, отличающиеся числом, веком или словом ("Музыка 80-х" и
+"Музыка 90-х", "История XX века" и "История XIX века"), не должны
+подменять друг друга ни в кеше генерации (find_similar), ни в банке
+вопросов (question_bank.draw), а переформулировки одной темы
+("Советские фильмы" и "Фильмы СССР") — должны находиться.
+
+Ещё проверяется, что вопрос похожей темы достаётся из банка, даже если
+категорию заполняют сотни реже использованных вопросов чужих тем.
+Записи создаются во временной тестовой БД.
+
+Если хоть одна пара сопоставлена неверно — код возврата 1.
+
+Запуск: python diag/topic_matching.py
+"""
+
+import os
+import sys
+import django
+
+# Добавляем путь к проекту
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Настраиваем Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_project.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+from quiz_app import generation_cache, question_bank
+from quiz_app.generation import QuestionSchema
+from quiz_app.models import GenerationCacheEntry, BankQuestion
+from quiz_app.topics import topic_similarity
+
+DIFFICULTY_CURVE = ['easy', 'medium', 'hard']
+
+# (тема в кеше/банке, запрошенная тема)
+MUST_MISS = [
+    ('Музыка 80-х', 'Музыка 90-х'),
+    ('Музыка 90-х', 'Музыка 80-х'),
+    ('История XX века', 'История XIX века'),
+    ('Фильмы 2010 года', 'Фильмы 2020 года'),
+    ('История Европы', 'История Азии'),
+    ('Людовик X', 'Людовик XI'),
+]
+
+MUST_HIT = [
+    ('Советские фильмы', 'Фильмы СССР'),
+    ('Советские фильмы', 'советское кино'),
+    ('Музыка 80-х', 'Музыкальные хиты 80-х'),
+    ('Советское кино 70-х', 'Фильмы СССР 70-х годов'),
+]
+
+
+def cached_questions(topic):
+    return [
+        {
+            'text': f'{topic}: вопрос {i}?',
+            'choices': ['один', 'два', 'три', 'четыре'],
+            'correct_index': 0,
+            'difficulty': difficulty,
+        }
+        for i, difficulty in enumerate(DIFFICULTY_CURVE)
+    ]
+
+
+def report(ok, cached_topic, topic, hit):
+    print(
+        f"{'✅' if ok else '❌'} {cached_topic!r:<28} → {topic!r:<28} "
+        f"сходство {topic_similarity(cached_topic, topic):.3f}, {'попадание' if hit else 'промах'}"
+    )
+    return ok
+
+
+def check_cache(cached_topic, topic, expect_hit):
+    """Запись кеша только с cached_topic — находит ли её find_similar по topic"""
+    GenerationCacheEntry.objects.all().delete()
+    generation_cache.store(f'key:{cached_topic}', cached_questions(cached_topic), cached_topic, len(DIFFICULTY_CURVE))
+
+    hit = generation_cache.find_similar(topic, DIFFICULTY_CURVE) is not None
+    return report(hit == expect_hit, cached_topic, topic, hit)
+
+
+def check_bank(cached_topic, topic, expect_hit):
+    """Банк только с вопросами cached_topic — достаёт ли их draw по topic"""
+    BankQuestion.objects.all().delete()
+    question_bank.add_to_bank(cached_topic, [QuestionSchema(**q) for q in cached_questions(cached_topic)])
+
+    hit = bool(question_bank.draw(topic, DIFFICULTY_CURVE))
+    return report(hit == expect_hit, cached_topic, topic, hit)
+
+
+def check_bank_crowded():
+    """Вопрос похожей темы за срезом кандидатов из чужих тем той же категории"""
+    BankQuestion.objects.all().delete()
+    crowd = question_bank.BANK_CANDIDATES_PER_DIFFICULTY * 2
+    question_bank.add_to_bank('Голливудские фильмы', [
+        QuestionSchema(text=f'Голливуд: вопрос {i}?', choices=['один', 'два', 'три', 'четыре'], correct_index=0, difficulty='easy')
+        for i in range(crowd)
+    ])
+    question_bank.add_to_bank('Советские фильмы', [
+        QuestionSchema(text='СССР: вопрос?', choices=['один', 'два', 'три', 'четыре'], correct_index=0, difficulty='easy')
+    ])
+    BankQuestion.objects.filter(normalized_topic='советск фильм').update(times_used=10)
+
+    drawn = question_bank.draw('Фильмы СССР', ['easy'])
+    ok = [q['text'] for q in drawn.values()] == ['СССР: вопрос?']
+    print(f"{'✅' if ok else '❌'} банк: похожая тема за {crowd} вопросами чужой темы — {'найдена' if ok else 'не найдена'}")
+    return ok
+
+
+def main():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        results = []
+        for title, check in [('Кеш генерации', check_cache), ('Банк вопросов', check_bank)]:
+            print(f"\n{title}:")
+            results += [check(cached, topic, expect_hit=False) for cached, topic in MUST_MISS]
+            results += [check(cached, topic, expect_hit=True) for cached, topic in MUST_HIT]
+        print()
+        results.append(check_bank_crowded())
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if not all(results):
+        print(f"\n❌ Неверно сопоставлено пар: {results.count(False)}")
+        sys.exit(1)
+    print("\n✅ Все пары сопоставлены верно")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,11 @@
 # quiz_app/admin.py
 
 from django.contrib import admin
-from .models import Quiz, Question, Choice, GameSession, Player, Answer
+from .models import (
+    Quiz, Question, Choice, GameSession, Player, Answer,
+    GenerationJob, GenerationCacheEntry, BankQuestion, SessionStats, CustomAward, ScoringProfile
+)
+from . import generation_cache
 
 
 class ChoiceInline(admin.TabularInline):
@@ -27,7 +31,7 @@ class QuizAdmin(admin.ModelAdmin):
             'fields': ['image_url']
         }),
         ('Настройки', {
-            'fields': ['time_per_question', 'question_count']
+            'fields': ['time_per_question', 'question_count', 'scoring_profile']
         }),
         ('Метаданные', {
             'fields': ['created_at'],
@@ -84,7 +88,7 @@ class GameSessionAdmin(admin.ModelAdmin):
     list_filter = ['state', 'created_at']
     search_fields = ['code', 'quiz__title']
     inlines = [PlayerInline]
-    readonly_fields = ['code', 'created_at', 'started_at', 'finished_at']
+    readonly_fields = ['code', 'created_at', 'started_at', 'finished_at', 'scoring_config']
 
     fieldsets = [
         ('Основная информация', {
@@ -93,6 +97,9 @@ class GameSessionAdmin(admin.ModelAdmin):
         ('Игровой процесс', {
             'fields': ['current_question', 'host']
         }),
+        ('Очки', {
+            'fields': ['scoring_profile', 'scoring_config']
+        }),
         ('Временные метки', {
             'fields': ['created_at', 'started_at', 'finished_at'],
             'classes': ['collapse']
@@ -155,4 +162,175 @@ class AnswerAdmin(admin.ModelAdmin):
     def question_short(self, obj):
         return f"Q{obj.question.order}"
 
-    question_short.short_description = 'Вопрос'
\ No newline at end of file
+    question_short.short_description = 'Вопрос'
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ['topic', 'status', 'stage', 'progress', 'quiz', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['topic', 'uuid']
+    readonly_fields = ['uuid', 'created_at', 'started_at', 'finished_at']
+
+    fieldsets = [
+        ('Основная информация', {
+            'fields': ['uuid', 'topic', 'params']
+        }),
+        ('Статус', {
+            'fields': ['status', 'stage', 'progress', 'questions_ready', 'error', 'quiz']
+        }),
+        ('Метрики', {
+            'fields': ['metrics'],
+            'classes': ['collapse']
+        }),
+        ('Временные метки', {
+            'fields': ['created_at', 'started_at', 'finished_at'],
+            'classes': ['collapse']
+        }),
+    ]
+
+
+@admin.register(GenerationCacheEntry)
+class GenerationCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['topic', 'normalized_topic', 'count', 'hits', 'misses', 'size_kb', 'last_used_at', 'expires_at']
+    list_filter = ['count', 'created_at']
+    search_fields = ['topic', 'normalized_topic', 'key']
+    readonly_fields = ['key', 'topic', 'normalized_topic', 'count', 'questions', 'size_bytes', 'hits', 'misses',
+                       'created_at', 'last_used_at', 'expires_at']
+    actions = ['evict_stale', 'purge_all']
+
+    fieldsets = [
+        ('Основная информация', {
+            'fields': ['key', 'topic', 'normalized_topic', 'count']
+        }),
+        ('Статистика', {
+            'fields': ['hits', 'misses', 'size_bytes']
+        }),
+        ('Вопросы', {
+            'fields': ['questions'],
+            'classes': ['collapse']
+        }),
+        ('Временные метки', {
+            'fields': ['created_at', 'last_used_at', 'expires_at'],
+            'classes': ['collapse']
+        }),
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        """Сводка кеша в заголовке списка"""
+        stats = generation_cache.stats()
+        hit_rate = f"{stats['hit_rate']:.0%}" if stats['hit_rate'] is not None else "—"
+        extra_context = extra_context or {}
+        extra_context['title'] = (
+            f"Кеш генерации: {stats['entries']} записей, "
+            f"{stats['size_bytes'] // 1024} КБ, попаданий {stats['hits']}, "
+            f"промахов {stats['misses']}, hit rate {hit_rate}"
+        )
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def size_kb(self, obj):
+        return f"{obj.size_bytes / 1024:.1f} КБ"
+
+    size_kb.short_description = 'Размер'
+
+    @admin.action(description='Удалить истёкшие и вытеснить лишние (LRU)')
+    def evict_stale(self, request, queryset):
+        removed = generation_cache.evict()
+        self.message_user(request, f"Удалено записей: {removed}")
+
+    @admin.action(description='Очистить весь кеш генерации')
+    def purge_all(self, request, queryset):
+        removed = generation_cache.purge()
+        self.message_user(request, f"Кеш очищен, удалено записей: {removed}")
+
+
+@admin.register(BankQuestion)
+class BankQuestionAdmin(admin.ModelAdmin):
+    list_display = ['text_preview', 'category', 'difficulty', 'topic', 'times_used', 'created_at']
+    list_filter = ['category', 'difficulty']
+    search_fields = ['text', 'topic']
+    readonly_fields = ['text_hash', 'normalized_topic', 'times_used', 'created_at']
+
+    fieldsets = [
+        ('Основная информация', {
+            'fields': ['category', 'difficulty', 'topic', 'text']
+        }),
+        ('Ответы', {
+            'fields': ['choices', 'correct_index', 'explanation', 'image_url']
+        }),
+        ('Метаданные', {
+            'fields': ['text_hash', 'normalized_topic', 'times_used', 'created_at'],
+            'classes': ['collapse']
+        }),
+    ]
+
+    def text_preview(self, obj):
+        return obj.text[:50] + '...' if len(obj.text) > 50 else obj.text
+
+    text_preview.short_description = 'Текст вопроса'
+
+
+@admin.register(SessionStats)
+class SessionStatsAdmin(admin.ModelAdmin):
+    list_display = ['session', 'total_players', 'total_answers', 'correct_answers', 'average_score', 'frozen', 'updated_at']
+    list_filter = ['frozen']
+    search_fields = ['session__code']
+    readonly_fields = [f.name for f in SessionStats._meta.fields]
+
+
+@admin.register(CustomAward)
+class CustomAwardAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'key', 'metric', 'threshold_op', 'threshold', 'winner', 'is_active', 'order']
+    list_filter = ['is_active', 'metric']
+    list_editable = ['is_active', 'order']
+    search_fields = ['key', 'name']
+    readonly_fields = ['created_at']
+
+    fieldsets = [
+        ('Основная информация', {
+            'fields': ['key', 'name', 'emoji', 'description', 'is_active', 'order']
+        }),
+        ('Метрика', {
+            'fields': ['metric', 'player_field']
+        }),
+        ('Фильтр ответов', {
+            'fields': ['correct', 'difficulties', 'time_over', 'time_under', 'last_seconds']
+        }),
+        ('Порог и победитель', {
+            'fields': ['threshold_op', 'threshold', 'winner']
+        }),
+        ('Отображение', {
+            'fields': ['value_scale', 'value_digits', 'value_template']
+        }),
+        ('Метаданные', {
+            'fields': ['created_at'],
+            'classes': ['collapse']
+        }),
+    ]
+
+
+@admin.register(ScoringProfile)
+class ScoringProfileAdmin(admin.ModelAdmin):
+    list_display = ['name', 'base_points', 'speed_bonus', 'speed_curve', 'streak_bonus', 'streak_cap', 'updated_at']
+    list_filter = ['speed_curve']
+    search_fields = ['name', 'description']
+    readonly_fields = ['created_at', 'updated_at']
+
+    fieldsets = [
+        ('Основная информация', {
+            'fields': ['name', 'description']
+        }),
+        ('Формула', {
+            'fields': [
+                'base_points', 'speed_bonus', 'speed_curve',
+                'streak_bonus', 'streak_cap', 'difficulty_multipliers'
+            ]
+        }),
+        ('Метаданные', {
+            'fields': ['created_at', 'updated_at'],
+            'classes': ['collapse']
+        }),
+    ]
@@ -0,0 +1,11 @@
+# quiz_app/apps.py
+
+from django.apps import AppConfig
+
+
+class QuizAppConfig(AppConfig):
+    name = 'quiz_app'
+
+    def ready(self):
+        # Сброс кеша payload'ов вопросов при правках (question_payloads)
+        from . import signals  # noqa: F401
@@ -2,218 +2,427 @@
 # ФАЙЛ 1: backend/quiz_app/awards.py (СОЗДАЙ НОВЫЙ ФАЙЛ)
 # ============================================================================
 
-from dataclasses import dataclass
-from typing import List, Optional, Callable
-from django.db.models import Avg, Count, Q, F
+import operator
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
 
-from .models import GameSession, Player, Answer
+from .models import GameSession, Answer, SessionStats, CustomAward, Question
+from . import session_stats
 
+# Сколько хранить посчитанные награды завершённой сессии (сек)
+AWARDS_CACHE_TTL = getattr(settings, 'QUIZ_AWARDS_CACHE_TTL', 60 * 60 * 24)
 
-@dataclass
-class Award:
-    """
-    Награда в игре
+# Сколько хранить правила наград из админки (сек);
+# при изменении CustomAward сбрасываются сигналами. Кеш общий (Redis,
+# settings.CACHES) — правка в админке видна процессу с игрой
+CUSTOM_RULES_TTL = getattr(settings, 'QUIZ_CUSTOM_AWARDS_CACHE_TTL', 60 * 60)
+CUSTOM_RULES_CACHE_KEY = 'custom_award_rules'
 
-    Attributes:
-        key: уникальный ключ награды
-        name: название награды
-        emoji: эмодзи для отображения
-        description: описание критерия
-        checker: функция проверки (принимает player, answers)
-    """
-    key: str
-    name: str
-    emoji: str
-    description: str
-    checker: Callable
+DIFFICULTIES = [key for key, _ in Question.DIFFICULTY_CHOICES]
 
 
 # ============================================================================
-# ФУНКЦИИ ПРОВЕРКИ НАГРАД
+# ДЕКЛАРАТИВНЫЕ ПРАВИЛА НАГРАД
 # ============================================================================
 
-def check_fastest(player, all_answers, threshold=3.0):
+@dataclass(frozen=True)
+class AnswerFilter:
     """
-    Проверка награды 'Молния' ⚡
-
-    Критерий: средняя скорость ответа < 3 секунды (только правильные ответы)
-
-    Args:
-        player: экземпляр Player
-        all_answers: список всех Answer в сессии
-        threshold: порог в секундах
-
-    Returns:
-        tuple: (bool, float) - (заслужил награду?, среднее время)
-    """
-    correct_answers = [
-        a for a in all_answers
-        if a.player == player and a.is_correct
-    ]
-
-    if not correct_answers:
-        return False, 0
-
-    avg_time = sum(a.time_taken for a in correct_answers) / len(correct_answers)
-
-    return avg_time < threshold, avg_time
-
-
-def check_accurate(player, all_answers, threshold=0.85):
-    """
-    Проверка награды 'Снайпер' 🎯
-
-    Критерий: точность > 85% правильных ответов
-
-    Args:
-        player: экземпляр Player
-        all_answers: список всех Answer в сессии
-        threshold: минимальная точность (0.0 - 1.0)
-
-    Returns:
-        tuple: (bool, float) - (заслужил награду?, точность)
-    """
-    player_answers = [a for a in all_answers if a.player == player]
-
-    if not player_answers:
-        return False, 0
-
-    correct = sum(1 for a in player_answers if a.is_correct)
-    accuracy = correct / len(player_answers)
+    Какие ответы игрока учитывает метрика (пустые условия — любые ответы)
 
-    return accuracy >= threshold, accuracy
-
-
-def check_clutch(player, all_answers, min_clutch=2):
-    """
-    Проверка награды 'Clutch мастер' 🔥
-
-    Критерий: минимум 2 правильных ответа в последние 3 секунды таймера
-
-    Args:
-        player: экземпляр Player
-        all_answers: список всех Answer в сессии
-        min_clutch: минимальное количество clutch ответов
-
-    Returns:
-        tuple: (bool, int) - (заслужил награду?, количество clutch)
-    """
-    clutch_answers = [
-        a for a in all_answers
-        if a.player == player
-           and a.is_correct
-           and a.time_taken >= (a.question.time_limit - 3)
-    ]
-
-    clutch_count = len(clutch_answers)
-
-    return clutch_count >= min_clutch, clutch_count
-
-
-def check_strategist(player, all_answers, min_streak=5):
-    """
-    Проверка награды 'Стратег' 🧠
-
-    Критерий: максимальный streak ≥ 5 правильных ответов подряд
-
-    Args:
-        player: экземпляр Player
-        all_answers: список всех Answer в сессии
-        min_streak: минимальный streak
-
-    Returns:
-        tuple: (bool, int) - (заслужил награду?, максимальный streak)
+    Attributes:
+        correct: только правильные (True) / неправильные (False)
+        difficulties: сложности вопросов
+        time_over: время ответа строго больше (сек)
+        time_under: время ответа строго меньше (сек)
+        last_seconds: ответ в последние N секунд таймера
     """
-    max_streak = player.max_streak
-
-    return max_streak >= min_streak, max_streak
-
-
-def check_lucky(player, all_answers, min_lucky=2):
+    correct: Optional[bool] = None
+    difficulties: Tuple[str, ...] = ()
+    time_over: Optional[float] = None
+    time_under: Optional[float] = None
+    last_seconds: Optional[float] = None
+
+    def matcher(self):
+        """Функция (is_correct, time_taken, time_limit, difficulty) -> bool"""
+        correct = self.correct
+        difficulties = frozenset(self.difficulties)
+        time_over, time_under, last_seconds = self.time_over, self.time_under, self.last_seconds
+
+        def match(is_correct, time_taken, time_limit, difficulty):
+            return (
+                (correct is None or is_correct == correct)
+                and (not difficulties or difficulty in difficulties)
+                and (time_over is None or time_taken > time_over)
+                and (time_under is None or time_taken < time_under)
+                and (last_seconds is None or time_taken >= time_limit - last_seconds)
+            )
+
+        return match
+
+
+ALL_ANSWERS = AnswerFilter()
+
+THRESHOLD_OPS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+}
+
+
+@dataclass(frozen=True)
+class AwardRule:
     """
-    Проверка награды 'Везунчик' 🎲
+    Награда как агрегат по потоку ответов
 
-    Критерий: минимум 2 правильных ответа на hard/very_hard вопросы
-              при времени ответа > 15 секунд
+    Метрики (на игрока):
+    - count: количество ответов, прошедших filter
+    - sum / avg: сумма / среднее time_taken таких ответов
+    - ratio: их доля от всех ответов игрока
+    - player: поле игрока (player_field: max_streak, score)
 
-    Args:
-        player: экземпляр Player
-        all_answers: список всех Answer в сессии
-        min_lucky: минимальное количество "везучих" ответов
+    Игрок без значения метрики (нет ответов для avg/ratio) не участвует.
 
-    Returns:
-        tuple: (bool, int) - (заслужил награду?, количество)
+    Attributes:
+        key: уникальный ключ награды
+        name: название награды
+        emoji: эмодзи для отображения
+        description: описание критерия
+        metric: метрика (см. выше)
+        filter: AnswerFilter для count/sum/avg/ratio
+        player_field: поле игрока для metric='player'
+        threshold_op, threshold: условие получения (threshold=None — без порога)
+        winner: 'max' или 'min' — кто из подходящих побеждает
+        value_scale: множитель значения (100 — проценты)
+        value_digits: округление значения (None — как есть)
+        value_template: описание для победителя, формат с {value}
     """
-    lucky_answers = [
-        a for a in all_answers
-        if a.player == player
-           and a.is_correct
-           and a.question.difficulty in ['hard', 'very_hard']
-           and a.time_taken > 15
-    ]
-
-    lucky_count = len(lucky_answers)
-
-    return lucky_count >= min_lucky, lucky_count
+    key: str
+    name: str
+    emoji: str
+    description: str
+    metric: str
+    filter: AnswerFilter = ALL_ANSWERS
+    player_field: str = ''
+    threshold_op: str = '>='
+    threshold: Optional[float] = None
+    winner: str = 'max'
+    value_scale: float = 1
+    value_digits: Optional[int] = None
+    value_template: str = '{value}'
+
+    def format_value(self, value):
+        """(значение для ответа, описание для победителя)"""
+        value = value * self.value_scale if self.value_scale != 1 else value
+        try:
+            description = self.value_template.format(value=value)
+        except (KeyError, IndexError, ValueError):
+            description = f'{self.name}: {value}'
+        if self.value_digits is not None:
+            value = round(value, self.value_digits)
+        return value, description
 
 
 # ============================================================================
-# СПИСОК ВСЕХ НАГРАД
+# ВСТРОЕННЫЕ НАГРАДЫ
 # ============================================================================
 
+# Пороги наград (те же, что по умолчанию в check_*)
+FASTEST_THRESHOLD = 3.0
+ACCURATE_THRESHOLD = 0.85
+MIN_CLUTCH = 2
+MIN_STREAK = 5
+MIN_LUCKY = 2
+CLUTCH_WINDOW = 3          # последние секунды таймера
+LUCKY_MIN_TIME = 15
+LUCKY_DIFFICULTIES = ('hard', 'very_hard')
+
+CORRECT_ANSWERS = AnswerFilter(correct=True)
+
 AWARDS = [
-    Award(
+    AwardRule(
         key="fastest",
         name="Молния",
         emoji="⚡",
         description="Самая высокая средняя скорость ответа (< 3 сек)",
-        checker=lambda p, ans: check_fastest(p, ans)[0]
+        metric='avg',
+        filter=CORRECT_ANSWERS,
+        threshold_op='<',
+        threshold=FASTEST_THRESHOLD,
+        winner='min',
+        value_digits=2,
+        value_template='Средняя скорость: {value:.2f}s',
     ),
-    Award(
+    AwardRule(
         key="accurate",
         name="Снайпер",
         emoji="🎯",
         description="Самая высокая точность (> 85%)",
-        checker=lambda p, ans: check_accurate(p, ans)[0]
+        metric='ratio',
+        filter=CORRECT_ANSWERS,
+        threshold=ACCURATE_THRESHOLD,
+        value_scale=100,
+        value_digits=1,
+        value_template='Точность: {value:.1f}%',
     ),
-    Award(
+    AwardRule(
         key="clutch",
         name="Clutch мастер",
         emoji="🔥",
         description="Минимум 2 ответа в последние 3 секунды",
-        checker=lambda p, ans: check_clutch(p, ans)[0]
+        metric='count',
+        filter=AnswerFilter(correct=True, last_seconds=CLUTCH_WINDOW),
+        threshold=MIN_CLUTCH,
+        value_template='Clutch ответов: {value}',
     ),
-    Award(
+    AwardRule(
         key="strategist",
         name="Стратег",
         emoji="🧠",
         description="Максимальный streak ≥ 5 правильных подряд",
-        checker=lambda p, ans: check_strategist(p, ans)[0]
+        metric='player',
+        player_field='max_streak',
+        threshold=MIN_STREAK,
+        value_template='Макс. streak: {value}',
     ),
-    Award(
+    AwardRule(
         key="lucky",
         name="Везунчик",
         emoji="🎲",
         description="Правильные сложные ответы за последние секунды",
-        checker=lambda p, ans: check_lucky(p, ans)[0]
+        metric='count',
+        filter=AnswerFilter(correct=True, difficulties=LUCKY_DIFFICULTIES, time_over=LUCKY_MIN_TIME),
+        threshold=MIN_LUCKY,
+        value_template='Везучих ответов: {value}',
     ),
 ]
 
 
+def rule_from_custom(award: CustomAward) -> AwardRule:
+    """AwardRule по награде из админки"""
+    return AwardRule(
+        key=award.key,
+        name=award.name,
+        emoji=award.emoji,
+        description=award.description,
+        metric=award.metric,
+        filter=AnswerFilter(
+            correct=award.correct,
+            difficulties=tuple(award.difficulties or ()),
+            time_over=award.time_over,
+            time_under=award.time_under,
+            last_seconds=award.last_seconds,
+        ),
+        player_field=award.player_field,
+        threshold_op=award.threshold_op,
+        threshold=award.threshold,
+        winner=award.winner,
+        value_scale=award.value_scale,
+        value_digits=award.value_digits,
+        value_template=award.value_template,
+    )
+
+
+def custom_rules() -> List[AwardRule]:
+    """Правила активных наград из админки (из кеша; при промахе — один запрос)"""
+    rules = cache.get(CUSTOM_RULES_CACHE_KEY)
+    if rules is None:
+        custom = CustomAward.objects.filter(is_active=True).exclude(key__in=AWARDS_DICT)
+        rules = [rule_from_custom(award) for award in custom]
+        cache.set(CUSTOM_RULES_CACHE_KEY, rules, CUSTOM_RULES_TTL)
+    return rules
+
+
+def invalidate_custom_rules():
+    """Сбрасывает кеш правил наград из админки (после правок CustomAward)"""
+    cache.delete(CUSTOM_RULES_CACHE_KEY)
+
+
+def active_rules() -> List[AwardRule]:
+    """Встроенные награды + активные награды из админки"""
+    return AWARDS + custom_rules()
+
+
+# ============================================================================
+# КОМПИЛЯЦИЯ ПРАВИЛ В ОДИН ПРОХОД ПО ОТВЕТАМ
+# ============================================================================
+
+@dataclass
+class PlayerAggregate:
+    """
+    Итоги игрока по всем его ответам
+
+    counts[i] / time_sums[i] — количество и сумма time_taken ответов,
+    прошедших i-й фильтр CompiledRules.filters.
+    """
+    player_id: int
+    name: str
+    max_streak: int = 0
+    score: int = 0
+    counts: List[int] = field(default_factory=list)
+    time_sums: List[float] = field(default_factory=list)
+
+
+class CompiledRules:
+    """
+    Набор правил, сведённый к общему проходу по ответам
+
+    Одинаковые фильтры разных правил проверяются один раз: стоимость
+    прохода зависит от числа различных фильтров, а не от числа наград.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+
+        # Фильтр всех ответов нужен всегда — знаменатель ratio
+        self.filters: List[AnswerFilter] = [ALL_ANSWERS]
+        for rule in self.rules:
+            if rule.metric != 'player' and rule.filter not in self.filters:
+                self.filters.append(rule.filter)
+        self._index = {f: i for i, f in enumerate(self.filters)}
+        self._matchers = [f.matcher() for f in self.filters[1:]]
+
+    def aggregate(self, players, answers) -> List[PlayerAggregate]:
+        """
+        Один проход по ответам
+
+        Args:
+            players: игроки сессии (порядок сохраняется — он решает ничьи)
+            answers: кортежи (player_id, is_correct, time_taken, time_limit, difficulty);
+                time_limit — действующий (свой у вопроса или из квиза)
+
+        Returns:
+            list: PlayerAggregate в порядке players
+        """
+        size = len(self.filters)
+        aggregates = {
+            p.id: PlayerAggregate(
+                player_id=p.id, name=p.name, max_streak=p.max_streak, score=p.score,
+                counts=[0] * size, time_sums=[0.0] * size
+            )
+            for p in players
+        }
+
+        matchers = list(enumerate(self._matchers, start=1))
+        for player_id, is_correct, time_taken, time_limit, difficulty in answers:
+            agg = aggregates.get(player_id)
+            if agg is None:
+                continue
+            counts, sums = agg.counts, agg.time_sums
+            counts[0] += 1
+            sums[0] += time_taken
+            for i, match in matchers:
+                if match(is_correct, time_taken, time_limit, difficulty):
+                    counts[i] += 1
+                    sums[i] += time_taken
+
+        return list(aggregates.values())
+
+    def metric(self, rule: AwardRule, agg: PlayerAggregate):
+        """Значение метрики правила для игрока или None"""
+        if rule.metric == 'player':
+            return getattr(agg, rule.player_field, None)
+
+        i = self._index[rule.filter]
+        if rule.metric == 'count':
+            return agg.counts[i]
+        if rule.metric == 'sum':
+            return agg.time_sums[i]
+        if rule.metric == 'avg':
+            return agg.time_sums[i] / agg.counts[i] if agg.counts[i] else None
+        if rule.metric == 'ratio':
+            return agg.counts[i] / agg.counts[0] if agg.counts[0] else None
+        return None
+
+    def winners(self, aggregates: List[PlayerAggregate]) -> dict:
+        """
+        Победители всех правил по агрегатам игроков
+
+        При равенстве побеждает игрок, который раньше в списке.
+        """
+        results = {}
+        for rule in self.rules:
+            passes = THRESHOLD_OPS[rule.threshold_op]
+            candidates = []
+            for agg in aggregates:
+                value = self.metric(rule, agg)
+                if value is not None and (rule.threshold is None or passes(value, rule.threshold)):
+                    candidates.append((agg, value))
+            if not candidates:
+                continue
+
+            pick = min if rule.winner == 'min' else max
+            winner, value = pick(candidates, key=lambda c: c[1])
+            value, description = rule.format_value(value)
+            results[rule.key] = _award(winner, rule.emoji, value, description)
+        return results
+
+
+@lru_cache(maxsize=32)
+def compile_rules(rules: Tuple[AwardRule, ...]) -> CompiledRules:
+    """CompiledRules для набора правил (кешируется: правила неизменяемые)"""
+    return CompiledRules(rules)
+
+
+def aggregate_answers(players, answers, rules=None) -> List[PlayerAggregate]:
+    """Агрегаты всех игроков за один проход по ответам (для правил rules или AWARDS)"""
+    return compile_rules(tuple(rules or AWARDS)).aggregate(players, answers)
+
+
+def awards_from_aggregates(aggregates: List[PlayerAggregate], rules=None) -> dict:
+    """Победители наград rules (или AWARDS) по агрегатам aggregate_answers"""
+    return compile_rules(tuple(rules or AWARDS)).winners(aggregates)
+
+
+def _session_answers(session):
+    """Ответы сессии кортежами для aggregate_answers (один запрос, без моделей)"""
+    rows = (
+        Answer.objects
+        .filter(player__session=session)
+        .values_list('player_id', 'is_correct', 'time_taken', 'question__time_limit', 'question__difficulty')
+    )
+    default_limit = session.quiz.time_per_question
+    return [
+        (player_id, is_correct, time_taken, time_limit if time_limit > 0 else default_limit, difficulty)
+        for player_id, is_correct, time_taken, time_limit, difficulty in rows
+    ]
+
+
+def _award(winner, emoji, value, description):
+    return {
+        'player_id': winner.player_id,
+        'name': winner.name,
+        'emoji': emoji,
+        'value': value,
+        'description': description,
+    }
+
+
 # ============================================================================
 # ГЛАВНАЯ ФУНКЦИЯ РАСЧЁТА НАГРАД
 # ============================================================================
 
+def awards_cache_key(session_id):
+    return f'session_awards:{session_id}'
+
+
 def calculate_awards(session: GameSession) -> dict:
     """
     Рассчитывает все награды для игровой сессии
 
     Логика:
-    - Для каждой награды проверяем всех игроков
-    - Выбираем лучшего по каждому критерию
+    - Встроенные и активные свои награды компилируются в общий набор фильтров
+    - Один проход по ответам собирает агрегаты всех игроков
+    - По каждой награде выбираем лучшего из подходящих
     - Один игрок может получить несколько наград
     - Если никто не подходит — награда не выдаётся
 
+    Для завершённой сессии результат кешируется (ответы больше не меняются).
+
     Args:
         session: GameSession экземпляр
 
@@ -224,116 +433,17 @@ def calculate_awards(session: GameSession) -> dict:
             ...
         }
     """
-    players = session.players.all()
-    all_answers = list(Answer.objects.filter(player__session=session).select_related('question', 'player'))
-
-    results = {}
-
-    # ========================================================================
-    # НАГРАДА 1: ⚡ МОЛНИЯ (Fastest)
-    # ========================================================================
-
-    fastest_candidates = []
-    for player in players:
-        eligible, avg_time = check_fastest(player, all_answers)
-        if eligible:
-            fastest_candidates.append((player, avg_time))
-
-    if fastest_candidates:
-        # Выбираем игрока с минимальным временем
-        winner = min(fastest_candidates, key=lambda x: x[1])
-        results['fastest'] = {
-            'player_id': winner[0].id,
-            'name': winner[0].name,
-            'emoji': '⚡',
-            'value': round(winner[1], 2),
-            'description': f'Средняя скорость: {winner[1]:.2f}s'
-        }
-
-    # ========================================================================
-    # НАГРАДА 2: 🎯 СНАЙПЕР (Accurate)
-    # ========================================================================
-
-    accurate_candidates = []
-    for player in players:
-        eligible, accuracy = check_accurate(player, all_answers)
-        if eligible:
-            accurate_candidates.append((player, accuracy))
-
-    if accurate_candidates:
-        # Выбираем игрока с максимальной точностью
-        winner = max(accurate_candidates, key=lambda x: x[1])
-        results['accurate'] = {
-            'player_id': winner[0].id,
-            'name': winner[0].name,
-            'emoji': '🎯',
-            'value': round(winner[1] * 100, 1),
-            'description': f'Точность: {winner[1] * 100:.1f}%'
-        }
+    finished = session.state == 'finished'
+    if finished:
+        cached = cache.get(awards_cache_key(session.id))
+        if cached is not None:
+            return cached
 
-    # ========================================================================
-    # НАГРАДА 3: 🔥 CLUTCH МАСТЕР
-    # ========================================================================
-
-    clutch_candidates = []
-    for player in players:
-        eligible, clutch_count = check_clutch(player, all_answers)
-        if eligible:
-            clutch_candidates.append((player, clutch_count))
-
-    if clutch_candidates:
-        # Выбираем игрока с максимальным количеством clutch
-        winner = max(clutch_candidates, key=lambda x: x[1])
-        results['clutch'] = {
-            'player_id': winner[0].id,
-            'name': winner[0].name,
-            'emoji': '🔥',
-            'value': winner[1],
-            'description': f'Clutch ответов: {winner[1]}'
-        }
-
-    # ========================================================================
-    # НАГРАДА 4: 🧠 СТРАТЕГ
-    # ========================================================================
-
-    strategist_candidates = []
-    for player in players:
-        eligible, max_streak = check_strategist(player, all_answers)
-        if eligible:
-            strategist_candidates.append((player, max_streak))
-
-    if strategist_candidates:
-        # Выбираем игрока с максимальным streak
-        winner = max(strategist_candidates, key=lambda x: x[1])
-        results['strategist'] = {
-            'player_id': winner[0].id,
-            'name': winner[0].name,
-            'emoji': '🧠',
-            'value': winner[1],
-            'description': f'Макс. streak: {winner[1]}'
-        }
-
-    # ========================================================================
-    # НАГРАДА 5: 🎲 ВЕЗУНЧИК
-    # ========================================================================
-
-    lucky_candidates = []
-    for player in players:
-        eligible, lucky_count = check_lucky(player, all_answers)
-        if eligible:
-            lucky_candidates.append((player, lucky_count))
-
-    if lucky_candidates:
-        # Выбираем игрока с максимальным количеством "везучих" ответов
-        winner = max(lucky_candidates, key=lambda x: x[1])
-        results['lucky'] = {
-            'player_id': winner[0].id,
-            'name': winner[0].name,
-            'emoji': '🎲',
-            'value': winner[1],
-            'description': f'Везучих ответов: {winner[1]}'
-        }
+    compiled = compile_rules(tuple(active_rules()))
+    results = compiled.winners(compiled.aggregate(session.players.all(), _session_answers(session)))
 
+    if finished:
+        cache.set(awards_cache_key(session.id), results, AWARDS_CACHE_TTL)
     return results
 
 
@@ -349,13 +459,14 @@ def get_player_awards(session: GameSession, player_id: int) -> List[dict]:
         list: [{'key': 'fastest', 'name': 'Молния', 'emoji': '⚡', ...}, ...]
     """
     all_awards = calculate_awards(session)
+    names = {rule.key: rule.name for rule in active_rules()}
 
     player_awards = []
     for award_key, award_data in all_awards.items():
         if award_data['player_id'] == player_id:
             player_awards.append({
                 'key': award_key,
-                'name': AWARDS_DICT[award_key].name,
+                'name': names.get(award_key, award_key),
                 'emoji': award_data['emoji'],
                 'description': award_data['description']
             })
@@ -371,6 +482,11 @@ def get_session_statistics(session: GameSession) -> dict:
     """
     Возвращает детальную статистику по сессии
 
+    Завершённая игра читается из снимка SessionStats (один запрос).
+    Если снимка нет (игра ещё идёт или завершена досрочно через REST),
+    статистика собирается по ответам из БД, а для завершённой сессии
+    сразу замораживается.
+
     Args:
         session: GameSession экземпляр
 
@@ -380,68 +496,17 @@ def get_session_statistics(session: GameSession) -> dict:
             'total_questions': 10,
             'total_answers': 80,
             'average_score': 5250.5,
-            'average_accuracy': 0.75,
-            'fastest_answer': {'player': 'Иван', 'time': 1.2},
-            'slowest_answer': {'player': 'Мария', 'time': 19.8},
-            ...
+            'average_accuracy': 75.0,
+            'fastest_answer': {'player': 'Иван', 'time': 1.2, 'question': '...'},
+            'slowest_answer': {'player': 'Мария', 'time': 19.8, 'question': '...'},
+            'hardest_question': {'question__text': '...', 'correct_count': 1, ...},
         }
     """
-    players = session.players.all()
-    answers = Answer.objects.filter(player__session=session)
-
-    # Базовая статистика
-    total_players = players.count()
-    total_questions = session.quiz.question_count
-    total_answers = answers.count()
-
-    # Средний счёт
-    avg_score = players.aggregate(Avg('score'))['score__avg'] or 0
-
-    # Средняя точность
-    correct_answers = answers.filter(is_correct=True).count()
-    avg_accuracy = correct_answers / total_answers if total_answers > 0 else 0
-
-    # Самый быстрый ответ
-    fastest = answers.filter(is_correct=True).order_by('time_taken').first()
-    fastest_data = None
-    if fastest:
-        fastest_data = {
-            'player': fastest.player.name,
-            'time': round(fastest.time_taken, 2),
-            'question': fastest.question.text[:50]
-        }
-
-    # Самый медленный правильный ответ
-    slowest = answers.filter(is_correct=True).order_by('-time_taken').first()
-    slowest_data = None
-    if slowest:
-        slowest_data = {
-            'player': slowest.player.name,
-            'time': round(slowest.time_taken, 2),
-            'question': slowest.question.text[:50]
-        }
-
-    # Самый сложный вопрос (меньше всего правильных ответов)
-    from django.db.models import Count
-    hardest_question = (
-        Answer.objects
-        .filter(player__session=session)
-        .values('question__text', 'question__difficulty')
-        .annotate(
-            correct_count=Count('id', filter=Q(is_correct=True)),
-            total_count=Count('id')
-        )
-        .order_by('correct_count')
-        .first()
-    )
-
-    return {
-        'total_players': total_players,
-        'total_questions': total_questions,
-        'total_answers': total_answers,
-        'average_score': round(avg_score, 1),
-        'average_accuracy': round(avg_accuracy * 100, 1),
-        'fastest_answer': fastest_data,
-        'slowest_answer': slowest_data,
-        'hardest_question': hardest_question,
-    }
\ No newline at end of file
+    snapshot = SessionStats.objects.filter(session=session, frozen=True).first()
+    if snapshot is not None:
+        return snapshot.as_dict()
+
+    fields = session_stats.stats_from_db(session)
+    if session.state == 'finished':
+        session_stats.freeze(session.id, fields)
+    return SessionStats(session=session, **fields).as_dict()
\ No newline at end of file
@@ -7,15 +7,15 @@ import asyncio
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
-from datetime import timedelta
 
-from .models import GameSession, Player, Question, Answer, Choice
-from .serializers import (
-    GameSessionSerializer, PlayerSerializer,
-    QuestionForPlayerSerializer, LeaderboardSerializer
-)
+from .models import GameSession, Player, GenerationJob
+from .serializers import GameSessionSerializer, PlayerSerializer
 
-from .awards import calculate_awards
+from .game_state import ensure_game_state, load_game_state, get_game_state
+from .scheduler import get_scheduler
+from .frames import frame
+from .presence import tracker, persist_connected, players_disconnected, start_sweeper
+from .jobs import job_group, job_payload
 
 class GameConsumer(AsyncWebsocketConsumer):
     """
@@ -39,7 +39,8 @@ class GameConsumer(AsyncWebsocketConsumer):
     События к клиентам:
     - session_state: состояние сессии
     - player_joined: новый игрок
-    - player_disconnected: игрок отключился
+    - player_disconnected: игроки отключились — {"player_ids": [id, ...]}
+      (одно событие на всех отключившихся за проверку; поля player_id нет)
     - host_assigned: назначен ведущий
     - game_started: игра началась
     - question: новый вопрос
@@ -70,6 +71,9 @@ class GameConsumer(AsyncWebsocketConsumer):
             await self.close(code=4004)
             return
 
+        # Один sweeper на процесс следит за пропавшими игроками
+        start_sweeper()
+
         # Присоединяемся к группе
         await self.channel_layer.group_add(
             self.room_group_name,
@@ -151,8 +155,12 @@ class GameConsumer(AsyncWebsocketConsumer):
         player = await self.get_or_create_player(self.session_code, player_name)
         self.player_id = player['id']
 
-        # Обновляем heartbeat
-        await self.update_player_heartbeat(self.player_id)
+        game = get_game_state(self.session_code)
+        if game is not None:
+            game.upsert_player(player)
+
+        # Обновляем heartbeat (в памяти, подключение уже записано в БД)
+        tracker.touch(self.player_id, self.session_code)
 
         # Отправляем подтверждение
         await self.send(text_data=json.dumps({
@@ -163,10 +171,10 @@ class GameConsumer(AsyncWebsocketConsumer):
         # Broadcast всем о новом игроке
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
+            frame({
                 'type': 'player_joined',
                 'player': player
-            }
+            })
         )
 
         # Отправляем состояние сессии
@@ -187,14 +195,18 @@ class GameConsumer(AsyncWebsocketConsumer):
         # Назначаем ведущим
         await self.assign_host(self.player_id)
 
+        game = get_game_state(self.session_code)
+        if game is not None:
+            game.set_host(self.player_id)
+
         # Broadcast всем
         player = await self.get_player_data(self.player_id)
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
+            frame({
                 'type': 'host_assigned',
                 'player': player
-            }
+            })
         )
 
     async def handle_start_game(self, data):
@@ -202,19 +214,27 @@ class GameConsumer(AsyncWebsocketConsumer):
         if not await self.verify_host():
             return
 
+        scheduler = get_scheduler(self.session_code)
+        if scheduler.is_active:
+            await self.send_error("Игра уже запущена")
+            return
+
+        # Загружаем состояние игры в память (один раз на игру)
+        await load_game_state(self.session_code)
+
         # Меняем состояние на running
         await self.update_session_state('running')
 
         # Broadcast о старте
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
+            frame({
                 'type': 'game_started',
-            }
+            })
         )
 
-        # Показываем первый вопрос
-        await self.show_next_question()
+        # Дальше вопросы ведёт планировщик комнаты
+        scheduler.start()
 
     async def handle_answer(self, data):
         """Обработка ответа игрока"""
@@ -250,72 +270,10 @@ class GameConsumer(AsyncWebsocketConsumer):
         # Обновляем статистику для всех
         await self.send_answer_stats()
 
-        # НОВОЕ: Проверяем, все ли ответили
-        all_answered = await self.check_all_answered(question_uuid)
-
-        if all_answered:
-            print("✅ Все ответили! Переходим к результатам...")
-            await asyncio.sleep(2)  # Даём 2 сек посмотреть на свой результат
-
-            await self.show_question_results(question_uuid)
-            await asyncio.sleep(5)  # Показываем результаты 5 сек
-
-            has_more = await self.has_more_questions()
-
-            if has_more:
-                print("➡️ Следующий вопрос...")
-                await self.show_next_question()
-            else:
-                print("🏁 Игра окончена!")
-                await self.finish_game()
-
-    @database_sync_to_async
-    def check_all_answered(self, question_uuid):
-        """Проверяем, все ли ответили"""
-        session = GameSession.objects.get(code=self.session_code)
-        question = Question.objects.get(uuid=question_uuid)
-
-        connected_players = session.players.filter(connected=True).count()
-        answers_count = Answer.objects.filter(
-            player__session=session,
-            question=question
-        ).count()
-
-        print(f"📊 Ответили: {answers_count}/{connected_players}")
-        return answers_count >= connected_players
-
-    @database_sync_to_async
-    def has_more_questions(self):
-        """Есть ли ещё вопросы"""
-        session = GameSession.objects.get(code=self.session_code)
-        total_questions = session.quiz.questions.count()
-        has_more = session.current_question < total_questions
-
-        print(f"❓ Индекс: {session.current_question}/{total_questions}, Есть ещё: {has_more}")
-        return has_more
-
-    async def show_question_results(self, question_uuid):
-        """Показать результаты вопроса"""
-        print("📈 Показываем результаты...")
-
-        question_data = await self.get_question_with_answer(question_uuid)
-        leaderboard = await self.get_leaderboard()
-
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'question_result',
-                'question': question_data,
-                'leaderboard': leaderboard
-            }
-        )
-
-    @database_sync_to_async
-    def get_question_with_answer(self, question_uuid):
-        """Получить вопрос с правильным ответом"""
-        from .serializers import QuestionSerializer
-        question = Question.objects.get(uuid=question_uuid)
-        return QuestionSerializer(question).data
+        # Переход к результатам делает планировщик комнаты,
+        # этот consumer сразу возвращается к своим сообщениям
+        if result['all_answered']:
+            get_scheduler(self.session_code).notify_all_answered()
 
     async def handle_pause_game(self, data):
         """Пауза (только ведущий)"""
@@ -323,12 +281,13 @@ class GameConsumer(AsyncWebsocketConsumer):
             return
 
         await self.update_session_state('paused')
+        get_scheduler(self.session_code).pause()
 
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
+            frame({
                 'type': 'game_paused',
-            }
+            })
         )
 
     async def handle_resume_game(self, data):
@@ -338,23 +297,8 @@ class GameConsumer(AsyncWebsocketConsumer):
 
         await self.update_session_state('running')
 
-        # Countdown 3-2-1
-        for i in range(3, 0, -1):
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'countdown',
-                    'count': i
-                }
-            )
-            await asyncio.sleep(1)
-
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'game_resumed',
-            }
-        )
+        # Countdown 3-2-1 рассылает планировщик, часы идут после него
+        asyncio.create_task(get_scheduler(self.session_code).resume())
 
     async def handle_skip_question(self, data):
         """Пропустить вопрос (только ведущий, первые 5-10 сек)"""
@@ -363,30 +307,31 @@ class GameConsumer(AsyncWebsocketConsumer):
 
         # TODO: Проверить что прошло менее 10 сек с начала вопроса
 
-        # Помечаем вопрос как пропущенный (не начисляем баллы никому)
-        await self.skip_current_question()
-
-        # Показываем следующий вопрос
-        await self.show_next_question()
+        # Вопрос закрывается без результатов, планировщик показывает следующий
+        get_scheduler(self.session_code).skip()
 
     async def handle_end_game(self, data):
         """Завершить игру досрочно (только ведущий)"""
         if not await self.verify_host():
             return
 
-        await self.finish_game()
+        if await self.get_current_state() == 'finished':
+            return
+
+        await get_scheduler(self.session_code).stop()
 
     async def handle_next_question(self, data):
         """Следующий вопрос (только ведущий, если автопилот выкл)"""
         if not await self.verify_host():
             return
 
-        await self.show_next_question()
+        # Закрываем приём ответов досрочно: результаты и следующий вопрос
+        get_scheduler(self.session_code).next()
 
     async def handle_ping(self, data):
-        """Heartbeat"""
-        if self.player_id:
-            await self.update_player_heartbeat(self.player_id)
+        """Heartbeat (только память; в БД пишется лишь возвращение после таймаута)"""
+        if self.player_id and tracker.touch(self.player_id, self.session_code):
+            await self.mark_player_connected(self.player_id)
 
         await self.send(text_data=json.dumps({
             'type': 'pong'
@@ -416,61 +361,18 @@ class GameConsumer(AsyncWebsocketConsumer):
         player = await self.get_player_data(self.player_id)
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
+            frame({
                 'type': 'player_reaction',
                 'player_id': self.player_id,
                 'player_name': player['name'],
                 'emoji': emoji
-            }
+            })
         )
 
     # ========================================================================
     # ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ
     # ========================================================================
 
-    async def show_next_question(self):
-        """Показать следующий вопрос"""
-        # Получаем ТЕКУЩИЙ вопрос
-        question_data = await self.get_next_question()
-
-        if question_data is None:
-            # Вопросов больше нет — игра окончена
-            await self.finish_game()
-            return
-
-        # Broadcast вопроса всем
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'question',
-                'question': question_data
-            }
-        )
-
-        # ПОСЛЕ показа вопроса переходим к следующему
-        # (подготовка для следующего вызова show_next_question)
-        await self.move_to_next_question()
-
-    async def finish_game(self):
-        """Завершение игры"""
-        await self.update_session_state('finished')
-
-        # Получаем финальную таблицу лидеров
-        leaderboard = await self.get_leaderboard()
-
-        # Рассчитываем награды
-        awards = await self.calculate_awards()
-
-        # Broadcast финала
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'game_over',
-                'leaderboard': leaderboard,
-                'awards': awards
-            }
-        )
-
     async def send_session_state(self):
         """Отправить состояние сессии"""
         state = await self.get_session_state()
@@ -481,16 +383,8 @@ class GameConsumer(AsyncWebsocketConsumer):
         }))
 
     async def send_answer_stats(self):
-        """Отправить статистику ответов"""
-        stats = await self.get_answer_stats()
-
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'answer_stats',
-                **stats
-            }
-        )
+        """Отправить статистику ответов (планировщик склеивает частые обновления)"""
+        get_scheduler(self.session_code).answer_stats_changed()
 
     async def send_error(self, message):
         """Отправить ошибку"""
@@ -520,19 +414,27 @@ class GameConsumer(AsyncWebsocketConsumer):
             return
 
         await self.update_session_state('paused')
+        get_scheduler(self.session_code).pause()
 
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
+            frame({
                 'type': 'host_disconnected',
                 'message': 'Ведущий отключился, ждём...'
-            }
+            })
         )
 
     # ========================================================================
     # ОБРАБОТЧИКИ BROADCAST СОБЫТИЙ
     # ========================================================================
 
+    async def broadcast_frame(self, event):
+        """Broadcast: событие, уже сериализованное отправителем (frames.frame)"""
+        await self.send(text_data=event['text'])
+
+    # Ниже — обработчики событий без предварительной сериализации
+    # (каждый consumer кодирует сообщение сам)
+
     async def player_joined(self, event):
         """Broadcast: игрок присоединился"""
         await self.send(text_data=json.dumps(event))
@@ -614,33 +516,37 @@ class GameConsumer(AsyncWebsocketConsumer):
 
         return PlayerSerializer(player).data
 
-    @database_sync_to_async
-    def update_player_heartbeat(self, player_id):
-        """Обновить last_seen"""
-        try:
-            player = Player.objects.get(id=player_id)
-            player.update_last_seen()
-        except Player.DoesNotExist:
-            pass
+    async def mark_player_connected(self, player_id):
+        """Игрок снова на связи после таймаута"""
+        game = get_game_state(self.session_code)
+        if game is not None:
+            game.set_connected(player_id, True)
+            await self.send_answer_stats()
 
-    @database_sync_to_async
-    def mark_player_disconnected(self, player_id):
+        await database_sync_to_async(persist_connected)(player_id)
+
+    async def mark_player_disconnected(self, player_id):
         """Пометить игрока как отключенного"""
-        try:
-            player = Player.objects.get(id=player_id)
-            player.connected = False
-            player.save()
-        except Player.DoesNotExist:
-            pass
+        if not tracker.forget(player_id):
+            # Уже отключён sweeper'ом по таймауту
+            return
 
-    @database_sync_to_async
-    def check_if_host(self, player_id):
+        await database_sync_to_async(
+            Player.objects.filter(id=player_id).update
+        )(connected=False, last_seen=timezone.now())
+
+        await players_disconnected(self.session_code, [player_id])
+
+    async def check_if_host(self, player_id):
         """Проверка что игрок — ведущий"""
-        try:
-            player = Player.objects.get(id=player_id)
-            return player.is_host
-        except Player.DoesNotExist:
-            return False
+        game = get_game_state(self.session_code)
+        if game is not None:
+            return game.is_host(player_id)
+        return await self._check_if_host_in_db(player_id)
+
+    @database_sync_to_async
+    def _check_if_host_in_db(self, player_id):
+        return Player.objects.filter(id=player_id, is_host=True).exists()
 
     @database_sync_to_async
     def check_has_host(self):
@@ -660,106 +566,54 @@ class GameConsumer(AsyncWebsocketConsumer):
         session.host = player
         session.save()
 
-    @database_sync_to_async
-    def update_session_state(self, state):
+    async def update_session_state(self, state):
         """Обновить состояние сессии"""
-        session = GameSession.objects.get(code=self.session_code)
-        session.state = state
-        session.save()
+        game = await ensure_game_state(self.session_code)
+        await game.set_state(state)
 
-    @database_sync_to_async
-    def get_current_state(self):
+    async def get_current_state(self):
         """Получить текущее состояние"""
-        session = GameSession.objects.get(code=self.session_code)
-        return session.state
+        game = get_game_state(self.session_code)
+        if game is not None:
+            return game.state
+        return await self._get_state_from_db()
 
     @database_sync_to_async
-    def get_next_question(self):
-        """Получить текущий вопрос БЕЗ изменения счётчика"""
-        session = GameSession.objects.get(code=self.session_code)
+    def _get_state_from_db(self):
+        return GameSession.objects.values_list('state', flat=True).get(code=self.session_code)
 
-        # Получаем ТЕКУЩИЙ вопрос (не увеличиваем счётчик!)
-        question = session.get_current_question()
+    async def save_answer(self, player_id, question_uuid, choice_id, time_taken):
+        """Принять ответ и рассчитать очки (в памяти, запись в БД — фоном)"""
+        from .prompts import get_reply  # Этап 4
 
-        if question is None:
-            return None
-
-        return QuestionForPlayerSerializer(question).data
+        game = await ensure_game_state(self.session_code)
+        result = game.record_answer(player_id, question_uuid, choice_id, time_taken)
 
-    @database_sync_to_async
-    def move_to_next_question(self):
-        """Переход к следующему вопросу"""
-        session = GameSession.objects.get(code=self.session_code)
-        session.current_question += 1
-        session.save()
-        return session.current_question
-
-    @database_sync_to_async
-    def skip_current_question(self):
-        """Пропустить текущий вопрос"""
-        # Просто увеличиваем счётчик без начисления баллов
-        pass
+        if result is None:
+            return None
 
-    @database_sync_to_async
-    def save_answer(self, player_id, question_uuid, choice_id, time_taken):
-        """Сохранить ответ и рассчитать очки"""
+        # Получаем мотивирующую фразу
         try:
-            from .scoring import calculate_score
-            from .prompts import get_reply  # Этап 4
-
-            player = Player.objects.get(id=player_id)
-            question = Question.objects.get(uuid=question_uuid)
-            choice = Choice.objects.get(id=choice_id)
-
-            # Проверяем правильность
-            is_correct = choice.is_correct
-
-            # Рассчитываем очки
-            points = calculate_score(
-                is_correct=is_correct,
-                time_taken=time_taken,
-                time_limit=question.get_time_limit(),
-                current_streak=player.current_streak,
-                difficulty=question.difficulty
-            )
-
-            # Сохраняем ответ
-            Answer.objects.create(
-                player=player,
-                question=question,
-                choice=choice,
-                time_taken=time_taken,
-                is_correct=is_correct,
-                points_earned=points
-            )
-
-            # Обновляем игрока
-            player.increment_score(points)
-            if is_correct:
-                player.increment_streak()
-            else:
-                player.reset_streak()
+            reply = get_reply(result.is_correct, result.question.difficulty, game.topic)
+        except:
+            reply = "Правильно!" if result.is_correct else "Неправильно"
 
-            # Получаем мотивирующую фразу
-            try:
-                reply = get_reply(is_correct, question.difficulty, question.quiz.topic)
-            except:
-                reply = "Правильно!" if is_correct else "Неправильно"
-
-            return {
-                'is_correct': is_correct,
-                'points_earned': points,
-                'reply': reply
-            }
-
-        except Exception as e:
-            print(f"Error saving answer: {e}")
-            return None
+        return {
+            'is_correct': result.is_correct,
+            'points_earned': result.points_earned,
+            'reply': reply,
+            'all_answered': result.completes_question
+        }
 
     @database_sync_to_async
     def get_session_state(self):
         """Получить состояние сессии"""
-        session = GameSession.objects.get(code=self.session_code)
+        session = (
+            GameSession.objects
+            .select_related('quiz')
+            .prefetch_related('players')
+            .get(code=self.session_code)
+        )
         return GameSessionSerializer(session).data
 
     @database_sync_to_async
@@ -768,57 +622,44 @@ class GameConsumer(AsyncWebsocketConsumer):
         player = Player.objects.get(id=player_id)
         return PlayerSerializer(player).data
 
-    @database_sync_to_async
-    def get_answer_stats(self):
-        """Получить статистику ответов на текущий вопрос"""
-        session = GameSession.objects.get(code=self.session_code)
-        question = session.get_current_question()
 
-        if not question:
-            return {}
+class GenerationConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket для отслеживания фоновой генерации квиза
 
-        # Сколько ответили
-        total_players = session.players.filter(connected=True).count()
-        answered_count = Answer.objects.filter(
-            player__session=session,
-            question=question
-        ).count()
+    URL: ws://localhost:8000/ws/generation/{job_id}/
 
-        # Сколько правильных
-        correct_count = Answer.objects.filter(
-            player__session=session,
-            question=question,
-            is_correct=True
-        ).count()
+    События к клиенту:
+    - generation_status: статус/прогресс задачи (сразу после подключения
+      и при каждом изменении; status done|failed — задача завершена)
+    """
 
-        return {
-            'answered': f"{answered_count}/{total_players}",
-            'correct': correct_count
-        }
+    async def connect(self):
+        """Подключение к WebSocket"""
+        self.job_id = self.scope['url_route']['kwargs']['job_id']
+        self.group_name = job_group(self.job_id)
 
-    @database_sync_to_async
-    def get_leaderboard(self):
-        """Получить таблицу лидеров"""
-        session = GameSession.objects.get(code=self.session_code)
-        players = session.players.all().order_by('-score', 'joined_at')
-
-        return [
-            {
-                'position': idx + 1,
-                'player_id': player.id,
-                'name': player.name,
-                'score': player.score,
-                'current_streak': player.current_streak,
-                'connected': player.connected,
-                'is_host': player.is_host,
-            }
-            for idx, player in enumerate(players)
-        ]
+        payload = await self.get_job_payload()
+        if payload is None:
+            await self.close(code=4004)
+            return
 
-    @database_sync_to_async
-    def calculate_awards(self):
-        '''Рассчитать награды для финального экрана'''
-        from .awards import calculate_awards
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
 
-        session = GameSession.objects.get(code=self.session_code)
-        return calculate_awards(session)
\ No newline at end of file
+        # Задача могла завершиться до подключения — сразу отдаём текущий статус
+        await self.send(text_data=json.dumps(payload))
+
+    async def disconnect(self, close_code):
+        """Отключение от WebSocket"""
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def broadcast_frame(self, event):
+        """Broadcast: событие, уже сериализованное отправителем (frames.frame)"""
+        await self.send(text_data=event['text'])
+
+    @database_sync_to_async
+    def get_job_payload(self):
+        """Текущий статус задачи (None если не найдена)"""
+        job = GenerationJob.objects.filter(uuid=self.job_id).first()
+        return job_payload(job) if job else None
@@ -0,0 +1,47 @@
+# quiz_app/frames.py
+
+import json
+
+from django.conf import settings
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+# Быстрый JSON-энкодер (orjson), если он установлен и включён в настройках
+USE_FAST_JSON = getattr(settings, 'QUIZ_FAST_JSON', False) and orjson is not None
+
+
+def encode(payload) -> str:
+    """
+    Сериализует событие для отправки клиентам
+
+    Args:
+        payload: dict события ({'type': 'question', ...})
+
+    Returns:
+        str: JSON-строка
+    """
+    if USE_FAST_JSON:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(payload)
+
+
+def frame(payload) -> dict:
+    """
+    Group message с заранее сериализованным событием
+
+    Событие кодируется один раз отправителем, а consumer'ы комнаты
+    пересылают готовую строку клиентам как есть (см. GameConsumer.broadcast_frame).
+
+    Args:
+        payload: dict события ({'type': 'question', ...})
+
+    Returns:
+        dict: сообщение для channel_layer.group_send
+    """
+    return {
+        'type': 'broadcast.frame',
+        'text': encode(payload)
+    }
@@ -0,0 +1,548 @@
+# quiz_app/game_state.py
+
+import asyncio
+import logging
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import GameSession, Player, Answer, Question, GenerationJob
+from .scoring import compile_scoring, CompiledScoring
+from .leaderboard import RankedLeaderboard
+from .session_stats import RunningStats
+from . import question_payloads, awards
+
+logger = logging.getLogger(__name__)
+
+# Как часто накопленные ответы пишутся в БД одной транзакцией (сек)
+ANSWER_FLUSH_INTERVAL = getattr(settings, 'QUIZ_ANSWER_FLUSH_INTERVAL', 0.25)
+
+
+# ============================================================================
+# СОСТОЯНИЕ ВОПРОСОВ И ИГРОКОВ
+# ============================================================================
+
+@dataclass
+class QuestionState:
+    """
+    Вопрос квиза, загруженный в память
+
+    Attributes:
+        id: ID вопроса в БД
+        uuid: UUID вопроса (строкой, как его присылает клиент)
+        order: порядковый номер
+        text: текст вопроса (для статистики сессии)
+        difficulty: сложность
+        time_limit: время на вопрос (своё или из квиза)
+        choices: {choice_id: is_correct}
+        correct_choice_id: ID правильного варианта
+        multiplier: множитель очков за сложность (из формулы очков сессии)
+    """
+    id: int
+    uuid: str
+    order: int
+    text: str
+    difficulty: str
+    time_limit: int
+    choices: Dict[int, bool]
+    correct_choice_id: Optional[int] = None
+    multiplier: float = 1.0
+
+
+@dataclass
+class PlayerState:
+    """Игрок сессии, загруженный в память"""
+    id: int
+    name: str
+    score: int = 0
+    current_streak: int = 0
+    max_streak: int = 0
+    connected: bool = True
+    is_host: bool = False
+    joined_at: Optional[datetime] = None
+
+
+@dataclass
+class AnswerResult:
+    """Результат обработки ответа в памяти"""
+    player: PlayerState
+    question: QuestionState
+    choice_id: int
+    time_taken: float
+    is_correct: bool
+    points_earned: int
+    completes_question: bool = False
+
+
+# ============================================================================
+# СОСТОЯНИЕ ИГРОВОЙ СЕССИИ
+# ============================================================================
+
+class GameState:
+    """
+    Авторитетное состояние игровой сессии в памяти процесса
+
+    Загружается один раз при старте игры. Все consumer'ы комнаты работают
+    с одним объектом: ответы, статистика и таблица лидеров считаются в памяти,
+    а БД пишется фоновым writer'ом в порядке поступления (durable log).
+    Ответы копятся и раз в ANSWER_FLUSH_INTERVAL уходят в БД пачкой:
+    bulk_create для Answer и bulk_update для Player в одной транзакции.
+
+    Комната должна обслуживаться одним ASGI процессом.
+    """
+
+    def __init__(self, session, questions, players, scoring: CompiledScoring):
+        self.code = session.code
+        self.session_id = session.id
+        self.quiz_id = session.quiz_id
+        self.topic = session.quiz.topic
+        self.state = session.state
+        self.current_question = session.current_question
+        # Формула очков, скомпилированная при загрузке (записана в сессию)
+        self.scoring = scoring
+
+        self.questions: List[QuestionState] = questions
+        self.questions_by_uuid: Dict[str, QuestionState] = {q.uuid: q for q in questions}
+
+        self.players: Dict[int, PlayerState] = {p.id: p for p in players}
+        self.connected: Set[int] = {p.id for p in players if p.connected}
+        self.ranking = RankedLeaderboard(players)
+
+        # {question_uuid: {player_id, ...}}
+        self.answered: Dict[str, Set[int]] = {}
+        self.correct_counts: Dict[str, int] = {}
+        # {question_uuid: {choice_id: сколько выбрали}}
+        self.choice_counts: Dict[str, Dict[int, int]] = {}
+        # Статистика сессии, замораживается в SessionStats при завершении
+        self.stats = RunningStats()
+
+        # Вопрос, на который сейчас принимаются ответы (управляет планировщик)
+        self.open_question_uuid: Optional[str] = None
+
+        self._writes = asyncio.Queue()
+        self._writer = None
+
+        # Ответы, ещё не записанные в БД, и игроки с изменённым счётом
+        self._pending_answers: List[Answer] = []
+        self._dirty_players: Set[int] = set()
+        self._flush_handle = None
+
+    # ------------------------------------------------------------------------
+    # Вопросы
+    # ------------------------------------------------------------------------
+
+    @property
+    def total_questions(self):
+        return len(self.questions)
+
+    @property
+    def active_question(self) -> Optional[QuestionState]:
+        """Вопрос, который сейчас показан (current_question указывает на следующий)"""
+        index = self.current_question - 1
+        if 0 <= index < len(self.questions):
+            return self.questions[index]
+        return None
+
+    def question_at(self, index) -> Optional[QuestionState]:
+        if 0 <= index < len(self.questions):
+            return self.questions[index]
+        return None
+
+    def has_more_questions(self):
+        """Есть ли ещё вопросы"""
+        return self.current_question < len(self.questions)
+
+    async def load_more_questions(self):
+        """
+        Догружает вопросы, сохранённые после загрузки состояния
+        (потоковая генерация ещё идёт)
+
+        Returns:
+            int: сколько вопросов добавлено
+        """
+        after = self.questions[-1].order if self.questions else 0
+        added = await database_sync_to_async(_load_questions)(self.quiz_id, self.scoring, after)
+        for question in added:
+            self.questions.append(question)
+            self.questions_by_uuid[question.uuid] = question
+        return len(added)
+
+    async def generation_pending(self):
+        """Идёт ли ещё генерация вопросов этого квиза"""
+        return await database_sync_to_async(
+            GenerationJob.objects.filter(quiz_id=self.quiz_id, status__in=['queued', 'running']).exists
+        )()
+
+    def advance(self):
+        """Переход к следующему вопросу (после показа текущего)"""
+        self.current_question += 1
+        self.enqueue_write(_write_current_question, self.session_id, self.current_question)
+        return self.current_question
+
+    def open_answers(self, question):
+        """Начать приём ответов на вопрос"""
+        self.open_question_uuid = question.uuid
+
+    def close_answers(self):
+        """Закончить приём ответов (время вышло или все ответили)"""
+        self.open_question_uuid = None
+
+    async def set_state(self, state):
+        """Меняет состояние сессии в памяти и в БД"""
+        self.state = state
+        await database_sync_to_async(_write_session_state)(self.session_id, state)
+
+    # ------------------------------------------------------------------------
+    # Игроки
+    # ------------------------------------------------------------------------
+
+    def upsert_player(self, data):
+        """Добавляет или обновляет игрока по данным PlayerSerializer"""
+        player = self.players.get(data['id'])
+        if player is None:
+            player = PlayerState(
+                id=data['id'],
+                name=data['name'],
+                score=data['score'],
+                current_streak=data['current_streak'],
+                max_streak=data['max_streak'],
+                is_host=data['is_host'],
+                joined_at=parse_datetime(data['joined_at']) if data.get('joined_at') else timezone.now(),
+            )
+            self.players[player.id] = player
+            self.ranking.add(player)
+        self.set_connected(player.id, data['connected'])
+        return player
+
+    def set_connected(self, player_id, connected):
+        player = self.players.get(player_id)
+        if player is None:
+            return
+        player.connected = connected
+        if connected:
+            self.connected.add(player_id)
+        else:
+            self.connected.discard(player_id)
+
+    def set_host(self, player_id):
+        player = self.players.get(player_id)
+        if player is not None:
+            player.is_host = True
+
+    def is_host(self, player_id):
+        player = self.players.get(player_id)
+        return player is not None and player.is_host
+
+    # ------------------------------------------------------------------------
+    # Ответы
+    # ------------------------------------------------------------------------
+
+    def record_answer(self, player_id, question_uuid, choice_id, time_taken) -> Optional[AnswerResult]:
+        """
+        Принимает ответ игрока: проверка, подсчёт очков, обновление серии
+
+        Не содержит await — вызовы из разных consumer'ов не пересекаются.
+
+        Returns:
+            AnswerResult или None, если ответ не принят (приём ответов
+            на вопрос закрыт, неизвестный игрок/вариант или повторный ответ)
+        """
+        if str(question_uuid) != self.open_question_uuid:
+            return None
+
+        player = self.players.get(player_id)
+        question = self.questions_by_uuid.get(str(question_uuid))
+        if player is None or question is None:
+            return None
+
+        try:
+            choice_id = int(choice_id)
+        except (TypeError, ValueError):
+            return None
+        if choice_id not in question.choices:
+            return None
+
+        answered = self.answered.setdefault(question.uuid, set())
+        if player_id in answered:
+            return None
+
+        is_correct = question.choices[choice_id]
+        points = self.scoring.score(
+            is_correct, time_taken, question.time_limit, player.current_streak, question.multiplier
+        )
+
+        answered.add(player_id)
+        distribution = self.choice_counts.setdefault(question.uuid, dict.fromkeys(question.choices, 0))
+        distribution[choice_id] += 1
+        player.score += points
+        if is_correct:
+            self.correct_counts[question.uuid] = self.correct_counts.get(question.uuid, 0) + 1
+            player.current_streak += 1
+            if player.current_streak > player.max_streak:
+                player.max_streak = player.current_streak
+        else:
+            player.current_streak = 0
+        self.ranking.update(player)
+        self.stats.add(player.name, question.id, question.text, question.difficulty, is_correct, time_taken)
+
+        result = AnswerResult(
+            player=player,
+            question=question,
+            choice_id=choice_id,
+            time_taken=time_taken,
+            is_correct=is_correct,
+            points_earned=points,
+        )
+        # Ответ, на котором набралось «все ответили», — ровно один
+        result.completes_question = self.all_answered(question.uuid)
+
+        self._pending_answers.append(Answer(
+            player_id=player.id,
+            question_id=question.id,
+            choice_id=choice_id,
+            time_taken=time_taken,
+            is_correct=is_correct,
+            points_earned=points
+        ))
+        self._dirty_players.add(player.id)
+        self._schedule_answer_flush()
+        return result
+
+    def all_answered(self, question_uuid):
+        """Все ли подключённые игроки ответили"""
+        answered = self.answered.get(str(question_uuid), ())
+        return len(answered) >= len(self.connected)
+
+    def answer_stats(self):
+        """
+        Статистика ответов на текущий вопрос (счётчики в памяти)
+
+        Returns:
+            dict: {'answered': '3/5', 'correct': 2, 'distribution': {choice_id: count}}
+        """
+        question = self.active_question
+        if question is None:
+            return {}
+
+        return {
+            'answered': f"{len(self.answered.get(question.uuid, ()))}/{len(self.connected)}",
+            'correct': self.correct_counts.get(question.uuid, 0),
+            'distribution': dict(self.choice_counts.get(question.uuid) or dict.fromkeys(question.choices, 0))
+        }
+
+    def leaderboard(self, top=None):
+        """Таблица лидеров (по очкам, при равенстве — кто раньше подключился)"""
+        return self.ranking.top(top)
+
+    def stats_snapshot(self):
+        """Поля SessionStats по счётчикам в памяти"""
+        return self.stats.snapshot(
+            (p.score for p in self.players.values()),
+            len(self.questions)
+        )
+
+    # ------------------------------------------------------------------------
+    # Фоновая запись в БД
+    # ------------------------------------------------------------------------
+
+    def enqueue_write(self, func, *args):
+        """Ставит синхронную запись в БД в очередь (выполняется по порядку)"""
+        self._writes.put_nowait((func, args))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._run_writer())
+
+    async def _run_writer(self):
+        while not self._writes.empty():
+            func, args = await self._writes.get()
+            try:
+                await database_sync_to_async(func)(*args)
+            except Exception as e:
+                logger.error(f"Game {self.code}: write {func.__name__} failed: {e}")
+            finally:
+                self._writes.task_done()
+
+    def _schedule_answer_flush(self):
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                ANSWER_FLUSH_INTERVAL, self._flush_answers
+            )
+
+    def _flush_answers(self):
+        """Отдаёт накопленные за тик ответы writer'у одной пачкой"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending_answers:
+            return
+
+        answers, self._pending_answers = self._pending_answers, []
+        players = [
+            Player(
+                id=p.id,
+                score=p.score,
+                current_streak=p.current_streak,
+                max_streak=p.max_streak
+            )
+            for p in (self.players[pid] for pid in self._dirty_players)
+        ]
+        self._dirty_players = set()
+
+        self.enqueue_write(_write_answer_batch, answers, players)
+
+    async def flush(self):
+        """Дождаться записи всех накопленных изменений"""
+        self._flush_answers()
+        await self._writes.join()
+
+
+# ============================================================================
+# ЗАПИСЬ В БД (выполняется writer'ом в потоке БД)
+# ============================================================================
+
+def _write_answer_batch(answers, players):
+    with transaction.atomic():
+        # Повтор уже записанного ответа (unique player+question) не валит пачку
+        Answer.objects.bulk_create(answers, ignore_conflicts=True)
+        Player.objects.bulk_update(players, ['score', 'current_streak', 'max_streak'])
+
+
+def _write_current_question(session_id, current_question):
+    GameSession.objects.filter(id=session_id).update(current_question=current_question)
+
+
+def _write_session_state(session_id, state):
+    fields = {'state': state}
+    if state == 'running':
+        GameSession.objects.filter(id=session_id, started_at__isnull=True).update(started_at=timezone.now())
+    elif state == 'finished':
+        fields['finished_at'] = timezone.now()
+    GameSession.objects.filter(id=session_id).update(**fields)
+
+
+# ============================================================================
+# РЕЕСТР СОСТОЯНИЙ
+# ============================================================================
+
+_states: Dict[str, GameState] = {}
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _load_questions(quiz_id, scoring, after_order=0):
+    """Вопросы квиза с order > after_order (синхронно)"""
+    questions = []
+    queryset = (
+        Question.objects
+        .filter(quiz_id=quiz_id, order__gt=after_order)
+        .select_related('quiz')
+        .prefetch_related('choices')
+        .order_by('order')
+    )
+    for q in queryset:
+        choices = {c.id: c.is_correct for c in q.choices.all()}
+        questions.append(QuestionState(
+            id=q.id,
+            uuid=str(q.uuid),
+            order=q.order,
+            text=q.text,
+            difficulty=q.difficulty,
+            time_limit=q.get_time_limit(),
+            choices=choices,
+            correct_choice_id=next((cid for cid, ok in choices.items() if ok), None),
+            multiplier=scoring.multiplier(q.difficulty),
+        ))
+    return questions
+
+
+def _build_state(code):
+    """Загружает состояние сессии из БД (синхронно)"""
+    session = GameSession.objects.select_related('quiz', 'scoring_profile', 'quiz__scoring_profile').get(code=code)
+
+    # Формула очков фиксируется в сессии при первой загрузке и дальше не меняется
+    scoring = compile_scoring(session.record_scoring_config())
+    questions = _load_questions(session.quiz_id, scoring)
+
+    # Payload'ы вопросов готовятся один раз на старте — дальше из кеша
+    question_payloads.warm(session.quiz_id)
+    # Правила наград из админки — тоже (game_over обходится без запроса)
+    awards.custom_rules()
+
+    players = [
+        PlayerState(
+            id=p.id,
+            name=p.name,
+            score=p.score,
+            current_streak=p.current_streak,
+            max_streak=p.max_streak,
+            connected=p.connected,
+            is_host=p.is_host,
+            joined_at=p.joined_at,
+        )
+        for p in session.players.all()
+    ]
+
+    state = GameState(session, questions, players, scoring)
+
+    # Восстанавливаем уже данные ответы (перезапуск процесса посреди игры)
+    answers = Answer.objects.filter(player__session=session).order_by('answered_at', 'id').values_list(
+        'player_id', 'question__uuid', 'choice_id', 'is_correct', 'time_taken'
+    )
+    for player_id, question_uuid, choice_id, is_correct, time_taken in answers:
+        key = str(question_uuid)
+        question = state.questions_by_uuid.get(key)
+        if question is not None and player_id in state.players:
+            state.stats.add(
+                state.players[player_id].name, question.id, question.text,
+                question.difficulty, is_correct, time_taken
+            )
+        state.answered.setdefault(key, set()).add(player_id)
+        distribution = state.choice_counts.setdefault(key, {})
+        distribution[choice_id] = distribution.get(choice_id, 0) + 1
+        if is_correct:
+            state.correct_counts[key] = state.correct_counts.get(key, 0) + 1
+
+    return state
+
+
+async def load_game_state(code) -> GameState:
+    """Загружает (или перезагружает) состояние сессии из БД"""
+    lock = _locks.setdefault(code, asyncio.Lock())
+    async with lock:
+        previous = _states.get(code)
+        if previous is not None:
+            await previous.flush()
+        state = await database_sync_to_async(_build_state)(code)
+        _states[code] = state
+        return state
+
+
+async def ensure_game_state(code) -> GameState:
+    """Возвращает состояние сессии, загружая его при первом обращении"""
+    state = _states.get(code)
+    if state is not None:
+        return state
+
+    lock = _locks.setdefault(code, asyncio.Lock())
+    async with lock:
+        state = _states.get(code)
+        if state is None:
+            state = await database_sync_to_async(_build_state)(code)
+            _states[code] = state
+        return state
+
+
+def get_game_state(code) -> Optional[GameState]:
+    """Состояние сессии, если оно загружено в этом процессе"""
+    return _states.get(code)
+
+
+def drop_game_state(code):
+    """Выгружает состояние сессии из памяти"""
+    _states.pop(code, None)
+    _locks.pop(code, None)
@@ -3,19 +3,23 @@
 # ============================================================================
 
 import json
-import time
+import queue
 import random
+import asyncio
+import threading
 import hashlib
 import logging
 from typing import List, Optional
 
 import openai
-from openai import OpenAI
-from pydantic import BaseModel, Field, validator
-from django.core.cache import cache
+from openai import AsyncOpenAI
+from pydantic import BaseModel, Field, ValidationError, validator
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
 
 from .models import Quiz, Question, Choice
+from . import generation_cache, question_bank, question_payloads
 from .prompts import build_prompt, get_difficulty_curve
 
 logger = logging.getLogger(__name__)
@@ -33,6 +37,21 @@ DIFFICULTY_TIME_MAP = {
     'fun': 10         # Шуточный: 10 сек
 }
 
+# Одновременных запросов к LLM на процесс (фоновые задачи и синхронные вызовы)
+LLM_CONCURRENCY = getattr(settings, 'QUIZ_LLM_CONCURRENCY', 2)
+llm_semaphore = threading.BoundedSemaphore(LLM_CONCURRENCY)
+
+# Потоковая генерация: вопросы сохраняются по мере получения из ответа LLM
+STREAM_GENERATION = getattr(settings, 'QUIZ_STREAM_GENERATION', True)
+
+# Вопросов в одном запросе к LLM (части квиза генерируются параллельно)
+CHUNK_SIZE = getattr(settings, 'QUIZ_GENERATION_CHUNK_SIZE', 5)
+
+# Сколько отклонённых вопросов (с причинами) сохранять в метриках генерации
+MAX_REJECTIONS_RECORDED = 50
+
+SYSTEM_PROMPT = "You are a helpful assistant that generates quiz questions in JSON format. Always respond with valid JSON only."
+
 # ============================================================================
 # PYDANTIC СХЕМЫ ДЛЯ ВАЛИДАЦИИ
 # ============================================================================
@@ -95,30 +114,13 @@ def generate_cache_key(topic, count, difficulty_curve):
     return f"quiz:{PROMPT_VERSION}:{QUESTION_SCHEMA_VERSION}:{hash_part}"
 
 
-def generate_questions(topic, count, difficulty='medium', player_count=1, retries=3):
+def get_llm_client():
     """
-    Генерирует вопросы через OpenAI API с retry логикой
-
-    Args:
-        topic: тема квиза
-        count: количество вопросов
-        difficulty: базовая сложность (используется для кривой)
-        player_count: количество игроков (для адаптации сложности)
-        retries: количество попыток при ошибке
+    Асинхронный клиент OpenAI по настройкам проекта
 
     Returns:
-        list[QuestionSchema]: список сгенерированных вопросов
-
-    Raises:
-        ValueError: если генерация не удалась после всех попыток
+        tuple: (AsyncOpenAI, имя модели)
     """
-    # Получаем кривую сложности
-    difficulty_curve = get_difficulty_curve(count, player_count)
-
-    # Строим промпт
-    prompt = build_prompt(topic, count, difficulty_curve, player_count)
-
-    # Получаем настройки из settings
     api_key = getattr(settings, 'OPENAI_API_KEY', None)
     if not api_key:
         raise ValueError("OPENAI_API_KEY не найден в настройках")
@@ -127,75 +129,89 @@ def generate_questions(topic, count, difficulty='medium', player_count=1, retrie
     model = getattr(settings, 'OPENAI_MODEL', 'openai/gpt-5.2-chat')
 
     # ✅ НОВЫЙ API: создаём клиент
-    client = OpenAI(
+    client = AsyncOpenAI(
         api_key=api_key,
         base_url=api_base  # Для локальной LLM
     )
+    return client, model
 
-    for attempt in range(retries):
-        try:
-            # ✅ НОВЫЙ API: вызов через client
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system",
-                     "content": "You are a helpful assistant that generates quiz questions in JSON format. Always respond with valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                # response_format={"type": "json_object"},  # Закомментировано для MLC
-                temperature=0.7,
-                max_tokens=3000,
-                timeout=60
-            )
-
-            # ✅ НОВЫЙ API: получение ответа
-            content = response.choices[0].message.content
-
-            # Очистка от markdown (на случай если модель добавит ```)
-            content = content.strip()
-            if content.startswith('```json'):
-                content = content.replace('```json', '', 1)
-            if content.startswith('```'):
-                content = content.replace('```', '', 1)
-            if content.endswith('```'):
-                content = content.rsplit('```', 1)[0]
-            content = content.strip()
-
-            # Парсим JSON
-            data = json.loads(content)
 
-            # Валидация через Pydantic
-            questions = [QuestionSchema(**q) for q in data.get('questions', [])]
+def parse_llm_json(content):
+    """
+    Разбирает JSON из ответа LLM
 
-            if len(questions) != count:
-                raise ValueError(f"Ожидалось {count} вопросов, получено {len(questions)}")
+    Args:
+        content: текст ответа (может быть обёрнут в ```json)
 
-            logger.info(f"Successfully generated {count} questions for '{topic}'")
-            return questions
+    Returns:
+        dict: {'questions': [...]}
+    """
+    # Очистка от markdown (на случай если модель добавит ```)
+    content = content.strip()
+    if content.startswith('```json'):
+        content = content.replace('```json', '', 1)
+    if content.startswith('```'):
+        content = content.replace('```', '', 1)
+    if content.endswith('```'):
+        content = content.rsplit('```', 1)[0]
+    content = content.strip()
+
+    data = json.loads(content)
+    if isinstance(data, list):
+        data = {'questions': data}
+    return data
+
+
+def generate_questions(topic, count, difficulty='medium', player_count=1, retries=3, metrics=None,
+                       prefilled=None):
+    """
+    Генерирует вопросы через OpenAI API с retry логикой
 
-        except Exception as e:
-            logger.error(f"Attempt {attempt + 1}/{retries} failed: {type(e).__name__}: {e}")
+    Кривая сложности делится на части по CHUNK_SIZE, части запрашиваются
+    параллельно (см. ChunkedGeneration). Каждый вопрос валидируется
+    отдельно: валидные сохраняются, отклонённые записываются с причиной,
+    повторно запрашиваются только пустые позиции кривой.
 
-            if attempt == retries - 1:
-                raise ValueError(f"Не удалось сгенерировать вопросы после {retries} попыток: {str(e)}")
+    Args:
+        topic: тема квиза
+        count: количество вопросов
+        difficulty: базовая сложность (используется для кривой)
+        player_count: количество игроков (для адаптации сложности)
+        retries: количество попыток при ошибке
+        metrics: dict, который заполняется метриками генерации
+            (см. ChunkedGeneration.metrics)
+        prefilled: {позиция: данные вопроса} — уже готовые позиции
+            (например, из банка вопросов), LLM генерирует только остальные
 
-            # Exponential backoff + jitter
-            wait_time = (2 ** attempt) + random.uniform(0, 1)
-            logger.warning(f"Waiting {wait_time:.2f}s before retry...")
-            time.sleep(wait_time)
+    Returns:
+        list[QuestionSchema]: список сгенерированных вопросов
 
-    raise ValueError("Исчерпаны все попытки генерации")
+    Raises:
+        ValueError: если генерация не удалась после всех попыток
+    """
+    generation = ChunkedGeneration(topic, count, player_count, retries=retries, prefilled=prefilled)
+    try:
+        return generation.run()
+    finally:
+        if metrics is not None:
+            metrics.update(generation.metrics())
 
 
-def cached_generate(topic, count, difficulty='medium', player_count=1):
+def cached_generate(topic, count, difficulty='medium', player_count=1, metrics=None):
     """
     Генерация с кешированием
 
+    Кеш хранится в БД (generation_cache): общий для всех процессов,
+    с LRU-вытеснением и счётчиками попаданий/промахов. При промахе
+    позиции кривой сначала заполняются из банка вопросов (question_bank),
+    LLM генерирует только недостающие.
+
     Args:
         topic: тема квиза
         count: количество вопросов
         difficulty: базовая сложность
         player_count: количество игроков
+        metrics: dict для метрик генерации (не заполняется при попадании в кеш)
 
     Returns:
         list[QuestionSchema]: список вопросов (из кеша или свежие)
@@ -204,83 +220,591 @@ def cached_generate(topic, count, difficulty='medium', player_count=1):
     cache_key = generate_cache_key(topic, count, difficulty_curve)
 
     # Проверяем кеш
-    cached = cache.get(cache_key)
+    # Точный ключ, иначе — вопросы с похожими темами под ту же кривую
+    cached = generation_cache.get(cache_key) or generation_cache.find_similar(topic, difficulty_curve)
     if cached:
         logger.info(f"Cache hit for topic='{topic}', count={count}")
         return [QuestionSchema(**q) for q in cached]
 
+    prefilled = question_bank.draw(topic, difficulty_curve)
+    if len(prefilled) == count:
+        logger.info(f"Question bank hit for topic='{topic}', count={count}")
+        return [QuestionSchema(**prefilled[i]) for i in range(count)]
+
     # Генерируем
     logger.info(f"Generating questions for topic='{topic}', count={count}")
-    result = generate_questions(topic, count, difficulty, player_count)
+    result = generate_questions(
+        topic, count, difficulty, player_count, metrics=metrics, prefilled=prefilled
+    )
 
-    # Кешируем на 7 дней
-    cache.set(cache_key, [q.dict() for q in result], timeout=60 * 60 * 24 * 7)
+    # Кешируем (TTL — QUIZ_GENERATION_CACHE_TTL)
+    generation_cache.store(cache_key, [q.dict() for q in result], topic, count)
 
     return result
 
 
-def save_questions_to_quiz(quiz, questions):
+# ============================================================================
+# ПОТОКОВАЯ ГЕНЕРАЦИЯ
+# ============================================================================
+
+class QuestionStreamParser:
+    """
+    Инкрементальный разбор JSON-ответа LLM
+
+    Получает текст кусками по мере генерации и отдаёт каждый вопрос,
+    как только закрылся его объект. Вопросом считается любой JSON-объект,
+    лежащий внутри массива ({"questions": [{...}, ...]} или [{...}, ...]),
+    поэтому markdown-обёртка и текст вокруг JSON не мешают.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._stack = []        # открытые '{' и '['
+        self._in_string = False
+        self._escape = False
+        self._start = None      # начало текущего вопроса в _buffer
+        self._length = 0
+        self.errors = []        # объекты, которые не разобрались как JSON
+
+    def feed(self, text):
+        """
+        Добавляет кусок ответа
+
+        Returns:
+            list[dict]: вопросы, закрывшиеся в этом куске
+        """
+        found = []
+        for ch in text:
+            self._buffer.append(ch)
+            pos = self._length
+            self._length += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if ch == '{' and self._stack[-1:] == ['['] and self._start is None:
+                    self._start = pos
+                self._stack.append(ch)
+            elif ch in '}]':
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if ch == '}' and self._start is not None and self._stack[-1:] == ['[']:
+                    raw = ''.join(self._buffer[self._start:pos + 1])
+                    self._start = None
+                    try:
+                        found.append(json.loads(raw))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping malformed streamed question: {e}")
+                        self.errors.append(f"invalid JSON: {e}")
+
+        # Уже разобранный текст больше не нужен
+        if self._start is None:
+            self._buffer = []
+            self._length = 0
+        return found
+
+
+def stream_questions(topic, count, player_count=1, on_question=None, retries=3, metrics=None,
+                     prefilled=None):
     """
-    Сохраняет сгенерированные вопросы в БД
+    Генерирует вопросы потоком: каждый вопрос валидируется и отдаётся
+    в on_question сразу после того, как LLM его дописала
+
+    Части кривой сложности генерируются параллельно; вопросы отдаются
+    строго по порядку слотов, поэтому первые вопросы доступны, как только
+    их допишет первая часть.
 
     Args:
-        quiz: экземпляр Quiz
-        questions: список QuestionSchema
+        topic: тема квиза
+        count: количество вопросов
+        player_count: количество игроков
+        on_question: callback(QuestionSchema, index) для каждого готового вопроса
+        retries: количество попыток
+        metrics: dict, который заполняется метриками генерации
+        prefilled: {позиция: данные вопроса} — уже готовые позиции
 
     Returns:
-        int: количество созданных вопросов
+        list[QuestionSchema]: все полученные вопросы
+
+    Raises:
+        ValueError: если после всех попыток вопросов меньше count
     """
-    created_count = 0
-
-    for idx, q in enumerate(questions):
-        # ✅ ДОБАВЛЕНО: Вычисляем время по сложности
-        question_time = DIFFICULTY_TIME_MAP.get(q.difficulty, 0)
-
-        # Создаём вопрос
-        question = Question.objects.create(
-            quiz=quiz,
-            order=idx + 1,
-            text=q.text,
-            difficulty=q.difficulty,
-            explanation=q.explanation,
-            image_url=q.image_url or '',
-            time_limit=question_time,  # ✅ ИЗМЕНЕНО: используем время по сложности
-            generated_by_model=True
+    generation = ChunkedGeneration(
+        topic, count, player_count, stream=True, retries=retries, prefilled=prefilled
+    )
+    try:
+        return generation.run(on_question)
+    finally:
+        if metrics is not None:
+            metrics.update(generation.metrics())
+
+
+# ============================================================================
+# ПАРАЛЛЕЛЬНАЯ ГЕНЕРАЦИЯ ПО ЧАСТЯМ
+# ============================================================================
+
+_CHUNK_DONE = object()
+
+
+class ChunkedGeneration:
+    """
+    Генерация квиза частями
+
+    Кривая сложности делится на куски по CHUNK_SIZE слотов, куски
+    запрашиваются параллельно через AsyncOpenAI (общий лимит — llm_semaphore).
+    Каждый вопрос валидируется отдельно и занимает свободный слот своего
+    куска; невалидные и повторы (по тексту) отбрасываются с записью причины
+    в rejections. Следующая попытка запрашивает только пустые слоты.
+    Слоты из prefilled (банк вопросов) не генерируются вовсе.
+
+    Event loop работает в отдельном потоке, а готовые вопросы отдаются
+    в вызывающий поток по порядку слотов — там же их можно писать в БД.
+    """
+
+    def __init__(self, topic, count, player_count=1, stream=False, retries=3, prefilled=None):
+        self.topic = topic
+        self.count = count
+        self.player_count = player_count
+        self.stream = stream
+        self.retries = retries
+
+        self.curve = get_difficulty_curve(count, player_count)
+        self.slots: List[Optional[QuestionSchema]] = [None] * count
+        self.rejections: List[dict] = []
+
+        self._seen_texts = set()
+        self._prefilled = 0
+        for index, data in (prefilled or {}).items():
+            question = QuestionSchema(**data)
+            self.slots[index] = question
+            self._seen_texts.add(question.text.strip().lower())
+            self._prefilled += 1
+
+        # Счётчики для метрик
+        self._attempt = 0
+        self._requests = 0
+        self._follow_ups = 0
+        self._received = 0
+        self._rejected = 0
+        # Вопросы, сохранённые из ответов, где были и отклонённые
+        # (раньше такой ответ выбрасывался целиком)
+        self._salvaged = 0
+        self._partial_items = 0
+
+        self._ready = queue.Queue()
+        self._loop = None
+        self._task = None
+        self._error = None
+
+    def run(self, on_question=None):
+        """
+        Генерирует все слоты
+
+        Args:
+            on_question: callback(QuestionSchema, index), вызывается
+                в этом потоке по порядку слотов
+
+        Returns:
+            list[QuestionSchema]: вопросы в порядке кривой сложности
+
+        Raises:
+            ValueError: если после всех попыток остались пустые слоты
+        """
+        worker = threading.Thread(target=self._run_loop, name='quiz-generation-chunks', daemon=True)
+        worker.start()
+
+        # Готовые слоты отдаются сразу, не дожидаясь LLM
+        if self._prefilled:
+            self._ready.put(None)
+
+        released = 0
+        try:
+            while True:
+                item = self._ready.get()
+                if item is _CHUNK_DONE:
+                    break
+                # Отдаём непрерывный префикс заполненных слотов
+                while released < self.count and self.slots[released] is not None:
+                    if on_question:
+                        on_question(self.slots[released], released)
+                    released += 1
+        except BaseException:
+            self._cancel()
+            raise
+        finally:
+            worker.join()
+
+        missing = self.slots.count(None)
+        if missing:
+            reason = f" ({self._error})" if self._error else ""
+            raise ValueError(
+                f"Не удалось сгенерировать вопросы после {self.retries} попыток: "
+                f"получено {self.count - missing} из {self.count}{reason}"
+            )
+
+        logger.info(
+            f"Successfully generated {self.count} questions for '{self.topic}' "
+            f"(rejected {self._rejected})"
         )
+        return list(self.slots)
+
+    def metrics(self):
+        """
+        Метрики генерации
+
+        Returns:
+            dict: {
+                'requested': 10, 'accepted': 10,
+                'llm_requests': 3, 'follow_up_requests': 1,
+                'received': 12, 'rejected': 2,
+                'salvaged': 4, 'salvage_rate': 0.8,
+                'rejections': [{'attempt': 1, 'reason': '...', 'text': '...'}, ...]
+            }
+
+            salvage_rate — доля валидных вопросов в ответах, где были
+            отклонённые (None, если таких ответов не было).
+        """
+        return {
+            'requested': self.count,
+            'accepted': self.count - self.slots.count(None),
+            'from_bank': self._prefilled,
+            'llm_requests': self._requests,
+            'follow_up_requests': self._follow_ups,
+            'received': self._received,
+            'rejected': self._rejected,
+            'salvaged': self._salvaged,
+            'salvage_rate': round(self._salvaged / self._partial_items, 3) if self._partial_items else None,
+            'rejections': self.rejections,
+        }
+
+    def _cancel(self):
+        if self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def _run_loop(self):
+        loop = self._loop = asyncio.new_event_loop()
+        try:
+            self._task = loop.create_task(self._generate())
+            loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._error = e
+            logger.error(f"Chunked generation failed: {type(e).__name__}: {e}")
+        finally:
+            loop.close()
+            self._ready.put(_CHUNK_DONE)
+
+    async def _generate(self):
+        if None not in self.slots:
+            return
 
-        # Создаём варианты ответа
-        for choice_idx, choice_text in enumerate(q.choices):
-            Choice.objects.create(
-                question=question,
-                text=choice_text,
-                is_correct=(choice_idx == q.correct_index),
-                order=choice_idx
+        client, model = get_llm_client()
+        try:
+            await self._fill_slots(client, model)
+        finally:
+            await client.close()
+
+    async def _fill_slots(self, client, model):
+        for attempt in range(self.retries):
+            missing = [i for i, q in enumerate(self.slots) if q is None]
+            if not missing:
+                return
+
+            self._attempt = attempt + 1
+            chunks = [missing[i:i + CHUNK_SIZE] for i in range(0, len(missing), CHUNK_SIZE)]
+            self._requests += len(chunks)
+            if attempt > 0:
+                self._follow_ups += len(chunks)
+            results = await asyncio.gather(
+                *(self._generate_chunk(client, model, chunk) for chunk in chunks),
+                return_exceptions=True
             )
+            for result in results:
+                if isinstance(result, Exception):
+                    self._error = result
+                    logger.error(f"Attempt {attempt + 1}/{self.retries}: chunk failed: {type(result).__name__}: {result}")
+
+            still_missing = self.slots.count(None)
+            if not still_missing:
+                return
+
+            logger.warning(f"Attempt {attempt + 1}/{self.retries}: {still_missing}/{self.count} slots empty")
+            if attempt < self.retries - 1:
+                # Exponential backoff + jitter
+                wait_time = (2 ** attempt) + random.uniform(0, 1)
+                logger.warning(f"Waiting {wait_time:.2f}s before retry...")
+                await asyncio.sleep(wait_time)
+
+    async def _generate_chunk(self, client, model, chunk):
+        """Запрашивает вопросы для слотов chunk"""
+        curve = [self.curve[i] for i in chunk]
+        prompt = build_prompt(self.topic, len(chunk), curve, self.player_count)
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+        # Итоги разбора этого ответа: {'accepted': n, 'rejected': n, 'received': n}
+        outcome = {'accepted': 0, 'rejected': 0, 'received': 0}
+
+        def accept(raw):
+            outcome['received'] += 1
+            outcome[self._accept(chunk, raw)] += 1
+
+        # Слот семафора держим только на время запроса (не во время backoff).
+        # Семафор общий для всех потоков процесса, ждём его без блокировки loop
+        while not llm_semaphore.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        try:
+            if self.stream:
+                parser = QuestionStreamParser()
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=3000,
+                    timeout=60,
+                    stream=True
+                )
+                async for part in response:
+                    if not part.choices:
+                        continue
+                    delta = part.choices[0].delta.content
+                    if delta:
+                        for raw in parser.feed(delta):
+                            accept(raw)
+
+                for error in parser.errors:
+                    outcome['received'] += 1
+                    outcome['rejected'] += 1
+                    self._reject(error, None)
+            else:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    # response_format={"type": "json_object"},  # Закомментировано для MLC
+                    temperature=0.7,
+                    max_tokens=3000,
+                    timeout=60
+                )
+                data = parse_llm_json(response.choices[0].message.content)
+                for raw in data.get('questions', []):
+                    accept(raw)
+        finally:
+            llm_semaphore.release()
+
+            self._received += outcome['received']
+            if outcome['rejected']:
+                self._salvaged += outcome['accepted']
+                self._partial_items += outcome['accepted'] + outcome['rejected']
+
+    def _accept(self, chunk, raw):
+        """
+        Валидирует вопрос и кладёт его в первый свободный слот куска
+
+        Returns:
+            str: 'accepted' | 'rejected' | 'surplus' (слоты куска уже заняты)
+        """
+        slot = next((i for i in chunk if self.slots[i] is None), None)
+        if slot is None:
+            return 'surplus'
+
+        if not isinstance(raw, dict):
+            self._reject('not an object', raw)
+            return 'rejected'
+
+        try:
+            question = QuestionSchema(**raw)
+        except ValidationError as e:
+            self._reject(_validation_reason(e), raw)
+            return 'rejected'
+        except TypeError as e:
+            self._reject(str(e), raw)
+            return 'rejected'
+
+        text_key = question.text.strip().lower()
+        if text_key in self._seen_texts:
+            self._reject('duplicate question', raw)
+            return 'rejected'
+        self._seen_texts.add(text_key)
+
+        self.slots[slot] = question
+        self._ready.put(slot)
+        return 'accepted'
+
+    def _reject(self, reason, raw):
+        """Записывает отклонённый вопрос с причиной"""
+        self._rejected += 1
+        text = str(raw.get('text', ''))[:80] if isinstance(raw, dict) else ''
+        logger.warning(f"Question rejected ({reason}): {text}")
+
+        if len(self.rejections) < MAX_REJECTIONS_RECORDED:
+            self.rejections.append({
+                'attempt': self._attempt,
+                'reason': reason,
+                'text': text,
+            })
+
+
+def _validation_reason(error):
+    """Краткая причина из pydantic ValidationError: 'choices: Вариант ответа слишком длинный'"""
+    return '; '.join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'question'}: {item['msg']}"
+        for item in error.errors()
+    )
 
-        created_count += 1
 
-    # Обновляем счётчик вопросов в квизе
-    quiz.question_count = created_count
-    quiz.save()
+# ============================================================================
+# СОХРАНЕНИЕ В БД
+# ============================================================================
+
+def build_question(quiz, q, order, generated_by_model=True):
+    """
+    Собирает несохранённый вопрос и его варианты ответа
+
+    Args:
+        quiz: экземпляр Quiz
+        q: QuestionSchema
+        order: порядковый номер (с 1)
+        generated_by_model: вопрос сгенерирован LLM
 
-    logger.info(f"Saved {created_count} questions to quiz {quiz.id}")
-    return created_count
+    Returns:
+        tuple: (Question, [Choice без question])
+    """
+    question = Question(
+        quiz=quiz,
+        order=order,
+        text=q.text,
+        difficulty=q.difficulty,
+        explanation=q.explanation,
+        image_url=q.image_url or '',
+        time_limit=DIFFICULTY_TIME_MAP.get(q.difficulty, 0),  # время по сложности
+        generated_by_model=generated_by_model
+    )
+    choices = [
+        Choice(text=choice_text, is_correct=(choice_idx == q.correct_index), order=choice_idx)
+        for choice_idx, choice_text in enumerate(q.choices)
+    ]
+    return question, choices
 
 
-def generate_and_save_quiz(topic, count, description='', time_per_question=20, player_count=1):
+def bulk_save_questions(quiz, questions, start_order=1, generated_by_model=True):
+    """
+    Сохраняет вопросы с вариантами ответа двумя bulk INSERT в одной транзакции
+
+    Args:
+        quiz: экземпляр Quiz
+        questions: список QuestionSchema
+        start_order: порядковый номер первого вопроса
+        generated_by_model: вопросы сгенерированы LLM
+
+    Returns:
+        list: созданные Question (с id)
+    """
+    built = [
+        build_question(quiz, q, start_order + idx, generated_by_model)
+        for idx, q in enumerate(questions)
+    ]
+
+    with transaction.atomic():
+        # id нужны для вариантов ответа: SQLite 3.35+ и PostgreSQL возвращают их из INSERT
+        created = Question.objects.bulk_create([question for question, _ in built])
+
+        choices = []
+        for question, (_, question_choices) in zip(created, built):
+            for choice in question_choices:
+                choice.question = question
+                choices.append(choice)
+        Choice.objects.bulk_create(choices)
+
+        # bulk_create не шлёт сигналы — сбрасываем кеш payload'ов сами
+        transaction.on_commit(lambda: question_payloads.invalidate(quiz.id))
+
+    return created
+
+
+def save_question(quiz, q, order):
+    """
+    Сохраняет один вопрос с вариантами ответа
+
+    Args:
+        quiz: экземпляр Quiz
+        q: QuestionSchema
+        order: порядковый номер (с 1)
+
+    Returns:
+        Question: созданный вопрос
+    """
+    return bulk_save_questions(quiz, [q], start_order=order)[0]
+
+
+def save_questions_to_quiz(quiz, questions, generated_by_model=True):
+    """
+    Сохраняет вопросы в БД (атомарно, bulk INSERT)
+
+    Args:
+        quiz: экземпляр Quiz
+        questions: список QuestionSchema
+        generated_by_model: вопросы сгенерированы LLM (False — импорт)
+
+    Returns:
+        int: количество созданных вопросов
+    """
+    with transaction.atomic():
+        created = bulk_save_questions(quiz, questions, generated_by_model=generated_by_model)
+
+        # Обновляем счётчик вопросов в квизе
+        quiz.question_count = len(created)
+        quiz.save(update_fields=['question_count'])
+
+    # Пополняем банк вопросов для следующих квизов
+    question_bank.add_to_bank(quiz.topic, questions)
+
+    logger.info(f"Saved {len(created)} questions to quiz {quiz.id}")
+    return len(created)
+
+
+def generate_and_save_quiz(topic, count, description='', time_per_question=20, player_count=1,
+                           on_progress=None, stream=None, metrics=None):
     """
     Полный процесс: создать квиз → сгенерировать вопросы → сохранить
 
+    В потоковом режиме (stream, по умолчанию QUIZ_STREAM_GENERATION) каждый
+    вопрос сохраняется сразу после генерации — игру можно начинать,
+    не дожидаясь последних вопросов.
+
     Args:
         topic: тема квиза
         count: количество вопросов
         description: описание квиза
         time_per_question: время на вопрос
         player_count: количество игроков
+        on_progress: callback(stage, progress, **info) для фоновых задач;
+            info: quiz, questions_ready
+        stream: потоковая генерация (None — из настроек)
+        metrics: dict для метрик генерации (заполняется и при ошибке)
 
     Returns:
         Quiz: созданный квиз с вопросами
     """
+    if stream is None:
+        stream = STREAM_GENERATION
+
+    def report(stage, progress, **info):
+        if on_progress:
+            on_progress(stage, progress, **info)
+
     # Создаём квиз
     quiz = Quiz.objects.create(
         title=f"Квиз: {topic}",
@@ -290,15 +814,63 @@ def generate_and_save_quiz(topic, count, description='', time_per_question=20, p
     )
 
     try:
+        if stream:
+            _stream_into_quiz(quiz, topic, count, player_count, report, metrics)
+            return quiz
+
         # Генерируем вопросы
-        questions = cached_generate(topic, count, player_count=player_count)
+        report('generating', 10)
+        questions = cached_generate(topic, count, player_count=player_count, metrics=metrics)
 
         # Сохраняем в БД
+        report('saving', 90)
         save_questions_to_quiz(quiz, questions)
 
         return quiz
 
     except Exception as e:
-        # Если что-то пошло не так — удаляем квиз
-        quiz.delete()
-        raise e
\ No newline at end of file
+        # Если что-то пошло не так — удаляем квиз,
+        # если по уже готовым вопросам не начали играть
+        if not quiz.sessions.exists():
+            quiz.delete()
+        raise e
+
+
+def _stream_into_quiz(quiz, topic, count, player_count, report, metrics=None):
+    """Потоковая генерация с сохранением каждого вопроса"""
+    difficulty_curve = get_difficulty_curve(count, player_count)
+    cache_key = generate_cache_key(topic, count, difficulty_curve)
+
+    # Проверяем кеш
+    # Точный ключ, иначе — вопросы с похожими темами под ту же кривую
+    cached = generation_cache.get(cache_key) or generation_cache.find_similar(topic, difficulty_curve)
+    if cached:
+        logger.info(f"Cache hit for topic='{topic}', count={count}")
+        report('saving', 90, quiz=quiz)
+        save_questions_to_quiz(quiz, [QuestionSchema(**q) for q in cached])
+        return
+
+    # Что есть в банке вопросов — берём сразу, LLM догенерирует остальное
+    prefilled = question_bank.draw(topic, difficulty_curve)
+
+    report('generating', 5, quiz=quiz, questions_ready=0)
+
+    def on_question(question, index):
+        with transaction.atomic():
+            save_question(quiz, question, index + 1)
+            Quiz.objects.filter(id=quiz.id).update(question_count=F('question_count') + 1)
+        question_bank.add_to_bank(topic, [question])
+
+        ready = index + 1
+        report('streaming', 5 + 90 * ready // count, questions_ready=ready)
+
+    logger.info(f"Streaming questions for topic='{topic}', count={count}")
+    questions = stream_questions(
+        topic, count, player_count, on_question=on_question, metrics=metrics, prefilled=prefilled
+    )
+
+    quiz.refresh_from_db(fields=['question_count'])
+    logger.info(f"Saved {quiz.question_count} streamed questions to quiz {quiz.id}")
+
+    # Кешируем (TTL — QUIZ_GENERATION_CACHE_TTL)
+    generation_cache.store(cache_key, [q.dict() for q in questions], topic, count)
\ No newline at end of file
@@ -0,0 +1,217 @@
+# quiz_app/generation_cache.py
+
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import GenerationCacheEntry
+from .topics import normalize_topic, TopicMatcher
+
+logger = logging.getLogger(__name__)
+
+# Время жизни записи (сек), по умолчанию 7 дней
+CACHE_TTL = getattr(settings, 'QUIZ_GENERATION_CACHE_TTL', 60 * 60 * 24 * 7)
+# Границы кеша: при превышении вытесняются давно не использованные записи
+CACHE_MAX_ENTRIES = getattr(settings, 'QUIZ_GENERATION_CACHE_MAX_ENTRIES', 1000)
+CACHE_MAX_BYTES = getattr(settings, 'QUIZ_GENERATION_CACHE_MAX_BYTES', 50 * 1024 * 1024)
+# Минимальное сходство тем (косинус n-грамм), чтобы взять вопросы из чужой записи
+TOPIC_SIMILARITY = getattr(settings, 'QUIZ_TOPIC_SIMILARITY', 0.8)
+
+
+def get(key):
+    """
+    Вопросы из кеша
+
+    Args:
+        key: ключ из generate_cache_key
+
+    Returns:
+        list[dict] | None: вопросы (QuestionSchema.dict()) или None
+    """
+    entry = GenerationCacheEntry.objects.filter(key=key).only('id', 'questions', 'expires_at').first()
+    if entry is None:
+        return None
+
+    if entry.is_expired():
+        entry.delete()
+        return None
+
+    GenerationCacheEntry.objects.filter(id=entry.id).update(
+        hits=F('hits') + 1,
+        last_used_at=timezone.now()
+    )
+    return entry.questions
+
+
+def store(key, questions, topic, count):
+    """
+    Сохраняет результат генерации (считается промахом по ключу)
+
+    Args:
+        key: ключ из generate_cache_key
+        questions: список QuestionSchema.dict()
+        topic: тема (для админки)
+        count: количество вопросов
+    """
+    now = timezone.now()
+    size = len(json.dumps(questions, ensure_ascii=False).encode())
+    values = {
+        'topic': topic[:200],
+        'normalized_topic': normalize_topic(topic)[:200],
+        'count': count,
+        'questions': questions,
+        'size_bytes': size,
+        'last_used_at': now,
+        'expires_at': now + timedelta(seconds=CACHE_TTL),
+    }
+
+    updated = GenerationCacheEntry.objects.filter(key=key).update(misses=F('misses') + 1, **values)
+    if not updated:
+        try:
+            with transaction.atomic():
+                GenerationCacheEntry.objects.create(key=key, misses=1, **values)
+        except IntegrityError:
+            # Тот же ключ только что записал другой процесс
+            GenerationCacheEntry.objects.filter(key=key).update(misses=F('misses') + 1, **values)
+
+    evict()
+
+
+def find_similar(topic, difficulty_curve, threshold=None):
+    """
+    Собирает вопросы для кривой сложности из записей с похожими темами
+
+    Темы сравниваются по нормализованной форме (стемминг, синонимы) и
+    косинусу символьных n-грамм: "Советские фильмы", "советское кино" и
+    "Фильмы СССР" считаются одной темой. Числа и слова тем должны
+    совпадать (TopicMatcher): "Музыка 80-х" и "Музыка 90-х" — разные темы. Для каждой позиции кривой берётся
+    неиспользованный вопрос той же сложности из самой похожей записи.
+
+    Args:
+        topic: тема квиза
+        difficulty_curve: список сложностей ['easy', 'medium', ...]
+        threshold: минимальное сходство (по умолчанию QUIZ_TOPIC_SIMILARITY)
+
+    Returns:
+        list[dict] | None: вопросы по порядку кривой или None,
+        если заполнить все позиции не получилось
+    """
+    if threshold is None:
+        threshold = TOPIC_SIMILARITY
+
+    target = TopicMatcher(normalize_topic(topic))
+    if not target:
+        return None
+
+    # Сходство считаем один раз на каждую различную нормализованную тему
+    candidates = (
+        GenerationCacheEntry.objects
+        .filter(expires_at__gt=timezone.now())
+        .exclude(normalized_topic='')
+        .values_list('id', 'normalized_topic')
+    )
+    scores = {}
+    matched = []
+    for entry_id, normalized in candidates:
+        if normalized not in scores:
+            scores[normalized] = target.similarity(normalized)
+        if scores[normalized] >= threshold:
+            matched.append((scores[normalized], entry_id))
+
+    if not matched:
+        return None
+
+    matched.sort(reverse=True)
+    entries = GenerationCacheEntry.objects.in_bulk([entry_id for _, entry_id in matched])
+
+    # Пулы вопросов по сложности, самые похожие темы — первыми
+    pools = {}
+    seen_texts = set()
+    for _, entry_id in matched:
+        for question in entries[entry_id].questions:
+            text_key = question.get('text', '').strip().lower()
+            if not text_key or text_key in seen_texts:
+                continue
+            seen_texts.add(text_key)
+            pools.setdefault(question.get('difficulty'), []).append((entry_id, question))
+
+    assembled = []
+    used_entries = {}
+    for difficulty in difficulty_curve:
+        pool = pools.get(difficulty)
+        if not pool:
+            return None
+        entry_id, question = pool.pop(0)
+        assembled.append(question)
+        used_entries[entry_id] = used_entries.get(entry_id, 0) + 1
+
+    for entry_id in used_entries:
+        GenerationCacheEntry.objects.filter(id=entry_id).update(
+            hits=F('hits') + 1,
+            last_used_at=timezone.now()
+        )
+
+    logger.info(
+        f"Generation cache: assembled {len(assembled)} questions for '{topic}' "
+        f"from {len(used_entries)} similar entries"
+    )
+    return assembled
+
+
+def evict():
+    """
+    Удаляет истёкшие записи и вытесняет давно не использованные (LRU),
+    пока кеш не уложится в CACHE_MAX_ENTRIES и CACHE_MAX_BYTES
+
+    Returns:
+        int: сколько записей удалено
+    """
+    removed, _ = GenerationCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+
+    total_entries = 0
+    total_bytes = 0
+    stale_ids = []
+    for entry_id, size in GenerationCacheEntry.objects.order_by('-last_used_at').values_list('id', 'size_bytes'):
+        total_entries += 1
+        total_bytes += size
+        if total_entries > CACHE_MAX_ENTRIES or total_bytes > CACHE_MAX_BYTES:
+            stale_ids.append(entry_id)
+
+    if stale_ids:
+        evicted, _ = GenerationCacheEntry.objects.filter(id__in=stale_ids).delete()
+        logger.info(f"Generation cache: evicted {evicted} entries")
+        removed += evicted
+
+    return removed
+
+
+def purge():
+    """Очищает кеш целиком"""
+    removed, _ = GenerationCacheEntry.objects.all().delete()
+    return removed
+
+
+def stats():
+    """
+    Сводка по кешу
+
+    Returns:
+        dict: {'entries': 12, 'size_bytes': 34567, 'hits': 40, 'misses': 12, 'hit_rate': 0.769}
+    """
+    totals = GenerationCacheEntry.objects.aggregate(
+        size_bytes=Sum('size_bytes'), hits=Sum('hits'), misses=Sum('misses')
+    )
+    hits = totals['hits'] or 0
+    misses = totals['misses'] or 0
+    return {
+        'entries': GenerationCacheEntry.objects.count(),
+        'size_bytes': totals['size_bytes'] or 0,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+    }
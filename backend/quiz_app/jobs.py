@@ -0,0 +1,149 @@
+# quiz_app/jobs.py
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import GenerationJob
+from .frames import frame
+
+logger = logging.getLogger(__name__)
+
+# Потоков генерации на процесс (сами запросы к LLM ограничены
+# generation.llm_semaphore / QUIZ_LLM_CONCURRENCY)
+GENERATION_WORKERS = getattr(settings, 'QUIZ_GENERATION_WORKERS', 2)
+
+_executor = None
+
+
+def get_executor():
+    """Пул потоков генерации (создаётся при первой задаче)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=GENERATION_WORKERS,
+            thread_name_prefix='quiz-generation'
+        )
+    return _executor
+
+
+def job_group(job_uuid):
+    """Группа channel layer для уведомлений о задаче"""
+    return f'generation_{job_uuid}'
+
+
+def job_payload(job):
+    """Событие generation_status для WebSocket и REST"""
+    return {
+        'type': 'generation_status',
+        'job_id': str(job.uuid),
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job.progress,
+        'error': job.error,
+        'quiz_id': job.quiz_id,
+        'questions_ready': job.questions_ready,
+    }
+
+
+# ============================================================================
+# ПОСТАНОВКА В ОЧЕРЕДЬ
+# ============================================================================
+
+def submit_generation(topic, count, description='', time_per_question=20, player_count=1):
+    """
+    Создаёт задачу генерации и ставит её в пул
+
+    Args:
+        topic: тема квиза
+        count: количество вопросов
+        description: описание квиза
+        time_per_question: время на вопрос
+        player_count: количество игроков
+
+    Returns:
+        GenerationJob: задача в статусе queued
+    """
+    job = GenerationJob.objects.create(
+        topic=topic,
+        params={
+            'count': count,
+            'description': description,
+            'time_per_question': time_per_question,
+            'player_count': player_count,
+        }
+    )
+
+    # Поток не должен увидеть задачу раньше, чем она закоммичена
+    transaction.on_commit(lambda: get_executor().submit(run_job, job.id))
+
+    logger.info(f"Generation job {job.uuid} queued for '{topic}'")
+    return job
+
+
+# ============================================================================
+# ВЫПОЛНЕНИЕ (в потоке пула)
+# ============================================================================
+
+def run_job(job_id):
+    """Выполняет задачу генерации"""
+    from .generation import generate_and_save_quiz
+
+    close_old_connections()
+    job = None
+    metrics = {}
+    try:
+        job = GenerationJob.objects.get(id=job_id)
+        params = job.params
+
+        _update(job, status='running', stage='started', progress=0, started_at=timezone.now())
+
+        quiz = generate_and_save_quiz(
+            topic=job.topic,
+            count=params.get('count', 10),
+            description=params.get('description', ''),
+            time_per_question=params.get('time_per_question', 20),
+            player_count=params.get('player_count', 1),
+            on_progress=lambda stage, progress, **info: _update(job, stage=stage, progress=progress, **info),
+            metrics=metrics
+        )
+
+        _update(
+            job, status='done', stage='done', progress=100, quiz=quiz,
+            questions_ready=quiz.question_count, metrics=metrics, finished_at=timezone.now()
+        )
+        logger.info(f"Generation job {job.uuid} done: quiz {quiz.id}")
+
+    except GenerationJob.DoesNotExist:
+        logger.error(f"Generation job {job_id} not found")
+    except Exception as e:
+        logger.exception(f"Generation job {job_id} failed")
+        if job is not None:
+            _update(job, status='failed', error=str(e), metrics=metrics, finished_at=timezone.now())
+    finally:
+        close_old_connections()
+
+
+def _update(job, **fields):
+    """
+    Сохраняет изменённые поля задачи и уведомляет подписчиков
+
+    Вызывается из потока генерации: с InMemoryChannelLayer событие может
+    не дойти до consumer'а, поэтому клиент параллельно опрашивает REST.
+    """
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=list(fields))
+
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            job_group(job.uuid), frame(job_payload(job))
+        )
+    except Exception as e:
+        # Статус уже в БД — клиент увидит его через REST
+        logger.warning(f"Generation job {job.uuid}: notify failed: {e}")
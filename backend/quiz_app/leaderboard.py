@@ -0,0 +1,146 @@
+# quiz_app/leaderboard.py
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+
+
+class RankedLeaderboard:
+    """
+    Таблица лидеров, поддерживаемая в отсортированном виде
+
+    Порядок: очки по убыванию, при равенстве — кто раньше подключился.
+    Ключи хранятся в отсортированном списке: поиск позиции — bisect за
+    O(log n), обновление очков одного игрока — удаление и вставка ключа
+    без пересортировки всей таблицы.
+
+    Хранит ссылки на объекты игроков (Player или PlayerState — нужны
+    атрибуты id, name, score, current_streak, connected, is_host, joined_at),
+    поэтому connected/is_host подхватываются без обновления ключа.
+    """
+
+    def __init__(self, players=()):
+        self._keys = []
+        self._key_of: Dict[int, tuple] = {}
+        self._players: Dict[int, object] = {}
+
+        # Позиция и очки каждого игрока на момент последней рассылки
+        self._broadcast_snapshot: Dict[int, tuple] = {}
+
+        for player in players:
+            self.add(player)
+
+    @classmethod
+    def from_players(cls, players):
+        """Собирает таблицу из Player (queryset или список)"""
+        return cls(players)
+
+    @staticmethod
+    def _key(player):
+        return (-player.score, player.joined_at, player.id)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, player_id):
+        return player_id in self._players
+
+    # ------------------------------------------------------------------------
+    # Изменения
+    # ------------------------------------------------------------------------
+
+    def add(self, player):
+        """Добавляет игрока (или переиндексирует уже добавленного)"""
+        if player.id in self._players:
+            self.update(player)
+            return
+
+        key = self._key(player)
+        self._players[player.id] = player
+        self._key_of[player.id] = key
+        insort(self._keys, key)
+
+    def update(self, player):
+        """Переставляет игрока после изменения очков"""
+        old_key = self._key_of.get(player.id)
+        if old_key is None:
+            self.add(player)
+            return
+
+        new_key = self._key(player)
+        self._players[player.id] = player
+        if new_key == old_key:
+            return
+
+        del self._keys[bisect_left(self._keys, old_key)]
+        insort(self._keys, new_key)
+        self._key_of[player.id] = new_key
+
+    def remove(self, player_id):
+        key = self._key_of.pop(player_id, None)
+        if key is None:
+            return
+        del self._keys[bisect_left(self._keys, key)]
+        del self._players[player_id]
+
+    # ------------------------------------------------------------------------
+    # Чтение
+    # ------------------------------------------------------------------------
+
+    def rank(self, player_id) -> Optional[int]:
+        """Позиция игрока (с 1) или None"""
+        key = self._key_of.get(player_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key) + 1
+
+    def top(self, k=None) -> List[dict]:
+        """
+        Первые k строк таблицы (все, если k не задан)
+
+        Returns:
+            list: [{'position': 1, 'player_id': 7, 'name': 'Иван', 'score': 2500, ...}, ...]
+        """
+        keys = self._keys if k is None else self._keys[:k]
+        return [
+            self._entry(idx + 1, self._players[key[2]])
+            for idx, key in enumerate(keys)
+        ]
+
+    def changes(self) -> List[dict]:
+        """
+        Строки, у которых позиция или очки изменились с последней рассылки
+
+        Каждая строка дополнена previous_position (None для новых игроков).
+        Снимок обновляется вызовом mark_broadcast().
+        """
+        changed = []
+        for idx, key in enumerate(self._keys):
+            player = self._players[key[2]]
+            position = idx + 1
+            previous = self._broadcast_snapshot.get(player.id)
+            if previous == (position, player.score):
+                continue
+
+            entry = self._entry(position, player)
+            entry['previous_position'] = previous[0] if previous else None
+            changed.append(entry)
+        return changed
+
+    def mark_broadcast(self):
+        """Запоминает текущие позиции как разосланные клиентам"""
+        self._broadcast_snapshot = {
+            key[2]: (idx + 1, self._players[key[2]].score)
+            for idx, key in enumerate(self._keys)
+        }
+
+    @staticmethod
+    def _entry(position, player):
+        return {
+            'position': position,
+            'player_id': player.id,
+            'name': player.name,
+            'score': player.score,
+            'current_streak': player.current_streak,
+            'connected': player.connected,
+            'is_host': player.is_host,
+        }
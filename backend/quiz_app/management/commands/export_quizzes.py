@@ -0,0 +1,41 @@
+# quiz_app/management/commands/export_quizzes.py
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.models import Quiz
+from quiz_app.packs import iter_pack_lines, gzip_stream
+
+
+class Command(BaseCommand):
+    help = 'Экспорт квизов в пак (JSON Lines; .gz — со сжатием gzip)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Файл пака ('-' — stdout)")
+        parser.add_argument('--ids', nargs='+', type=int, help='ID квизов (по умолчанию — все)')
+        parser.add_argument('--gzip', action='store_true', help='Сжимать gzip (для .gz включается само)')
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.all()
+        if options['ids']:
+            quizzes = quizzes.filter(id__in=options['ids'])
+            missing = set(options['ids']) - set(quizzes.values_list('id', flat=True))
+            if missing:
+                raise CommandError(f'Квизы не найдены: {sorted(missing)}')
+
+        output = options['output']
+        chunks = iter_pack_lines(quizzes)
+        if options['gzip'] or output.endswith('.gz'):
+            chunks = gzip_stream(chunks)
+
+        if output == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+
+        with open(output, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Экспортировано квизов: {quizzes.count()} → {output}'))
@@ -0,0 +1,32 @@
+# quiz_app/management/commands/import_quizzes.py
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.packs import import_pack_file, PackError
+
+
+class Command(BaseCommand):
+    help = 'Импорт квизов из пака (JSON Lines или gzip)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Файл пака ('-' — stdin)")
+
+    def handle(self, *args, **options):
+        path = options['input']
+        try:
+            if path == '-':
+                quizzes = import_pack_file(sys.stdin.buffer)
+            else:
+                with open(path, 'rb') as f:
+                    quizzes = import_pack_file(f)
+        except OSError as e:
+            raise CommandError(f'Не удалось прочитать {path}: {e}')
+        except PackError as e:
+            details = ''.join(f"\n  {d}" for d in e.details)
+            raise CommandError(f'{e}{details}')
+
+        for quiz in quizzes:
+            self.stdout.write(f'  {quiz.id}: {quiz.title} ({quiz.question_count} вопросов)')
+        self.stdout.write(self.style.SUCCESS(f'✅ Импортировано квизов: {len(quizzes)}'))
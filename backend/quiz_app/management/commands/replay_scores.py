@@ -0,0 +1,100 @@
+# quiz_app/management/commands/replay_scores.py
+
+import time
+from dataclasses import replace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.models import GameSession, ScoringProfile
+from quiz_app.scoring import SPEED_CURVES
+from quiz_app.score_replay import replay_session, apply_replay
+
+
+def parse_multiplier(value):
+    """'hard=1.4' → ('hard', 1.4)"""
+    difficulty, _, number = value.partition('=')
+    try:
+        return difficulty.strip(), float(number)
+    except ValueError:
+        raise CommandError(f"Множитель в формате сложность=число, получено: {value!r}")
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчёт очков сессий по другой формуле (без --apply только отчёт). '
+        'За основу берётся --profile или формула, записанная в сессии; '
+        'остальные параметры её переопределяют'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('codes', nargs='*', help='Коды сессий')
+        parser.add_argument('--finished', action='store_true', help='Все завершённые сессии')
+        parser.add_argument('--profile', help='Название профиля очков (ScoringProfile)')
+        parser.add_argument('--base-points', type=int)
+        parser.add_argument('--speed-bonus', type=int)
+        parser.add_argument('--speed-curve', choices=list(SPEED_CURVES))
+        parser.add_argument('--streak-bonus', type=int)
+        parser.add_argument('--streak-cap', type=int)
+        parser.add_argument(
+            '--multiplier', action='append', default=[], metavar='СЛОЖНОСТЬ=ЧИСЛО',
+            help='Множитель сложности, например --multiplier hard=1.4 (можно несколько)'
+        )
+        parser.add_argument('--apply', action='store_true', help='Записать новые очки в БД')
+
+    def handle(self, *args, **options):
+        sessions = GameSession.objects.select_related('quiz', 'scoring_profile', 'quiz__scoring_profile')
+        if options['finished']:
+            sessions = sessions.filter(state='finished')
+        elif options['codes']:
+            sessions = sessions.filter(code__in=options['codes'])
+            missing = set(options['codes']) - set(sessions.values_list('code', flat=True))
+            if missing:
+                raise CommandError(f'Сессии не найдены: {sorted(missing)}')
+        else:
+            raise CommandError('Укажите коды сессий или --finished')
+
+        profile = None
+        if options['profile']:
+            profile = ScoringProfile.objects.filter(name=options['profile']).first()
+            if profile is None:
+                raise CommandError(f"Профиль очков не найден: {options['profile']}")
+
+        overrides = {
+            key: options[key]
+            for key in ['base_points', 'speed_bonus', 'speed_curve', 'streak_bonus', 'streak_cap']
+            if options[key] is not None
+        }
+        multipliers = dict(parse_multiplier(m) for m in options['multiplier'])
+
+        started = time.perf_counter()
+        answers = 0
+        for session in sessions:
+            config = profile.to_config() if profile else session.get_scoring_config()
+            config = replace(config, **overrides).with_multipliers(**multipliers)
+            result = replay_session(session, config)
+            answers += len(result.answer_ids)
+            self.report(result)
+            if options['apply']:
+                apply_replay(result)
+
+        elapsed = time.perf_counter() - started
+        verb = 'Записано' if options['apply'] else 'Пересчитано (без записи)'
+        self.stdout.write(self.style.SUCCESS(f'✅ {verb}: ответов {answers} за {elapsed:.2f} с'))
+
+    def report(self, result):
+        old_ranks = {
+            p.id: rank
+            for rank, p in enumerate(sorted(result.players, key=lambda p: -p.old_score), start=1)
+        }
+
+        self.stdout.write(
+            f"\nСессия {result.session.code} ({result.session.quiz.title}): "
+            f"ответов {len(result.answer_ids)}, изменилось {result.changed_answers}"
+        )
+        for rank, player in enumerate(result.players, start=1):
+            delta = player.new_score - player.old_score
+            moved = old_ranks[player.id] - rank
+            self.stdout.write(
+                f"  {rank:>3}. {player.name:<20} {player.old_score:>8} → {player.new_score:>8} "
+                f"({delta:+d})" + (f"  {'↑' if moved > 0 else '↓'}{abs(moved)}" if moved else '')
+            )
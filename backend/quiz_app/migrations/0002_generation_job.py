@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:10
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='time_limit',
+            field=models.IntegerField(default=0, help_text='0 = использовать время из квиза. Можно задать индивидуальное время для сложных вопросов', validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(120)], verbose_name='Время на вопрос (сек)'),
+        ),
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='UUID')),
+                ('topic', models.CharField(max_length=200, verbose_name='Тема')),
+                ('params', models.JSONField(blank=True, default=dict, help_text='count, description, time_per_question, player_count', verbose_name='Параметры генерации')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('running', 'Генерируется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='queued', max_length=20, verbose_name='Статус')),
+                ('progress', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)], verbose_name='Прогресс (%)')),
+                ('stage', models.CharField(blank=True, max_length=50, verbose_name='Этап')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Время начала')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Время окончания')),
+                ('quiz', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generation_jobs', to='quiz_app.quiz', verbose_name='Квиз')),
+            ],
+            options={
+                'verbose_name': 'Задача генерации',
+                'verbose_name_plural': 'Задачи генерации',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
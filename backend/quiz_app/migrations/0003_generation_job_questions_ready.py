@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0002_generation_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='questions_ready',
+            field=models.IntegerField(default=0, help_text='При потоковой генерации квиз доступен до окончания задачи', verbose_name='Готово вопросов'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0003_generation_job_questions_ready'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='metrics',
+            field=models.JSONField(blank=True, default=dict, help_text='Запросы к LLM, отклонённые вопросы с причинами, salvage_rate', verbose_name='Метрики генерации'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0004_generation_job_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='generation.generate_cache_key: версии промпта/схемы + хеш темы и кривой', max_length=100, unique=True, verbose_name='Ключ')),
+                ('topic', models.CharField(max_length=200, verbose_name='Тема')),
+                ('count', models.IntegerField(verbose_name='Количество вопросов')),
+                ('questions', models.JSONField(help_text='Список QuestionSchema.dict()', verbose_name='Вопросы')),
+                ('size_bytes', models.IntegerField(default=0, verbose_name='Размер (байт)')),
+                ('hits', models.IntegerField(default=0, verbose_name='Попадания')),
+                ('misses', models.IntegerField(default=0, help_text='Сколько раз вопросы по этому ключу генерировались заново', verbose_name='Промахи')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Последнее использование')),
+                ('expires_at', models.DateTimeField(verbose_name='Истекает')),
+            ],
+            options={
+                'verbose_name': 'Кеш генерации',
+                'verbose_name_plural': 'Кеш генерации',
+                'ordering': ['-last_used_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:17
+
+from django.db import migrations, models
+
+
+def fill_normalized_topic(apps, schema_editor):
+    from quiz_app.topics import normalize_topic
+
+    GenerationCacheEntry = apps.get_model('quiz_app', 'GenerationCacheEntry')
+    for entry in GenerationCacheEntry.objects.all():
+        entry.normalized_topic = normalize_topic(entry.topic)[:200]
+        entry.save(update_fields=['normalized_topic'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0005_generation_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationcacheentry',
+            name='normalized_topic',
+            field=models.CharField(blank=True, db_index=True, help_text='topics.normalize_topic: основы слов без стоп-слов', max_length=200, verbose_name='Нормализованная тема'),
+        ),
+        migrations.RunPython(fill_normalized_topic, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:18
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0006_generation_cache_normalized_topic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(help_text='prompts.detect_topic_category', max_length=50, verbose_name='Категория темы')),
+                ('difficulty', models.CharField(choices=[('easy', 'Лёгкий'), ('medium', 'Средний'), ('hard', 'Сложный'), ('very_hard', 'Очень сложный'), ('fun', 'Шуточный')], max_length=20, verbose_name='Сложность')),
+                ('topic', models.CharField(max_length=200, verbose_name='Тема')),
+                ('normalized_topic', models.CharField(blank=True, max_length=200, verbose_name='Нормализованная тема')),
+                ('text', models.TextField(max_length=200, verbose_name='Текст вопроса')),
+                ('text_hash', models.CharField(help_text='SHA-1 нормализованного текста — защита от дублей', max_length=40, unique=True, verbose_name='Хеш текста')),
+                ('choices', models.JSONField(verbose_name='Варианты ответа')),
+                ('correct_index', models.IntegerField(validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(3)], verbose_name='Индекс правильного ответа')),
+                ('explanation', models.TextField(blank=True, max_length=300, verbose_name='Объяснение')),
+                ('image_url', models.CharField(blank=True, max_length=500, verbose_name='URL картинки')),
+                ('times_used', models.IntegerField(default=0, verbose_name='Использован раз')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Вопрос банка',
+                'verbose_name_plural': 'Банк вопросов',
+                'ordering': ['category', 'difficulty', 'times_used'],
+                'indexes': [models.Index(fields=['category', 'difficulty', 'times_used'], name='quiz_app_ba_categor_2af69e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0007_question_bank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_players', models.IntegerField(default=0, verbose_name='Игроков')),
+                ('total_questions', models.IntegerField(default=0, verbose_name='Вопросов')),
+                ('total_answers', models.IntegerField(default=0, verbose_name='Ответов')),
+                ('correct_answers', models.IntegerField(default=0, verbose_name='Правильных ответов')),
+                ('average_score', models.FloatField(default=0, verbose_name='Средний счёт')),
+                ('fastest_answer', models.JSONField(blank=True, null=True, verbose_name='Самый быстрый правильный ответ')),
+                ('slowest_answer', models.JSONField(blank=True, null=True, verbose_name='Самый медленный правильный ответ')),
+                ('hardest_question', models.JSONField(blank=True, null=True, verbose_name='Самый сложный вопрос')),
+                ('question_counts', models.JSONField(default=dict, help_text='{question_id: [правильных, всего]}', verbose_name='Ответы по вопросам')),
+                ('frozen', models.BooleanField(default=False, help_text='Игра завершена, снимок больше не меняется', verbose_name='Заморожен')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлён')),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='quiz_app.gamesession', verbose_name='Сессия')),
+            ],
+            options={
+                'verbose_name': 'Статистика сессии',
+                'verbose_name_plural': 'Статистика сессий',
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0008_session_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomAward',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.SlugField(help_text='Уникальный ключ награды (не совпадает со встроенными)', unique=True, verbose_name='Ключ')),
+                ('name', models.CharField(max_length=50, verbose_name='Название')),
+                ('emoji', models.CharField(max_length=10, verbose_name='Эмодзи')),
+                ('description', models.CharField(blank=True, max_length=200, verbose_name='Описание критерия')),
+                ('metric', models.CharField(choices=[('count', 'Количество ответов'), ('sum', 'Сумма времени ответов'), ('avg', 'Среднее время ответа'), ('ratio', 'Доля от всех ответов игрока'), ('player', 'Поле игрока')], default='count', max_length=10, verbose_name='Метрика')),
+                ('player_field', models.CharField(blank=True, choices=[('max_streak', 'Максимальная серия'), ('score', 'Счёт')], help_text='Только для метрики «Поле игрока»', max_length=20, verbose_name='Поле игрока')),
+                ('correct', models.BooleanField(blank=True, help_text='Пусто — любые ответы', null=True, verbose_name='Правильность')),
+                ('difficulties', models.JSONField(blank=True, default=list, help_text='Например ["hard", "very_hard"]; пусто — любые', verbose_name='Сложности вопросов')),
+                ('time_over', models.FloatField(blank=True, null=True, verbose_name='Время ответа больше (сек)')),
+                ('time_under', models.FloatField(blank=True, null=True, verbose_name='Время ответа меньше (сек)')),
+                ('last_seconds', models.FloatField(blank=True, null=True, verbose_name='В последние N секунд таймера')),
+                ('threshold_op', models.CharField(choices=[('>=', '≥'), ('>', '>'), ('<=', '≤'), ('<', '<')], default='>=', max_length=2, verbose_name='Условие порога')),
+                ('threshold', models.FloatField(blank=True, help_text='Пусто — без порога', null=True, verbose_name='Порог')),
+                ('winner', models.CharField(choices=[('max', 'Наибольшее значение'), ('min', 'Наименьшее значение')], default='max', max_length=3, verbose_name='Победитель')),
+                ('value_scale', models.FloatField(default=1, help_text='Например 100 для процентов', verbose_name='Множитель значения')),
+                ('value_digits', models.IntegerField(blank=True, null=True, verbose_name='Знаков после запятой')),
+                ('value_template', models.CharField(default='{value}', help_text='Например «Ответов: {value}» или «Точность: {value:.1f}%»', max_length=100, verbose_name='Шаблон описания')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активна')),
+                ('order', models.IntegerField(default=0, verbose_name='Порядок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Своя награда',
+                'verbose_name_plural': 'Свои награды',
+                'ordering': ['order', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:43
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0009_custom_award'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoringProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Название')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+                ('base_points', models.IntegerField(default=1000, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Базовые очки')),
+                ('speed_bonus', models.IntegerField(default=500, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Бонус за скорость (макс.)')),
+                ('speed_curve', models.CharField(choices=[('linear', 'Линейная'), ('quadratic', 'Квадратичная'), ('sqrt', 'Корень')], default='linear', max_length=20, verbose_name='Форма бонуса за скорость')),
+                ('streak_bonus', models.IntegerField(default=100, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Бонус за ответ серии')),
+                ('streak_cap', models.IntegerField(blank=True, help_text='Сколько ответов серии учитывается; пусто — без ограничения', null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Потолок серии')),
+                ('difficulty_multipliers', models.JSONField(blank=True, default=dict, help_text='Например {"hard": 1.5}; не указанные — стандартные', verbose_name='Множители сложности')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлён')),
+            ],
+            options={
+                'verbose_name': 'Профиль очков',
+                'verbose_name_plural': 'Профили очков',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='scoring_config',
+            field=models.JSONField(blank=True, help_text='Настройки профиля на момент старта игры (для воспроизводимости)', null=True, verbose_name='Формула очков'),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='scoring_profile',
+            field=models.ForeignKey(blank=True, help_text='Пусто — профиль квиза', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='quiz_app.scoringprofile', verbose_name='Профиль очков'),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='scoring_profile',
+            field=models.ForeignKey(blank=True, help_text='Пусто — стандартная формула', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quizzes', to='quiz_app.scoringprofile', verbose_name='Профиль очков'),
+        ),
+    ]
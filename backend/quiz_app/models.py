@@ -7,6 +7,8 @@ import random
 import string
 import uuid
 
+from .scoring import DEFAULT_CONFIG, SPEED_CURVES, ScoringConfig
+
 
 class Quiz(models.Model):
     """
@@ -41,6 +43,15 @@ class Quiz(models.Model):
         validators=[MinValueValidator(10), MaxValueValidator(60)],
         verbose_name="Время на вопрос (сек)"
     )
+    scoring_profile = models.ForeignKey(
+        'ScoringProfile',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='quizzes',
+        verbose_name="Профиль очков",
+        help_text="Пусто — стандартная формула"
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name="Дата создания"
@@ -153,7 +164,9 @@ class Question(models.Model):
         return f"Q{self.order}: {self.text[:50]}..."
 
     def get_correct_choice(self):
-        """Возвращает правильный вариант ответа"""
+        """Возвращает правильный вариант ответа (без запроса, если choices предзагружены)"""
+        if 'choices' in getattr(self, '_prefetched_objects_cache', {}):
+            return next((c for c in self.choices.all() if c.is_correct), None)
         return self.choices.filter(is_correct=True).first()
 
     # ===== ДОБАВЬ ЭТОТ МЕТОД =====
@@ -261,6 +274,21 @@ class GameSession(models.Model):
         blank=True,
         verbose_name="Время окончания"
     )
+    scoring_profile = models.ForeignKey(
+        'ScoringProfile',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sessions',
+        verbose_name="Профиль очков",
+        help_text="Пусто — профиль квиза"
+    )
+    scoring_config = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Формула очков",
+        help_text="Настройки профиля на момент старта игры (для воспроизводимости)"
+    )
 
     class Meta:
         verbose_name = "Игровая сессия"
@@ -271,22 +299,44 @@ class GameSession(models.Model):
         return f"Сессия {self.code} - {self.quiz.title} ({self.state})"
 
     def get_current_question(self):
-        """Возвращает текущий вопрос"""
-        questions = self.quiz.questions.all().order_by('order')
+        """Возвращает текущий вопрос (с квизом и вариантами ответа) или None"""
+        if self.current_question < 0:
+            return None
 
-        print(f"🔍 Getting question at index {self.current_question}")
-        print(f"📊 Total questions: {questions.count()}")
+        index = self.current_question
+        return (
+            Question.objects
+            .filter(quiz_id=self.quiz_id)
+            .select_related('quiz')
+            .prefetch_related('choices')
+            .order_by('order')[index:index + 1]
+            .first()
+        )
 
-        if 0 <= self.current_question < questions.count():
-            q = questions[self.current_question]
-            print(f"✅ Found question: {q.text[:50]}")
-            return q
+    def get_scoring_config(self) -> ScoringConfig:
+        """
+        Формула очков сессии: записанная при старте, иначе профиль
+        сессии, иначе профиль квиза, иначе стандартная
+        """
+        if self.scoring_config:
+            return ScoringConfig.from_dict(self.scoring_config)
+        profile = self.scoring_profile or self.quiz.scoring_profile
+        return profile.to_config() if profile else DEFAULT_CONFIG
 
-        print(f"❌ No question found at index {self.current_question}")
-        return None
+    def record_scoring_config(self) -> ScoringConfig:
+        """Фиксирует формулу очков сессии (один раз) и возвращает её"""
+        config = self.get_scoring_config()
+        if not self.scoring_config:
+            self.scoring_config = config.as_dict()
+            GameSession.objects.filter(id=self.id, scoring_config__isnull=True).update(
+                scoring_config=self.scoring_config
+            )
+        return config
 
     def get_connected_players_count(self):
-        """Возвращает количество подключённых игроков"""
+        """Возвращает количество подключённых игроков (без запроса, если players предзагружены)"""
+        if 'players' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(1 for p in self.players.all() if p.connected)
         return self.players.filter(connected=True).count()
 
     def get_total_questions(self):
@@ -432,4 +482,602 @@ class Answer(models.Model):
 
     def __str__(self):
         mark = "✓" if self.is_correct else "✗"
-        return f"{mark} {self.player.name} - Q{self.question.order} ({self.points_earned} pts)"
\ No newline at end of file
+        return f"{mark} {self.player.name} - Q{self.question.order} ({self.points_earned} pts)"
+
+
+class GenerationJob(models.Model):
+    """
+    Фоновая генерация квиза через LLM.
+    Создаётся POST /api/quizzes/generate/, выполняется пулом потоков (quiz_app/jobs.py).
+    quiz заполняется сразу после создания квиза, ещё до окончания генерации.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'В очереди'),
+        ('running', 'Генерируется'),
+        ('done', 'Готово'),
+        ('failed', 'Ошибка'),
+    ]
+
+    uuid = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        editable=False,
+        verbose_name="UUID"
+    )
+    topic = models.CharField(
+        max_length=200,
+        verbose_name="Тема"
+    )
+    params = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Параметры генерации",
+        help_text="count, description, time_per_question, player_count"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='queued',
+        verbose_name="Статус"
+    )
+    progress = models.IntegerField(
+        default=0,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+        verbose_name="Прогресс (%)"
+    )
+    stage = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Этап"
+    )
+    questions_ready = models.IntegerField(
+        default=0,
+        verbose_name="Готово вопросов",
+        help_text="При потоковой генерации квиз доступен до окончания задачи"
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="Ошибка"
+    )
+    metrics = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Метрики генерации",
+        help_text="Запросы к LLM, отклонённые вопросы с причинами, salvage_rate"
+    )
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='generation_jobs',
+        verbose_name="Квиз"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Время начала"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Время окончания"
+    )
+
+    class Meta:
+        verbose_name = "Задача генерации"
+        verbose_name_plural = "Задачи генерации"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.topic} ({self.status}, {self.progress}%)"
+
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
+
+
+class GenerationCacheEntry(models.Model):
+    """
+    Результат генерации вопросов, сохранённый для повторного использования.
+    Хранится в БД — общий для всех ASGI процессов и переживает перезапуск.
+    Вытеснение — LRU по last_used_at (quiz_app/generation_cache.py).
+    """
+    key = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Ключ",
+        help_text="generation.generate_cache_key: версии промпта/схемы + хеш темы и кривой"
+    )
+    topic = models.CharField(
+        max_length=200,
+        verbose_name="Тема"
+    )
+    normalized_topic = models.CharField(
+        max_length=200,
+        blank=True,
+        db_index=True,
+        verbose_name="Нормализованная тема",
+        help_text="topics.normalize_topic: основы слов без стоп-слов"
+    )
+    count = models.IntegerField(
+        verbose_name="Количество вопросов"
+    )
+    questions = models.JSONField(
+        verbose_name="Вопросы",
+        help_text="Список QuestionSchema.dict()"
+    )
+    size_bytes = models.IntegerField(
+        default=0,
+        verbose_name="Размер (байт)"
+    )
+    hits = models.IntegerField(
+        default=0,
+        verbose_name="Попадания"
+    )
+    misses = models.IntegerField(
+        default=0,
+        verbose_name="Промахи",
+        help_text="Сколько раз вопросы по этому ключу генерировались заново"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+    last_used_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Последнее использование"
+    )
+    expires_at = models.DateTimeField(
+        verbose_name="Истекает"
+    )
+
+    class Meta:
+        verbose_name = "Кеш генерации"
+        verbose_name_plural = "Кеш генерации"
+        ordering = ['-last_used_at']
+
+    def __str__(self):
+        return f"{self.topic} ({self.count} вопросов, {self.hits} попаданий)"
+
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+
+class BankQuestion(models.Model):
+    """
+    Вопрос в банке для повторного использования в новых квизах.
+    Пополняется при сохранении сгенерированных вопросов (save_questions_to_quiz),
+    выбирается по (категория темы, сложность) — quiz_app/question_bank.py.
+    """
+    category = models.CharField(
+        max_length=50,
+        verbose_name="Категория темы",
+        help_text="prompts.detect_topic_category"
+    )
+    difficulty = models.CharField(
+        max_length=20,
+        choices=Question.DIFFICULTY_CHOICES,
+        verbose_name="Сложность"
+    )
+    topic = models.CharField(
+        max_length=200,
+        verbose_name="Тема"
+    )
+    normalized_topic = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Нормализованная тема"
+    )
+    text = models.TextField(
+        max_length=200,
+        verbose_name="Текст вопроса"
+    )
+    text_hash = models.CharField(
+        max_length=40,
+        unique=True,
+        verbose_name="Хеш текста",
+        help_text="SHA-1 нормализованного текста — защита от дублей"
+    )
+    choices = models.JSONField(
+        verbose_name="Варианты ответа"
+    )
+    correct_index = models.IntegerField(
+        validators=[MinValueValidator(0), MaxValueValidator(3)],
+        verbose_name="Индекс правильного ответа"
+    )
+    explanation = models.TextField(
+        blank=True,
+        max_length=300,
+        verbose_name="Объяснение"
+    )
+    image_url = models.CharField(
+        max_length=500,
+        blank=True,
+        verbose_name="URL картинки"
+    )
+    times_used = models.IntegerField(
+        default=0,
+        verbose_name="Использован раз"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+
+    class Meta:
+        verbose_name = "Вопрос банка"
+        verbose_name_plural = "Банк вопросов"
+        ordering = ['category', 'difficulty', 'times_used']
+        indexes = [
+            models.Index(fields=['category', 'difficulty', 'times_used']),
+        ]
+
+    def __str__(self):
+        return f"[{self.category}/{self.difficulty}] {self.text[:50]}"
+
+    def as_question_data(self):
+        """Данные для generation.QuestionSchema"""
+        return {
+            'text': self.text,
+            'choices': self.choices,
+            'correct_index': self.correct_index,
+            'difficulty': self.difficulty,
+            'explanation': self.explanation,
+            'image_url': self.image_url,
+        }
+
+
+class SessionStats(models.Model):
+    """
+    Снимок статистики игровой сессии.
+    Счётчики копятся в памяти по мере ответов (session_stats.RunningStats)
+    и замораживаются при завершении игры — экран статистики читает одну строку.
+    """
+    session = models.OneToOneField(
+        GameSession,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name="Сессия"
+    )
+    total_players = models.IntegerField(
+        default=0,
+        verbose_name="Игроков"
+    )
+    total_questions = models.IntegerField(
+        default=0,
+        verbose_name="Вопросов"
+    )
+    total_answers = models.IntegerField(
+        default=0,
+        verbose_name="Ответов"
+    )
+    correct_answers = models.IntegerField(
+        default=0,
+        verbose_name="Правильных ответов"
+    )
+    average_score = models.FloatField(
+        default=0,
+        verbose_name="Средний счёт"
+    )
+    fastest_answer = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Самый быстрый правильный ответ"
+    )
+    slowest_answer = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Самый медленный правильный ответ"
+    )
+    hardest_question = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Самый сложный вопрос"
+    )
+    question_counts = models.JSONField(
+        default=dict,
+        verbose_name="Ответы по вопросам",
+        help_text="{question_id: [правильных, всего]}"
+    )
+    frozen = models.BooleanField(
+        default=False,
+        verbose_name="Заморожен",
+        help_text="Игра завершена, снимок больше не меняется"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Обновлён"
+    )
+
+    class Meta:
+        verbose_name = "Статистика сессии"
+        verbose_name_plural = "Статистика сессий"
+
+    def __str__(self):
+        return f"Статистика {self.session_id}: {self.correct_answers}/{self.total_answers}"
+
+    @property
+    def average_accuracy(self):
+        """Доля правильных ответов, %"""
+        if not self.total_answers:
+            return 0
+        return round(self.correct_answers / self.total_answers * 100, 1)
+
+    def as_dict(self):
+        """Формат awards.get_session_statistics"""
+        return {
+            'total_players': self.total_players,
+            'total_questions': self.total_questions,
+            'total_answers': self.total_answers,
+            'average_score': round(self.average_score, 1),
+            'average_accuracy': self.average_accuracy,
+            'fastest_answer': self.fastest_answer,
+            'slowest_answer': self.slowest_answer,
+            'hardest_question': self.hardest_question,
+        }
+
+
+class CustomAward(models.Model):
+    """
+    Награда, заданная в админке без кода.
+    Описывается как агрегат по ответам игрока (метрика, фильтр, порог,
+    выбор победителя) и считается в общем проходе вместе со встроенными
+    наградами — quiz_app/awards.py.
+    """
+    METRIC_CHOICES = [
+        ('count', 'Количество ответов'),
+        ('sum', 'Сумма времени ответов'),
+        ('avg', 'Среднее время ответа'),
+        ('ratio', 'Доля от всех ответов игрока'),
+        ('player', 'Поле игрока'),
+    ]
+    PLAYER_FIELD_CHOICES = [
+        ('max_streak', 'Максимальная серия'),
+        ('score', 'Счёт'),
+    ]
+    THRESHOLD_OP_CHOICES = [
+        ('>=', '≥'),
+        ('>', '>'),
+        ('<=', '≤'),
+        ('<', '<'),
+    ]
+    WINNER_CHOICES = [
+        ('max', 'Наибольшее значение'),
+        ('min', 'Наименьшее значение'),
+    ]
+
+    key = models.SlugField(
+        max_length=50,
+        unique=True,
+        verbose_name="Ключ",
+        help_text="Уникальный ключ награды (не совпадает со встроенными)"
+    )
+    name = models.CharField(
+        max_length=50,
+        verbose_name="Название"
+    )
+    emoji = models.CharField(
+        max_length=10,
+        verbose_name="Эмодзи"
+    )
+    description = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Описание критерия"
+    )
+
+    # Метрика
+    metric = models.CharField(
+        max_length=10,
+        choices=METRIC_CHOICES,
+        default='count',
+        verbose_name="Метрика"
+    )
+    player_field = models.CharField(
+        max_length=20,
+        choices=PLAYER_FIELD_CHOICES,
+        blank=True,
+        verbose_name="Поле игрока",
+        help_text="Только для метрики «Поле игрока»"
+    )
+
+    # Фильтр ответов
+    correct = models.BooleanField(
+        null=True,
+        blank=True,
+        verbose_name="Правильность",
+        help_text="Пусто — любые ответы"
+    )
+    difficulties = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Сложности вопросов",
+        help_text='Например ["hard", "very_hard"]; пусто — любые'
+    )
+    time_over = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name="Время ответа больше (сек)"
+    )
+    time_under = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name="Время ответа меньше (сек)"
+    )
+    last_seconds = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name="В последние N секунд таймера"
+    )
+
+    # Порог и победитель
+    threshold_op = models.CharField(
+        max_length=2,
+        choices=THRESHOLD_OP_CHOICES,
+        default='>=',
+        verbose_name="Условие порога"
+    )
+    threshold = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name="Порог",
+        help_text="Пусто — без порога"
+    )
+    winner = models.CharField(
+        max_length=3,
+        choices=WINNER_CHOICES,
+        default='max',
+        verbose_name="Победитель"
+    )
+
+    # Отображение значения
+    value_scale = models.FloatField(
+        default=1,
+        verbose_name="Множитель значения",
+        help_text="Например 100 для процентов"
+    )
+    value_digits = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Знаков после запятой"
+    )
+    value_template = models.CharField(
+        max_length=100,
+        default='{value}',
+        verbose_name="Шаблон описания",
+        help_text="Например «Ответов: {value}» или «Точность: {value:.1f}%»"
+    )
+
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name="Активна"
+    )
+    order = models.IntegerField(
+        default=0,
+        verbose_name="Порядок"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+
+    class Meta:
+        verbose_name = "Своя награда"
+        verbose_name_plural = "Свои награды"
+        ordering = ['order', 'id']
+
+    def __str__(self):
+        return f"{self.emoji} {self.name}"
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .awards import AWARDS_DICT, DIFFICULTIES
+
+        errors = {}
+        if self.key in AWARDS_DICT:
+            errors['key'] = "Ключ занят встроенной наградой"
+        if self.metric == 'player' and not self.player_field:
+            errors['player_field'] = "Выберите поле игрока"
+        if not isinstance(self.difficulties, list) or not set(self.difficulties) <= set(DIFFICULTIES):
+            errors['difficulties'] = f"Список из {', '.join(DIFFICULTIES)}"
+        try:
+            self.value_template.format(value=1.0)
+        except (KeyError, IndexError, ValueError):
+            errors['value_template'] = "Шаблон должен содержать только {value}"
+        if errors:
+            raise ValidationError(errors)
+
+
+class ScoringProfile(models.Model):
+    """
+    Именованная формула очков (scoring.ScoringConfig).
+    Назначается квизу или сессии; при старте игры компилируется
+    в таблицы (scoring.CompiledScoring), а её настройки записываются
+    в GameSession.scoring_config.
+    """
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Название"
+    )
+    description = models.TextField(
+        blank=True,
+        verbose_name="Описание"
+    )
+    base_points = models.IntegerField(
+        default=DEFAULT_CONFIG.base_points,
+        validators=[MinValueValidator(0)],
+        verbose_name="Базовые очки"
+    )
+    speed_bonus = models.IntegerField(
+        default=DEFAULT_CONFIG.speed_bonus,
+        validators=[MinValueValidator(0)],
+        verbose_name="Бонус за скорость (макс.)"
+    )
+    speed_curve = models.CharField(
+        max_length=20,
+        choices=list(SPEED_CURVES.items()),
+        default=DEFAULT_CONFIG.speed_curve,
+        verbose_name="Форма бонуса за скорость"
+    )
+    streak_bonus = models.IntegerField(
+        default=DEFAULT_CONFIG.streak_bonus,
+        validators=[MinValueValidator(0)],
+        verbose_name="Бонус за ответ серии"
+    )
+    streak_cap = models.IntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0)],
+        verbose_name="Потолок серии",
+        help_text="Сколько ответов серии учитывается; пусто — без ограничения"
+    )
+    difficulty_multipliers = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Множители сложности",
+        help_text='Например {"hard": 1.5}; не указанные — стандартные'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Обновлён"
+    )
+
+    class Meta:
+        verbose_name = "Профиль очков"
+        verbose_name_plural = "Профили очков"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def to_config(self) -> ScoringConfig:
+        return ScoringConfig(
+            base_points=self.base_points,
+            speed_bonus=self.speed_bonus,
+            speed_curve=self.speed_curve,
+            streak_bonus=self.streak_bonus,
+            streak_cap=self.streak_cap,
+        ).with_multipliers(**(self.difficulty_multipliers or {}))
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+
+        multipliers = self.difficulty_multipliers
+        difficulties = {key for key, _ in Question.DIFFICULTY_CHOICES}
+        if not isinstance(multipliers, dict) or not set(multipliers) <= difficulties or not all(
+            isinstance(value, (int, float)) and value >= 0 for value in multipliers.values()
+        ):
+            raise ValidationError({
+                'difficulty_multipliers': f"Словарь сложность → число ≥ 0, сложности: {', '.join(sorted(difficulties))}"
+            })
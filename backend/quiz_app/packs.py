@@ -0,0 +1,402 @@
+# quiz_app/packs.py
+
+import io
+import gzip
+import json
+import zlib
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Prefetch
+from pydantic import ValidationError
+
+from .models import Quiz, Question, Choice
+from .generation import QuestionSchema, save_questions_to_quiz, bulk_save_questions
+from . import question_bank
+
+logger = logging.getLogger(__name__)
+
+# Формат файла пака: JSON Lines (можно в gzip).
+# Первая строка — заголовок {"format": "quiz-pack", "version": 1},
+# дальше для каждого квиза строка {"type": "quiz", ...}
+# и строки его вопросов {"type": "question", ...}
+PACK_FORMAT = 'quiz-pack'
+PACK_VERSION = 1
+
+# Вопросов в одном bulk INSERT при импорте и в одной выборке при экспорте
+PACK_BATCH_SIZE = getattr(settings, 'QUIZ_PACK_BATCH_SIZE', 500)
+
+# Поля квиза, которые переносятся в пак (см. quiz_fields)
+QUIZ_FIELDS = ['title', 'topic', 'description', 'image_url', 'time_per_question']
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+class PackError(ValueError):
+    """Пак вопросов не прошёл проверку"""
+
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.details = details or []
+
+
+# ============================================================================
+# ИМПОРТ
+# ============================================================================
+
+def _integer(data, name, default=None):
+    """Целое поле пака (bool и дробные не принимаются)"""
+    value = data.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise PackError(f'{name} должен быть целым числом')
+    try:
+        return int(value)
+    except ValueError:
+        raise PackError(f'{name} должен быть целым числом')
+
+
+def quiz_fields(data):
+    """
+    Поля нового квиза из пака
+
+    bulk_create и objects.create не вызывают валидаторы модели, поэтому
+    time_per_question проверяется по ним здесь (Quiz: 10–60 сек).
+
+    Args:
+        data: dict с topic и необязательными title, description,
+            image_url, time_per_question, question_count (сколько
+            вопросов должно быть в паке — проверяется при импорте)
+
+    Returns:
+        dict: аргументы для Quiz.objects.create (question_count — только
+            если задан в паке)
+
+    Raises:
+        PackError: нет topic, неверные типы полей или значения вне допустимых
+    """
+    topic = str(data.get('topic') or '').strip()
+    if not topic:
+        raise PackError('Требуется topic')
+    if len(topic) > 200:
+        raise PackError('topic длиннее 200 символов')
+
+    time_per_question = _integer(data, 'time_per_question', 20)
+    try:
+        Quiz._meta.get_field('time_per_question').run_validators(time_per_question)
+    except DjangoValidationError as e:
+        raise PackError(f"time_per_question: {' '.join(e.messages)}")
+
+    fields = {
+        'title': str(data.get('title') or f"Квиз: {topic}")[:200],
+        'topic': topic,
+        'description': str(data.get('description') or ''),
+        'image_url': str(data.get('image_url') or '')[:500],
+        'time_per_question': time_per_question,
+    }
+
+    if data.get('question_count') is not None:
+        fields['question_count'] = _integer(data, 'question_count')
+        if fields['question_count'] < 1:
+            raise PackError('question_count должен быть положительным')
+    return fields
+
+
+def parse_question(item):
+    """
+    Вопрос пака → QuestionSchema
+
+    correct_index проверяется строго: pydantic приводит true к 1 и "2" к 2.
+
+    Raises:
+        TypeError, ValidationError: вопрос невалиден
+    """
+    if not isinstance(item, dict):
+        raise TypeError('вопрос должен быть объектом')
+    correct_index = item.get('correct_index')
+    if isinstance(correct_index, bool) or not isinstance(correct_index, (int, type(None))):
+        raise TypeError('correct_index должен быть целым числом 0–3')
+    return QuestionSchema(**item)
+
+
+def check_question_count(fields, count):
+    """Число вопросов пака совпадает с объявленным question_count (если он задан)"""
+    declared = fields.get('question_count')
+    if declared is not None and declared != count:
+        raise PackError(f"Квиз '{fields['topic']}': объявлено вопросов {declared}, в паке {count}")
+
+
+def parse_questions(items):
+    """
+    Проверяет вопросы пака по QuestionSchema
+
+    Args:
+        items: список dict с полями text, choices, correct_index, ...
+
+    Returns:
+        list: QuestionSchema
+
+    Raises:
+        PackError: если хотя бы один вопрос невалиден (details — по вопросам)
+    """
+    if not isinstance(items, list) or not items:
+        raise PackError('Пак должен содержать непустой список questions')
+
+    questions = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            questions.append(parse_question(item))
+        except (ValidationError, TypeError) as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    if errors:
+        raise PackError(f'Невалидных вопросов: {len(errors)}', errors)
+    return questions
+
+
+def import_pack(data):
+    """
+    Создаёт квиз из JSON-пака вопросов
+
+    Формат:
+    {
+        "topic": "Советские фильмы",
+        "title": "Квиз: Советские фильмы",   // необязательно
+        "description": "...",                // необязательно
+        "image_url": "...",                  // необязательно
+        "time_per_question": 20,             // необязательно, 10–60
+        "question_count": 1,                 // необязательно, проверяется
+        "questions": [
+            {"text": "...", "choices": ["a", "b", "c", "d"], "correct_index": 1,
+             "difficulty": "medium", "explanation": "", "image_url": ""}
+        ]
+    }
+
+    Args:
+        data: dict пака
+
+    Returns:
+        Quiz: созданный квиз
+
+    Raises:
+        PackError: пак невалиден (квиз не создаётся)
+    """
+    if not isinstance(data, dict):
+        raise PackError('Пак должен быть JSON-объектом')
+
+    fields = quiz_fields(data)
+    questions = parse_questions(data.get('questions'))
+    check_question_count(fields, len(questions))
+
+    with transaction.atomic():
+        quiz = Quiz.objects.create(**fields)
+        save_questions_to_quiz(quiz, questions, generated_by_model=False)
+
+    logger.info(f"Imported pack '{quiz.topic}': quiz {quiz.id}, {len(questions)} questions")
+    return quiz
+
+
+# ============================================================================
+# ЭКСПОРТ (потоковый)
+# ============================================================================
+
+def question_to_pack(question):
+    """Строка вопроса пака (варианты должны быть предзагружены по order)"""
+    choices = list(question.choices.all())
+    correct_index = next((i for i, c in enumerate(choices) if c.is_correct), 0)
+    return {
+        'type': 'question',
+        'text': question.text,
+        'choices': [c.text for c in choices],
+        'correct_index': correct_index,
+        'difficulty': question.difficulty,
+        'explanation': question.explanation,
+        'image_url': question.image_url,
+    }
+
+
+def iter_pack_lines(quizzes):
+    """
+    Строки пака (bytes, с переводом строки) для набора квизов
+
+    Вопросы читаются пачками по PACK_BATCH_SIZE вместе с вариантами ответа,
+    так что память не зависит от размера библиотеки.
+
+    Args:
+        quizzes: QuerySet квизов
+
+    Yields:
+        bytes: строка JSON Lines
+    """
+    def line(payload):
+        return json.dumps(payload, ensure_ascii=False).encode() + b'\n'
+
+    yield line({'format': PACK_FORMAT, 'version': PACK_VERSION})
+
+    choices = Prefetch('choices', queryset=Choice.objects.order_by('order'))
+    for quiz in quizzes.order_by('id').iterator(chunk_size=PACK_BATCH_SIZE):
+        yield line({'type': 'quiz', **{name: getattr(quiz, name) for name in QUIZ_FIELDS}})
+
+        questions = (
+            Question.objects
+            .filter(quiz=quiz)
+            .order_by('order')
+            .prefetch_related(choices)
+            .iterator(chunk_size=PACK_BATCH_SIZE)
+        )
+        for question in questions:
+            yield line(question_to_pack(question))
+
+
+def gzip_stream(chunks):
+    """Сжимает поток bytes в gzip на лету"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 — заголовок gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ============================================================================
+# ИМПОРТ (потоковый)
+# ============================================================================
+
+def open_pack(fileobj):
+    """
+    Текстовый поток строк пака из бинарного файла (gzip определяется по сигнатуре)
+
+    Args:
+        fileobj: бинарный файл (open(..., 'rb'), UploadedFile)
+    """
+    if hasattr(fileobj, 'peek'):
+        head = fileobj.peek(2)[:2]
+    else:
+        head = fileobj.read(2)
+        fileobj.seek(0)
+
+    if head == _GZIP_MAGIC:
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode='rb')
+    return io.TextIOWrapper(fileobj, encoding='utf-8')
+
+
+def read_pack(lines):
+    """
+    Разбирает строки пака
+
+    Args:
+        lines: итератор строк (str)
+
+    Yields:
+        tuple: ('quiz', dict полей квиза, номер строки)
+            или ('question', QuestionSchema, номер строки)
+
+    Raises:
+        PackError: неизвестный формат/версия или невалидная строка
+    """
+    header = None
+    for line_no, raw in enumerate(lines, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+
+        try:
+            item = json.loads(raw)
+        except ValueError as e:
+            raise PackError(f'Строка {line_no}: невалидный JSON ({e})')
+        if not isinstance(item, dict):
+            raise PackError(f'Строка {line_no}: ожидается JSON-объект')
+
+        if header is None:
+            header = item
+            if header.get('format') != PACK_FORMAT:
+                raise PackError('Файл не является паком квизов (нет заголовка quiz-pack)')
+            if header.get('version') != PACK_VERSION:
+                raise PackError(f"Неподдерживаемая версия пака: {header.get('version')}")
+            continue
+
+        kind = item.pop('type', None)
+        if kind == 'quiz':
+            try:
+                yield 'quiz', quiz_fields(item), line_no
+            except PackError as e:
+                raise PackError(f'Строка {line_no}: {e}')
+        elif kind == 'question':
+            try:
+                yield 'question', parse_question(item), line_no
+            except (ValidationError, TypeError) as e:
+                raise PackError(f'Строка {line_no}: невалидный вопрос', [{'line': line_no, 'error': str(e)}])
+        else:
+            raise PackError(f'Строка {line_no}: неизвестный тип записи {kind!r}')
+
+    if header is None:
+        raise PackError('Пустой пак')
+
+
+def import_pack_file(fileobj):
+    """
+    Импортирует квизы из файла пака
+
+    Файл читается построчно, вопросы сохраняются пачками по PACK_BATCH_SIZE
+    (bulk INSERT). Импорт атомарный: при ошибке в любой строке
+    не создаётся ни один квиз.
+
+    Args:
+        fileobj: бинарный файл пака (JSON Lines или gzip)
+
+    Returns:
+        list: созданные Quiz
+
+    Raises:
+        PackError: пак невалиден
+    """
+    created = []
+
+    with transaction.atomic():
+        quiz = None
+        fields, quiz_line = None, 0
+        batch = []
+        saved = 0
+
+        def flush():
+            nonlocal saved
+            if batch:
+                bulk_save_questions(quiz, batch, start_order=saved + 1, generated_by_model=False)
+                question_bank.add_to_bank(quiz.topic, batch)
+                saved += len(batch)
+                batch.clear()
+
+        def finish():
+            flush()
+            if not saved:
+                raise PackError(f"Квиз '{quiz.topic}' без вопросов")
+            try:
+                check_question_count(fields, saved)
+            except PackError as e:
+                raise PackError(f'Строка {quiz_line}: {e}')
+            quiz.question_count = saved
+            quiz.save(update_fields=['question_count'])
+            created.append(quiz)
+
+        for kind, item, line_no in read_pack(open_pack(fileobj)):
+            if kind == 'quiz':
+                if quiz is not None:
+                    finish()
+                quiz = Quiz.objects.create(**item)
+                fields, quiz_line = item, line_no
+                saved = 0
+                continue
+
+            if quiz is None:
+                raise PackError(f'Строка {line_no}: вопрос до первого квиза')
+            batch.append(item)
+            if len(batch) >= PACK_BATCH_SIZE:
+                flush()
+
+        if quiz is not None:
+            finish()
+
+    logger.info(f"Imported {len(created)} quizzes from pack")
+    return created
@@ -0,0 +1,178 @@
+# quiz_app/presence.py
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .models import Player
+from .frames import frame
+from .game_state import get_game_state
+from .scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Игрок считается отключённым, если не было ping дольше (сек)
+HEARTBEAT_TIMEOUT = getattr(settings, 'QUIZ_HEARTBEAT_TIMEOUT', 15)
+# Как часто sweeper проверяет last_seen (сек)
+SWEEP_INTERVAL = getattr(settings, 'QUIZ_PRESENCE_SWEEP_INTERVAL', 5)
+
+
+class PresenceTracker:
+    """
+    last_seen игроков в памяти процесса
+
+    Ping только обновляет время в памяти. В БД (Player.connected / last_seen)
+    пишутся лишь переходы: игрок появился или пропал.
+    Отслеживаемый игрок = подключённый.
+    """
+
+    def __init__(self):
+        self._last_seen: Dict[int, float] = {}
+        self._sessions: Dict[int, str] = {}
+        # REST heartbeat приходит из потоков sync_to_async
+        self._lock = threading.Lock()
+
+    def touch(self, player_id, session_code, now=None):
+        """
+        Отмечает активность игрока
+
+        Returns:
+            bool: True если игрок до этого не считался подключённым
+        """
+        now = now or time.time()
+        with self._lock:
+            was_tracked = player_id in self._last_seen
+            self._last_seen[player_id] = now
+            self._sessions[player_id] = session_code
+        return not was_tracked
+
+    def forget(self, player_id):
+        """
+        Перестать отслеживать игрока (сокет закрыт)
+
+        Returns:
+            bool: True если игрок считался подключённым
+        """
+        with self._lock:
+            self._sessions.pop(player_id, None)
+            return self._last_seen.pop(player_id, None) is not None
+
+    def last_seen(self, player_id) -> Optional[datetime]:
+        seen = self._last_seen.get(player_id)
+        return _to_datetime(seen) if seen else None
+
+    def collect_stale(self, timeout, now=None) -> Dict[str, List[Tuple[int, float]]]:
+        """
+        Забирает игроков без ping дольше timeout
+
+        Returns:
+            dict: {session_code: [(player_id, last_seen), ...]}
+        """
+        deadline = (now or time.time()) - timeout
+        stale = {}
+        with self._lock:
+            for player_id, seen in list(self._last_seen.items()):
+                if seen < deadline:
+                    code = self._sessions.pop(player_id)
+                    del self._last_seen[player_id]
+                    stale.setdefault(code, []).append((player_id, seen))
+        return stale
+
+
+tracker = PresenceTracker()
+
+
+def _to_datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+# ============================================================================
+# ПЕРЕХОДЫ ПОДКЛЮЧЕНИЯ
+# ============================================================================
+
+def persist_connected(player_id):
+    """Записать в БД, что игрок снова на связи (синхронно)"""
+    Player.objects.filter(id=player_id).update(
+        connected=True,
+        last_seen=tracker.last_seen(player_id) or datetime.now(dt_timezone.utc)
+    )
+
+
+def _persist_disconnected(stale):
+    players = [
+        Player(id=player_id, connected=False, last_seen=_to_datetime(seen))
+        for entries in stale.values()
+        for player_id, seen in entries
+    ]
+    Player.objects.bulk_update(players, ['connected', 'last_seen'])
+
+
+async def players_disconnected(code, player_ids):
+    """
+    Отметить игроков отключёнными в игре и разослать одно событие на комнату:
+    {"type": "player_disconnected", "player_ids": [id, ...]}
+
+    Args:
+        code: код сессии
+        player_ids: ID отключившихся игроков
+    """
+    game = get_game_state(code)
+    if game is not None:
+        for player_id in player_ids:
+            game.set_connected(player_id, False)
+
+        scheduler = get_scheduler(code)
+        # Ждали только отключившихся — закрываем вопрос
+        if game.open_question_uuid and game.all_answered(game.open_question_uuid):
+            scheduler.notify_all_answered()
+        scheduler.answer_stats_changed()
+
+    await get_channel_layer().group_send(
+        f'game_{code}',
+        frame({
+            'type': 'player_disconnected',
+            'player_ids': player_ids
+        })
+    )
+
+
+# ============================================================================
+# SWEEPER
+# ============================================================================
+
+_sweeper = None
+
+
+def start_sweeper():
+    """Запускает sweeper (один на процесс), если он ещё не работает"""
+    global _sweeper
+    if _sweeper is None or _sweeper.done():
+        _sweeper = asyncio.get_running_loop().create_task(_sweep_forever())
+
+
+async def _sweep_forever():
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        try:
+            await sweep()
+        except Exception:
+            logger.exception("Presence sweep failed")
+
+
+async def sweep():
+    """Переводит пропавших игроков в connected=False пачкой"""
+    stale = tracker.collect_stale(HEARTBEAT_TIMEOUT)
+    if not stale:
+        return
+
+    await database_sync_to_async(_persist_disconnected)(stale)
+
+    for code, entries in stale.items():
+        await players_disconnected(code, [player_id for player_id, _ in entries])
@@ -0,0 +1,142 @@
+# quiz_app/question_bank.py
+
+import hashlib
+import logging
+import re
+from typing import Dict, List
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import BankQuestion
+from .prompts import detect_topic_category
+from .topics import normalize_topic, TopicMatcher
+
+logger = logging.getLogger(__name__)
+
+# Минимальное сходство темы вопроса банка с темой нового квиза.
+# Категория ('films', 'history', ...) слишком широкая сама по себе:
+# вопросы про Голливуд не должны попадать в квиз о советском кино.
+# Темы с разными числами или словами не похожи вовсе (TopicMatcher).
+BANK_TOPIC_SIMILARITY = getattr(settings, 'QUIZ_BANK_TOPIC_SIMILARITY', 0.7)
+
+# Сколько кандидатов на одну сложность разбирать при выборке
+BANK_CANDIDATES_PER_DIFFICULTY = 200
+
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+
+def text_hash(text):
+    """SHA-1 нормализованного текста вопроса (регистр, ё, пунктуация, пробелы)"""
+    normalized = _NON_WORD_RE.sub(' ', text.lower().replace('ё', 'е')).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+# ============================================================================
+# ПОПОЛНЕНИЕ
+# ============================================================================
+
+def add_to_bank(topic, questions):
+    """
+    Добавляет вопросы в банк (дубли по хешу текста пропускаются)
+
+    Args:
+        topic: тема квиза
+        questions: список QuestionSchema
+
+    Returns:
+        int: сколько вопросов передано на вставку
+    """
+    category = detect_topic_category(topic)
+    normalized = normalize_topic(topic)[:200]
+
+    rows = {}
+    for q in questions:
+        digest = text_hash(q.text)
+        rows[digest] = BankQuestion(
+            category=category,
+            difficulty=q.difficulty,
+            topic=topic[:200],
+            normalized_topic=normalized,
+            text=q.text,
+            text_hash=digest,
+            choices=list(q.choices),
+            correct_index=q.correct_index,
+            explanation=q.explanation,
+            image_url=q.image_url or '',
+        )
+
+    BankQuestion.objects.bulk_create(rows.values(), ignore_conflicts=True)
+    return len(rows)
+
+
+# ============================================================================
+# ВЫБОРКА
+# ============================================================================
+
+def draw(topic, difficulty_curve, exclude_texts=()) -> Dict[int, dict]:
+    """
+    Подбирает вопросы из банка под позиции кривой сложности
+
+    Кандидаты — вопросы той же категории темы и сложности, тема которых
+    похожа на запрошенную; реже использованные идут первыми. Похожие
+    темы отбираются до выборки кандидатов, чтобы их срез не заполнили
+    вопросы чужих тем той же категории.
+
+    Args:
+        topic: тема квиза
+        difficulty_curve: список сложностей ['easy', 'medium', ...]
+        exclude_texts: тексты вопросов, которые уже есть в квизе
+
+    Returns:
+        dict: {позиция в кривой: данные QuestionSchema}; незаполненных позиций
+        в словаре нет — их нужно догенерировать
+    """
+    category = detect_topic_category(topic)
+    target = TopicMatcher(normalize_topic(topic))
+    if not target:
+        return {}
+
+    # Сходство считаем один раз на каждую различную тему категории
+    topics = (
+        BankQuestion.objects
+        .filter(category=category)
+        .order_by()
+        .values_list('normalized_topic', flat=True)
+        .distinct()
+    )
+    similar_topics = [normalized for normalized in topics if target.similarity(normalized) >= BANK_TOPIC_SIMILARITY]
+    if not similar_topics:
+        return {}
+
+    used_hashes = {text_hash(text) for text in exclude_texts}
+    pools: Dict[str, List[BankQuestion]] = {}
+
+    for difficulty in set(difficulty_curve):
+        pools[difficulty] = list(
+            BankQuestion.objects
+            .filter(category=category, difficulty=difficulty, normalized_topic__in=similar_topics)
+            .order_by('times_used', '?')[:BANK_CANDIDATES_PER_DIFFICULTY]
+        )
+
+    drawn = {}
+    for index, difficulty in enumerate(difficulty_curve):
+        pool = pools.get(difficulty, [])
+        while pool:
+            candidate = pool.pop(0)
+            if candidate.text_hash in used_hashes:
+                continue
+            used_hashes.add(candidate.text_hash)
+            drawn[index] = candidate
+            break
+
+    if drawn:
+        BankQuestion.objects.filter(id__in=[q.id for q in drawn.values()]).update(
+            times_used=F('times_used') + 1
+        )
+        logger.info(
+            f"Question bank: {len(drawn)}/{len(difficulty_curve)} questions "
+            f"for '{topic}' ({category})"
+        )
+
+    return {index: question.as_question_data() for index, question in drawn.items()}
@@ -0,0 +1,108 @@
+# quiz_app/question_payloads.py
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Question
+from .serializers import QuestionSerializer, QuestionForPlayerSerializer
+
+logger = logging.getLogger(__name__)
+
+# Сколько хранить готовые payload'ы вопросов квиза (сек);
+# при редактировании квиза/вопросов/вариантов сбрасываются сигналами.
+# Кеш общий (Redis, settings.CACHES): сброс в процессе админки или REST
+# виден процессу, где идёт комната
+PAYLOAD_TTL = getattr(settings, 'QUIZ_QUESTION_PAYLOAD_TTL', 60 * 60)
+
+# Аудитории payload'ов: игрокам — без правильного ответа, ведущему/результатам — с ответом
+PLAYER = 'player'
+HOST = 'host'
+
+
+def cache_key(quiz_id):
+    return f'quiz_payloads:{quiz_id}'
+
+
+def build_payloads(quiz_id):
+    """
+    Сериализует все вопросы квиза для обеих аудиторий (3 запроса на квиз)
+
+    Returns:
+        dict: {'orders': [order, ...], 'by_order': {order: {'player': ..., 'host': ...}}}
+    """
+    questions = QuestionSerializer.eager_load(
+        Question.objects.filter(quiz_id=quiz_id).order_by('order')
+    )
+
+    by_order = {}
+    for question in questions:
+        by_order[question.order] = {
+            PLAYER: dict(QuestionForPlayerSerializer(question).data),
+            HOST: dict(QuestionSerializer(question).data),
+        }
+    return {'orders': sorted(by_order), 'by_order': by_order}
+
+
+def get_payloads(quiz_id):
+    """Payload'ы вопросов квиза из кеша (собираются при промахе)"""
+    payloads = cache.get(cache_key(quiz_id))
+    if payloads is None:
+        payloads = build_payloads(quiz_id)
+        cache.set(cache_key(quiz_id), payloads, PAYLOAD_TTL)
+    return payloads
+
+
+def warm(quiz_id):
+    """Готовит payload'ы заранее (при старте сессии)"""
+    get_payloads(quiz_id)
+
+
+def invalidate(quiz_id):
+    """Сбрасывает payload'ы квиза (после правок вопросов)"""
+    cache.delete(cache_key(quiz_id))
+
+
+# ============================================================================
+# ВЫДАЧА
+# ============================================================================
+
+def question_payload(quiz_id, order, audience=PLAYER):
+    """
+    Payload вопроса квиза по его order
+
+    Вопросы, дописанные после сборки (потоковая генерация), подхватываются
+    пересборкой при промахе.
+
+    Args:
+        quiz_id: ID квиза
+        order: порядковый номер вопроса
+        audience: PLAYER или HOST
+
+    Returns:
+        dict или None, если вопроса нет
+    """
+    entry = get_payloads(quiz_id)['by_order'].get(order)
+    if entry is None:
+        invalidate(quiz_id)
+        entry = get_payloads(quiz_id)['by_order'].get(order)
+    return entry[audience] if entry else None
+
+
+def question_payload_at(quiz_id, index, audience=PLAYER):
+    """
+    Payload вопроса по индексу в порядке order (как GameSession.current_question)
+
+    Returns:
+        dict или None, если индекс за пределами квиза
+    """
+    if index < 0:
+        return None
+    orders = get_payloads(quiz_id)['orders']
+    if index >= len(orders):
+        invalidate(quiz_id)
+        orders = get_payloads(quiz_id)['orders']
+        if index >= len(orders):
+            return None
+    return question_payload(quiz_id, orders[index], audience)
@@ -7,4 +7,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/game/(?P<code>\w+)/$', consumers.GameConsumer.as_asgi()),
+    re_path(r'ws/generation/(?P<job_id>[0-9a-f-]+)/$', consumers.GenerationConsumer.as_asgi()),
 ]
\ No newline at end of file
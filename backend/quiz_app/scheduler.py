@@ -0,0 +1,371 @@
+# quiz_app/scheduler.py
+
+import time
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .models import GameSession
+from . import question_payloads
+from .game_state import ensure_game_state, get_game_state, drop_game_state
+from .frames import frame
+
+logger = logging.getLogger(__name__)
+
+# Паузы между фазами (в секундах)
+RESULT_DELAY = getattr(settings, 'QUIZ_RESULT_DELAY', 2)           # посмотреть на свой результат
+RESULTS_DURATION = getattr(settings, 'QUIZ_RESULTS_DURATION', 5)   # показ результатов вопроса
+ANSWER_GRACE = getattr(settings, 'QUIZ_ANSWER_GRACE', 1)           # запас на задержку сети
+COUNTDOWN_FROM = 3
+
+# В больших комнатах question_result несёт только топ и изменения позиций
+LEADERBOARD_FULL_LIMIT = getattr(settings, 'QUIZ_LEADERBOARD_FULL_LIMIT', 50)
+LEADERBOARD_TOP = getattr(settings, 'QUIZ_LEADERBOARD_TOP', 10)
+
+# answer_stats рассылается не чаще раза в окно (сек), только изменившиеся поля
+STATS_WINDOW = getattr(settings, 'QUIZ_STATS_WINDOW', 0.25)
+
+# Как часто проверять новые вопросы, пока квиз ещё генерируется (сек)
+GENERATION_POLL_INTERVAL = getattr(settings, 'QUIZ_GENERATION_POLL_INTERVAL', 1)
+
+
+class GameScheduler:
+    """
+    Игровые часы комнаты
+
+    Одна задача на сессию (не на consumer): показывает вопрос, ждёт до
+    дедлайна из Question.get_time_limit() или пока все не ответят,
+    рассылает question_result и следующий question, в конце — game_over.
+
+    Consumer'ы только сообщают о событиях (ответили все, пауза, пропуск)
+    и сразу возвращаются к обработке своих сообщений.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.group = f'game_{code}'
+        self.channel_layer = get_channel_layer()
+
+        self.phase = 'idle'  # idle | question | result | finished
+        self.deadline = None  # loop.time() окончания текущего вопроса
+
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._running = asyncio.Event()
+        self._running.set()
+        self._action = None  # answered | skip | next
+
+        self._stats_handle = None
+        self._stats_sent = {}  # последняя разосланная статистика текущего вопроса
+
+    @property
+    def is_active(self):
+        return self._task is not None and not self._task.done()
+
+    # ------------------------------------------------------------------------
+    # Команды (вызываются consumer'ами)
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """Запустить игру (False если уже идёт)"""
+        if self.is_active:
+            return False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return True
+
+    def notify_all_answered(self):
+        """Все подключённые игроки ответили — закрываем вопрос досрочно"""
+        self._interrupt('answered')
+
+    def answer_stats_changed(self):
+        """
+        Статистика ответов изменилась
+
+        Изменения за окно STATS_WINDOW склеиваются в одно событие answer_stats.
+        """
+        if self._stats_handle is None:
+            loop = asyncio.get_running_loop()
+            self._stats_handle = loop.call_later(
+                STATS_WINDOW, lambda: loop.create_task(self._send_answer_stats())
+            )
+
+    def skip(self):
+        """Пропустить текущий вопрос без результатов"""
+        self._interrupt('skip')
+
+    def next(self):
+        """Закрыть текущий вопрос сейчас и перейти к результатам"""
+        self._interrupt('next')
+
+    def pause(self):
+        """Остановить часы"""
+        self._running.clear()
+        self._wakeup.set()
+
+    async def resume(self):
+        """Обратный отсчёт 3-2-1 и продолжение игры"""
+        for i in range(COUNTDOWN_FROM, 0, -1):
+            await self._broadcast({'type': 'countdown', 'count': i})
+            await asyncio.sleep(1)
+
+        await self._broadcast({'type': 'game_resumed'})
+        self._running.set()
+
+    async def stop(self):
+        """Завершить игру досрочно"""
+        if self.phase == 'finished':
+            return
+
+        if self.is_active and self._task is not asyncio.current_task():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.finish()
+
+    def _interrupt(self, action):
+        if self.phase != 'question':
+            return
+        self._action = action
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------------
+    # Игровой цикл
+    # ------------------------------------------------------------------------
+
+    async def _run(self):
+        try:
+            game = await ensure_game_state(self.code)
+
+            while await self._next_question_ready(game):
+                if game.state == 'finished':
+                    # Сессию завершили через REST (/end/), game_over уже разослан
+                    drop_scheduler(self.code)
+                    return
+
+                question = game.question_at(game.current_question)
+
+                # До рассылки: ответ или пропуск сразу после неё относятся к этому вопросу
+                self._action = None
+                self.phase = 'question'
+                await self.show_question(game, question)
+
+                action = await self._wait(question.time_limit + ANSWER_GRACE, track_deadline=True)
+                game.close_answers()
+                self.phase = 'result'
+
+                if action == 'skip':
+                    continue
+
+                if action == 'answered':
+                    logger.info(f"Game {self.code}: all answered, showing results")
+                    await self._wait(RESULT_DELAY)
+
+                await self.show_question_results(game, question)
+                await self._wait(RESULTS_DURATION)
+
+            logger.info(f"Game {self.code}: no more questions, finishing")
+            await self.finish()
+
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(f"Game {self.code}: scheduler failed")
+
+    async def _next_question_ready(self, game):
+        """
+        Есть ли следующий вопрос
+
+        Если квиз ещё генерируется потоком, ждёт, пока следующий вопрос
+        появится в БД (или генерация закончится).
+        """
+        while not game.has_more_questions():
+            # Проверяем до догрузки: вопрос мог сохраниться прямо перед концом задачи
+            pending = await game.generation_pending()
+            if await game.load_more_questions():
+                break
+            if not pending:
+                return False
+            await asyncio.sleep(GENERATION_POLL_INTERVAL)
+        return True
+
+    async def _wait(self, seconds, track_deadline=False):
+        """
+        Ждёт seconds игрового времени (пауза останавливает часы)
+
+        Действия (answered/skip/next) прерывают только ожидание вопроса
+        (track_deadline=True) и при этом сбрасываются; в паузах между
+        фазами пробуждение — всегда пауза.
+
+        Returns:
+            str: 'timeout' или действие, прервавшее ожидание вопроса
+        """
+        loop = asyncio.get_running_loop()
+        remaining = seconds
+
+        while remaining > 0:
+            await self._running.wait()
+            # Действие, пришедшее во время паузы, — до сброса пробуждения
+            if track_deadline and self._action is not None:
+                action, self._action = self._action, None
+                return action
+            self._wakeup.clear()
+
+            started = loop.time()
+            if track_deadline:
+                self.deadline = started + remaining
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return 'timeout'
+            finally:
+                remaining -= loop.time() - started
+
+            if track_deadline and self._action is not None:
+                action, self._action = self._action, None
+                return action
+            # Иначе — пауза: ждём resume и досиживаем оставшееся время
+
+        return 'timeout'
+
+    # ------------------------------------------------------------------------
+    # Фазы игры
+    # ------------------------------------------------------------------------
+
+    async def show_question(self, game, question):
+        """Разослать вопрос и открыть приём ответов"""
+        question_data = await _question_payload(game.quiz_id, question.order, question_payloads.PLAYER)
+
+        game.open_answers(question)
+        game.advance()
+        self._stats_sent = {}
+
+        await self._broadcast({
+            'type': 'question',
+            'question': question_data,
+            'sent_at': time.time(),  # время сервера: задержка доставки, синхронизация таймера
+        })
+
+    async def show_question_results(self, game, question):
+        """Показать результаты вопроса"""
+        question_data = await _question_payload(game.quiz_id, question.order, question_payloads.HOST)
+
+        message = {
+            'type': 'question_result',
+            'question': question_data,
+        }
+
+        ranking = game.ranking
+        if len(ranking) > LEADERBOARD_FULL_LIMIT:
+            message['leaderboard'] = ranking.top(LEADERBOARD_TOP)
+            message['leaderboard_changes'] = ranking.changes()
+            message['leaderboard_size'] = len(ranking)
+        else:
+            message['leaderboard'] = ranking.top()
+        ranking.mark_broadcast()
+
+        await self._broadcast(message)
+
+    async def finish(self):
+        """Завершение игры"""
+        from .awards import calculate_awards
+        from .session_stats import freeze
+
+        self.phase = 'finished'
+        game = await ensure_game_state(self.code)
+        game.close_answers()
+        await game.set_state('finished')
+
+        # Получаем финальную таблицу лидеров
+        leaderboard = game.leaderboard()
+
+        # Награды считаются по БД — дожидаемся записи всех ответов
+        await game.flush()
+        awards = await database_sync_to_async(
+            lambda: calculate_awards(GameSession.objects.get(code=self.code))
+        )()
+
+        # Статистика уже посчитана в памяти — замораживаем снимок
+        await database_sync_to_async(freeze)(game.session_id, game.stats_snapshot())
+
+        drop_game_state(self.code)
+        drop_scheduler(self.code)
+
+        await self._broadcast({
+            'type': 'game_over',
+            'leaderboard': leaderboard,
+            'awards': awards
+        })
+
+    async def _send_answer_stats(self):
+        """Разослать изменившиеся с прошлой рассылки поля статистики"""
+        self._stats_handle = None
+
+        game = get_game_state(self.code)
+        if game is None:
+            return
+
+        stats = game.answer_stats()
+        delta = _diff_stats(self._stats_sent, stats)
+        if not delta:
+            return
+
+        self._stats_sent = stats
+        await self._broadcast({
+            'type': 'answer_stats',
+            **delta
+        })
+
+    async def _broadcast(self, message):
+        # Кодируем один раз — consumer'ы комнаты пересылают готовый текст
+        await self.channel_layer.group_send(self.group, frame(message))
+
+
+def _diff_stats(sent, stats):
+    """Поля stats, отличающиеся от sent (для вложенных dict — только изменённые ключи)"""
+    delta = {}
+    for key, value in stats.items():
+        previous = sent.get(key)
+        if isinstance(value, dict):
+            previous = previous or {}
+            changed = {k: v for k, v in value.items() if previous.get(k) != v}
+            if changed:
+                delta[key] = changed
+        elif previous != value:
+            delta[key] = value
+    return delta
+
+
+@database_sync_to_async
+def _question_payload(quiz_id, order, audience):
+    return question_payloads.question_payload(quiz_id, order, audience)
+
+
+# ============================================================================
+# РЕЕСТР ПЛАНИРОВЩИКОВ
+# ============================================================================
+
+_schedulers: Dict[str, GameScheduler] = {}
+
+
+def get_scheduler(code) -> GameScheduler:
+    """Планировщик комнаты (создаётся при первом обращении)"""
+    scheduler = _schedulers.get(code)
+    if scheduler is None:
+        scheduler = _schedulers[code] = GameScheduler(code)
+    return scheduler
+
+
+def find_scheduler(code) -> Optional[GameScheduler]:
+    """Планировщик комнаты, если он уже создан в этом процессе"""
+    return _schedulers.get(code)
+
+
+def drop_scheduler(code):
+    _schedulers.pop(code, None)
@@ -0,0 +1,134 @@
+# quiz_app/score_replay.py
+
+from dataclasses import dataclass
+from typing import List
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Answer, Player, GameSession, SessionStats
+from .scoring import ScoringConfig, score_batch
+
+
+@dataclass
+class PlayerReplay:
+    """Счёт игрока: записанный и пересчитанный"""
+    id: int
+    name: str
+    old_score: int
+    new_score: int = 0
+
+
+@dataclass
+class ReplayResult:
+    """
+    Пересчёт очков сессии по другой формуле
+
+    Attributes:
+        session: GameSession
+        config: ScoringConfig, по которой пересчитано
+        answer_ids: ID ответов в порядке пересчёта
+        old_points: записанные points_earned
+        new_points: пересчитанные points_earned
+        players: PlayerReplay в порядке нового счёта
+    """
+    session: object
+    config: ScoringConfig
+    answer_ids: List[int]
+    old_points: List[int]
+    new_points: List[int]
+    players: List[PlayerReplay]
+
+    @property
+    def changed_answers(self):
+        return sum(1 for old, new in zip(self.old_points, self.new_points) if old != new)
+
+
+def replay_session(session, config=None) -> ReplayResult:
+    """
+    Пересчитывает очки всех ответов сессии (ничего не пишет в БД)
+
+    Серия восстанавливается по ответам игрока в порядке вопросов, как в
+    игре: правильный ответ продлевает её, неправильный обнуляет. Сами
+    очки считаются одним вызовом score_batch.
+
+    Args:
+        session: GameSession (с quiz — нужен time_per_question)
+        config: ScoringConfig; по умолчанию — формула, записанная в сессии
+
+    Returns:
+        ReplayResult
+    """
+    rows = (
+        Answer.objects
+        .filter(player__session=session)
+        .order_by('player_id', 'question__order', 'answered_at', 'id')
+        .values_list(
+            'id', 'player_id', 'is_correct', 'time_taken',
+            'question__time_limit', 'question__difficulty', 'points_earned'
+        )
+    )
+    default_limit = session.quiz.time_per_question
+    config = config or session.get_scoring_config()
+
+    answer_ids, player_ids, old_points = [], [], []
+    is_correct, time_taken, time_limit, streaks, difficulty = [], [], [], [], []
+
+    player_id, streak = None, 0
+    for answer_id, answer_player_id, correct, taken, limit, answer_difficulty, points in rows:
+        if answer_player_id != player_id:
+            player_id, streak = answer_player_id, 0
+
+        answer_ids.append(answer_id)
+        player_ids.append(answer_player_id)
+        old_points.append(points)
+        is_correct.append(correct)
+        time_taken.append(taken)
+        time_limit.append(limit if limit > 0 else default_limit)
+        streaks.append(streak)
+        difficulty.append(answer_difficulty)
+
+        streak = streak + 1 if correct else 0
+
+    new_points = [int(p) for p in score_batch(is_correct, time_taken, time_limit, streaks, difficulty, config)['total']]
+
+    players = {
+        pid: PlayerReplay(id=pid, name=name, old_score=score)
+        for pid, name, score in session.players.values_list('id', 'name', 'score')
+    }
+    for pid, points in zip(player_ids, new_points):
+        players[pid].new_score += points
+
+    return ReplayResult(
+        session=session,
+        config=config,
+        answer_ids=answer_ids,
+        old_points=old_points,
+        new_points=new_points,
+        players=sorted(players.values(), key=lambda p: -p.new_score),
+    )
+
+
+@transaction.atomic
+def apply_replay(result: ReplayResult):
+    """Записывает пересчитанные очки ответов и игроков и формулу, по которой они получены"""
+    from .awards import awards_cache_key
+
+    Answer.objects.bulk_update(
+        [Answer(id=aid, points_earned=points) for aid, points in zip(result.answer_ids, result.new_points)],
+        ['points_earned'],
+        batch_size=1000
+    )
+    Player.objects.bulk_update(
+        [Player(id=p.id, score=p.new_score) for p in result.players],
+        ['score'],
+        batch_size=1000
+    )
+
+    GameSession.objects.filter(id=result.session.id).update(scoring_config=result.config.as_dict())
+
+    # Средний счёт в снимке статистики и награды зависят от очков
+    if result.players:
+        average = sum(p.new_score for p in result.players) / len(result.players)
+        SessionStats.objects.filter(session=result.session).update(average_score=average)
+    transaction.on_commit(lambda: cache.delete(awards_cache_key(result.session.id)))
@@ -2,9 +2,185 @@
 # ФАЙЛ 1: backend/quiz_app/scoring.py (СОЗДАЙ НОВЫЙ ФАЙЛ)
 # ============================================================================
 
-def calculate_score(is_correct, time_taken, time_limit, current_streak, difficulty):
+import math
+from dataclasses import dataclass, replace, asdict, fields
+from functools import lru_cache
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy необязателен: без него score_batch считает в чистом Python
+    np = None
+
+
+# ============================================================================
+# НАСТРОЙКИ ФОРМУЛЫ
+# ============================================================================
+
+DEFAULT_MULTIPLIERS = (
+    ('easy', 0.8),
+    ('medium', 1.0),
+    ('hard', 1.3),
+    ('very_hard', 1.5),
+    ('fun', 0.5),  # fun вопросы дают меньше очков
+)
+
+# Форма бонуса за скорость: доля оставшегося времени r ∈ [0, 1] → доля бонуса
+SPEED_CURVES = {
+    'linear': 'Линейная',         # r
+    'quadratic': 'Квадратичная',  # r² — бонус в основном за очень быстрые ответы
+    'sqrt': 'Корень',             # √r — бонус мягче убывает к концу таймера
+}
+
+# До какой серии бонус за streak берётся из таблицы (без потолка дальше — умножение)
+STREAK_TABLE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    """
+    Параметры формулы очков (неизменяемые — компилируются один раз)
+
+    Attributes:
+        base_points: базовые очки за правильный ответ
+        speed_bonus: максимальный бонус за скорость (ответ мгновенно)
+        speed_curve: форма бонуса за скорость (SPEED_CURVES)
+        streak_bonus: бонус за каждый правильный ответ подряд до этого
+        streak_cap: сколько ответов серии учитывается (None — без ограничения)
+        difficulty_multipliers: ((сложность, множитель), ...)
+        default_multiplier: множитель для неизвестной сложности
+    """
+    base_points: int = 1000
+    speed_bonus: int = 500
+    speed_curve: str = 'linear'
+    streak_bonus: int = 100
+    streak_cap: Optional[int] = None
+    difficulty_multipliers: Tuple[Tuple[str, float], ...] = DEFAULT_MULTIPLIERS
+    default_multiplier: float = 1.0
+
+    def multiplier(self, difficulty):
+        return compile_scoring(self).multiplier(difficulty)
+
+    def with_multipliers(self, **multipliers):
+        """Копия с изменёнными множителями сложности"""
+        merged = {**dict(self.difficulty_multipliers), **multipliers}
+        return replace(self, difficulty_multipliers=tuple(merged.items()))
+
+    def as_dict(self):
+        """JSON-совместимый вид (для записи в сессию)"""
+        data = asdict(self)
+        data['difficulty_multipliers'] = dict(self.difficulty_multipliers)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Обратно из as_dict (неизвестные ключи пропускаются)"""
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        if 'difficulty_multipliers' in values:
+            values['difficulty_multipliers'] = tuple(values['difficulty_multipliers'].items())
+        return cls(**values)
+
+
+DEFAULT_CONFIG = ScoringConfig()
+
+EMPTY_BREAKDOWN = {
+    'base': 0,
+    'speed': 0,
+    'streak': 0,
+    'multiplier': 0,
+    'total': 0
+}
+
+
+# ============================================================================
+# СКОМПИЛИРОВАННАЯ ФОРМУЛА
+# ============================================================================
+
+class CompiledScoring:
+    """
+    ScoringConfig, разложенный в таблицы для горячего пути
+
+    Множители сложностей — словарь (в игре множитель вопроса берётся
+    один раз при загрузке), бонусы серии — список по длине серии.
+    На ответ остаются чтения из таблиц и бонус за скорость.
     """
-    Рассчитывает очки за ответ
+
+    def __init__(self, config: ScoringConfig):
+        if config.speed_curve not in SPEED_CURVES:
+            raise ValueError(f"Неизвестная форма бонуса за скорость: {config.speed_curve}")
+
+        self.config = config
+        self.base_points = config.base_points
+        self.speed_bonus = config.speed_bonus
+        self.speed_curve = config.speed_curve
+        self.multipliers = dict(config.difficulty_multipliers)
+        self.default_multiplier = config.default_multiplier
+
+        self._capped = config.streak_cap is not None
+        size = config.streak_cap + 1 if self._capped else STREAK_TABLE_SIZE
+        self.streak_points = [streak * config.streak_bonus for streak in range(size)]
+
+    def multiplier(self, difficulty):
+        return self.multipliers.get(difficulty, self.default_multiplier)
+
+    def streak(self, current_streak):
+        """Бонус за серию"""
+        if current_streak < len(self.streak_points):
+            return self.streak_points[current_streak]
+        if self._capped:
+            return self.streak_points[-1]
+        return current_streak * self.config.streak_bonus
+
+    def speed(self, time_taken, time_limit):
+        """Бонус за скорость, не меньше 0"""
+        ratio = 1 - (time_taken / time_limit)
+        if ratio <= 0:
+            return 0
+        if self.speed_curve == 'quadratic':
+            ratio = ratio * ratio
+        elif self.speed_curve == 'sqrt':
+            ratio = math.sqrt(ratio)
+        return int(ratio * self.speed_bonus)
+
+    def score(self, is_correct, time_taken, time_limit, current_streak, multiplier):
+        """Очки за ответ; multiplier — уже найденный множитель сложности вопроса"""
+        if not is_correct:
+            return 0
+        return int(
+            (self.base_points + self.speed(time_taken, time_limit) + self.streak(current_streak)) * multiplier
+        )
+
+    def breakdown(self, is_correct, time_taken, time_limit, current_streak, difficulty):
+        """Разбивка очков (формат get_score_breakdown)"""
+        if not is_correct:
+            return dict(EMPTY_BREAKDOWN)
+
+        speed_bonus = self.speed(time_taken, time_limit)
+        streak_bonus = self.streak(current_streak)
+        multiplier = self.multiplier(difficulty)
+        return {
+            'base': self.base_points,
+            'speed': speed_bonus,
+            'streak': streak_bonus,
+            'multiplier': multiplier,
+            'total': int((self.base_points + speed_bonus + streak_bonus) * multiplier)
+        }
+
+
+@lru_cache(maxsize=64)
+def compile_scoring(config: ScoringConfig) -> CompiledScoring:
+    """CompiledScoring для настроек (кешируется: настройки неизменяемые)"""
+    return CompiledScoring(config)
+
+
+# ============================================================================
+# ОДИН ОТВЕТ
+# ============================================================================
+
+def get_score_breakdown(is_correct, time_taken, time_limit, current_streak, difficulty, config=DEFAULT_CONFIG):
+    """
+    Возвращает детальную разбивку очков (для отладки/статистики)
 
     Формула:
     - Базовые очки: 1000
@@ -12,83 +188,111 @@ def calculate_score(is_correct, time_taken, time_limit, current_streak, difficul
     - Бонус за streak: +100 за каждый правильный подряд
     - Множитель сложности: easy=0.8, medium=1.0, hard=1.3, very_hard=1.5, fun=0.5
 
+    Числа и форма бонуса за скорость — по умолчанию, задаются ScoringConfig.
+
     Args:
         is_correct: правильный ли ответ
         time_taken: время ответа в секундах
         time_limit: лимит времени на вопрос
         current_streak: текущая серия правильных ответов
         difficulty: сложность вопроса
+        config: ScoringConfig
 
     Returns:
-        int: количество очков (0 если неправильный)
+        dict: {'base': 1000, 'speed': 450, 'streak': 300, 'multiplier': 1.3, 'total': 2275}
     """
-    if not is_correct:
-        return 0
-
-    # Базовые очки
-    base_points = 1000
-
-    # Бонус за скорость (чем быстрее ответил, тем больше)
-    speed_ratio = 1 - (time_taken / time_limit)
-    speed_bonus = int(speed_ratio * 500)
-    speed_bonus = max(0, speed_bonus)  # не меньше 0
-
-    # Streak бонус
-    streak_bonus = current_streak * 100
-
-    # Множитель сложности
-    difficulty_multiplier = {
-        'easy': 0.8,
-        'medium': 1.0,
-        'hard': 1.3,
-        'very_hard': 1.5,
-        'fun': 0.5,  # fun вопросы дают меньше очков
-    }
-    multiplier = difficulty_multiplier.get(difficulty, 1.0)
+    return compile_scoring(config).breakdown(is_correct, time_taken, time_limit, current_streak, difficulty)
 
-    # Итоговый расчёт
-    total = int((base_points + speed_bonus + streak_bonus) * multiplier)
 
-    return total
+def calculate_score(is_correct, time_taken, time_limit, current_streak, difficulty, config=DEFAULT_CONFIG):
+    """
+    Рассчитывает очки за ответ (формула — get_score_breakdown)
 
+    Returns:
+        int: количество очков (0 если неправильный)
+    """
+    scoring = compile_scoring(config)
+    return scoring.score(is_correct, time_taken, time_limit, current_streak, scoring.multiplier(difficulty))
 
-def get_score_breakdown(is_correct, time_taken, time_limit, current_streak, difficulty):
+
+# ============================================================================
+# ПАКЕТ ОТВЕТОВ
+# ============================================================================
+
+def score_batch(is_correct, time_taken, time_limit, streak, difficulty, config=DEFAULT_CONFIG):
     """
-    Возвращает детальную разбивку очков (для отладки/статистики)
+    Очки и разбивка для пакета ответов одним вызовом
+
+    Аргументы — последовательности одной длины (i-й элемент каждой
+    относится к i-му ответу). Результат совпадает с get_score_breakdown
+    поэлементно. С numpy считается векторно, без него — циклом.
+
+    Args:
+        is_correct: правильные ли ответы
+        time_taken: время ответов (сек)
+        time_limit: лимиты времени вопросов (сек)
+        streak: серия правильных ответов игрока до каждого ответа
+        difficulty: сложности вопросов
+        config: ScoringConfig
 
     Returns:
-        dict: {'base': 1000, 'speed': 450, 'streak': 300, 'multiplier': 1.3, 'total': 2275}
+        dict: {'base', 'speed', 'streak', 'multiplier', 'total'} — массивы
+            numpy (если установлен) или списки
     """
-    if not is_correct:
-        return {
-            'base': 0,
-            'speed': 0,
-            'streak': 0,
-            'multiplier': 0,
-            'total': 0
-        }
+    scoring = compile_scoring(config)
+    multipliers = [scoring.multiplier(d) for d in difficulty]
 
-    base_points = 1000
-    speed_ratio = 1 - (time_taken / time_limit)
-    speed_bonus = int(speed_ratio * 500)
-    speed_bonus = max(0, speed_bonus)
-    streak_bonus = current_streak * 100
-
-    difficulty_multiplier = {
-        'easy': 0.8,
-        'medium': 1.0,
-        'hard': 1.3,
-        'very_hard': 1.5,
-        'fun': 0.5,
-    }
-    multiplier = difficulty_multiplier.get(difficulty, 1.0)
+    if np is None:
+        return _score_batch_python(is_correct, time_taken, time_limit, streak, multipliers, scoring)
+
+    correct = np.asarray(is_correct, dtype=bool)
+    ratio = np.maximum(0, 1 - np.asarray(time_taken, dtype=float) / np.asarray(time_limit, dtype=float))
+    if config.speed_curve == 'quadratic':
+        ratio = ratio * ratio
+    elif config.speed_curve == 'sqrt':
+        ratio = np.sqrt(ratio)
+
+    streaks = np.asarray(streak, dtype=np.int64)
+    if config.streak_cap is not None:
+        streaks = np.minimum(streaks, config.streak_cap)
 
-    total = int((base_points + speed_bonus + streak_bonus) * multiplier)
+    base = np.where(correct, config.base_points, 0)
+    speed = np.where(correct, np.trunc(ratio * config.speed_bonus), 0).astype(np.int64)
+    streak_bonus = np.where(correct, streaks * config.streak_bonus, 0)
+    multiplier = np.where(correct, np.asarray(multipliers, dtype=float), 0)
+    total = np.trunc((base + speed + streak_bonus) * multiplier).astype(np.int64)
 
     return {
-        'base': base_points,
-        'speed': speed_bonus,
+        'base': base,
+        'speed': speed,
         'streak': streak_bonus,
         'multiplier': multiplier,
         'total': total
-    }
\ No newline at end of file
+    }
+
+
+def _score_batch_python(is_correct, time_taken, time_limit, streak, multipliers, scoring):
+    """score_batch без numpy: CompiledScoring по столбцам"""
+    result = {key: [] for key in EMPTY_BREAKDOWN}
+    base_out, speed_out, streak_out = result['base'], result['speed'], result['streak']
+    multiplier_out, total_out = result['multiplier'], result['total']
+    base_points, speed_points, streak_points = scoring.base_points, scoring.speed, scoring.streak
+
+    for correct, taken, limit, current_streak, multiplier in zip(is_correct, time_taken, time_limit, streak, multipliers):
+        if not correct:
+            base_out.append(0)
+            speed_out.append(0)
+            streak_out.append(0)
+            multiplier_out.append(0)
+            total_out.append(0)
+            continue
+
+        speed_bonus = speed_points(taken, limit)
+        streak_bonus = streak_points(current_streak)
+        base_out.append(base_points)
+        speed_out.append(speed_bonus)
+        streak_out.append(streak_bonus)
+        multiplier_out.append(multiplier)
+        total_out.append(int((base_points + speed_bonus + streak_bonus) * multiplier))
+
+    return result
@@ -2,8 +2,9 @@
 # ФАЙЛ 1: backend/quiz_app/serializers.py (СОЗДАЙ НОВЫЙ ФАЙЛ)
 # ============================================================================
 
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Quiz, Question, Choice, GameSession, Player, Answer
+from .models import Quiz, Question, Choice, GameSession, Player, Answer, GenerationJob
 
 
 class ChoiceSerializer(serializers.ModelSerializer):
@@ -38,8 +39,13 @@ class QuestionSerializer(serializers.ModelSerializer):
             'choices', 'correct_choice'
         ]
 
+    @staticmethod
+    def eager_load(queryset):
+        """Квиз и варианты ответа одним запросом на всю выборку (без N+1)"""
+        return queryset.select_related('quiz').prefetch_related('choices')
+
     def get_correct_choice(self, obj):
-        """Возвращает ID правильного варианта"""
+        """Возвращает ID правильного варианта (из предзагруженных choices)"""
         correct = obj.get_correct_choice()
         return correct.id if correct else None
 
@@ -60,6 +66,11 @@ class QuestionForPlayerSerializer(serializers.ModelSerializer):
             'image_url', 'time_limit', 'choices'
         ]
 
+    @staticmethod
+    def eager_load(queryset):
+        """Квиз и варианты ответа одним запросом на всю выборку (без N+1)"""
+        return queryset.select_related('quiz').prefetch_related('choices')
+
     def get_time_limit(self, obj):
         """Получаем время (своё или из квиза)"""
         return obj.get_time_limit()  # <-- ИЗМЕНЕНО
@@ -87,17 +98,29 @@ class QuizDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'topic', 'description',
             'image_url', 'question_count', 'time_per_question',
-            'created_at', 'questions'
+            'scoring_profile', 'created_at', 'questions'
         ]
         read_only_fields = ['created_at', 'question_count']
 
+    @staticmethod
+    def eager_load(queryset):
+        """
+        Вопросы и их варианты — два запроса на всю выборку
+
+        Prefetch вопросов проставляет им quiz, поэтому get_time_limit
+        и get_correct_choice работают без запросов.
+        """
+        return queryset.prefetch_related(
+            Prefetch('questions', queryset=Question.objects.prefetch_related('choices'))
+        )
+
 
 class QuizCreateSerializer(serializers.ModelSerializer):
     """Сериализатор для создания квиза (без вопросов)"""
 
     class Meta:
         model = Quiz
-        fields = ['title', 'topic', 'description', 'time_per_question']
+        fields = ['title', 'topic', 'description', 'time_per_question', 'scoring_profile']
 
     def create(self, validated_data):
         """Создаём квиз, вопросы будут добавлены через LLM генерацию"""
@@ -136,16 +159,16 @@ class GameSessionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'code', 'state', 'quiz', 'quiz_title',
             'current_question', 'current_question_data',
+            'scoring_profile', 'scoring_config',
             'created_at', 'players', 'connected_players_count'
         ]
-        read_only_fields = ['code', 'created_at']
+        read_only_fields = ['code', 'created_at', 'scoring_config']
 
     def get_current_question_data(self, obj):
         """Возвращает текущий вопрос если игра идёт"""
         if obj.state in ['running', 'paused']:
-            question = obj.get_current_question()
-            if question:
-                return QuestionForPlayerSerializer(question).data
+            from .question_payloads import question_payload_at
+            return question_payload_at(obj.quiz_id, obj.current_question)
         return None
 
 
@@ -154,7 +177,7 @@ class SessionCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GameSession
-        fields = ['quiz']
+        fields = ['quiz', 'scoring_profile']
 
     def create(self, validated_data):
         """Создаём сессию с автогенерированным кодом"""
@@ -201,4 +224,17 @@ class LeaderboardSerializer(serializers.Serializer):
     score = serializers.IntegerField()
     current_streak = serializers.IntegerField()
     connected = serializers.BooleanField()
-    is_host = serializers.BooleanField()
\ No newline at end of file
+    is_host = serializers.BooleanField()
+
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    """Статус фоновой генерации квиза"""
+    job_id = serializers.UUIDField(source='uuid', read_only=True)
+
+    class Meta:
+        model = GenerationJob
+        fields = [
+            'job_id', 'topic', 'params', 'status', 'stage', 'progress',
+            'questions_ready', 'error', 'metrics', 'quiz', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
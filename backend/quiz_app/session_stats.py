@@ -0,0 +1,138 @@
+# quiz_app/session_stats.py
+
+from typing import Dict, List, Optional, Tuple
+
+from django.utils import timezone
+
+from .models import SessionStats, Answer
+
+# Длина текста вопроса в снимке (как на экране статистики)
+QUESTION_PREVIEW_LENGTH = 50
+
+
+# ============================================================================
+# СЧЁТЧИКИ В ПАМЯТИ
+# ============================================================================
+
+class RunningStats:
+    """
+    Статистика сессии, которая копится по мере поступления ответов
+
+    Каждый ответ обновляет счётчики за O(1): всего/правильных ответов,
+    самый быстрый и самый медленный правильный ответ, правильных/всего
+    по каждому вопросу. При завершении игры snapshot() превращается
+    в строку SessionStats.
+    """
+
+    def __init__(self):
+        self.total_answers = 0
+        self.correct_answers = 0
+        # (время, игрок, текст вопроса)
+        self.fastest: Optional[Tuple[float, str, str]] = None
+        self.slowest: Optional[Tuple[float, str, str]] = None
+        # {question_id: [правильных, всего]}
+        self.question_counts: Dict[int, List[int]] = {}
+        # {question_id: (текст, сложность)}
+        self._questions: Dict[int, Tuple[str, str]] = {}
+
+    def add(self, player_name, question_id, question_text, difficulty, is_correct, time_taken):
+        """Учитывает один принятый ответ"""
+        self.total_answers += 1
+        counts = self.question_counts.get(question_id)
+        if counts is None:
+            counts = self.question_counts[question_id] = [0, 0]
+            self._questions[question_id] = (question_text, difficulty)
+        counts[1] += 1
+
+        if not is_correct:
+            return
+
+        self.correct_answers += 1
+        counts[0] += 1
+        # При равенстве времени остаётся ответ, пришедший первым
+        if self.fastest is None or time_taken < self.fastest[0]:
+            self.fastest = (time_taken, player_name, question_text)
+        if self.slowest is None or time_taken > self.slowest[0]:
+            self.slowest = (time_taken, player_name, question_text)
+
+    def hardest_question(self):
+        """Вопрос с наименьшим числом правильных ответов (среди отвеченных)"""
+        if not self.question_counts:
+            return None
+
+        question_id, (correct, total) = min(self.question_counts.items(), key=lambda item: item[1][0])
+        text, difficulty = self._questions[question_id]
+        return {
+            'question__text': text,
+            'question__difficulty': difficulty,
+            'correct_count': correct,
+            'total_count': total,
+        }
+
+    def snapshot(self, scores, total_questions):
+        """
+        Поля SessionStats
+
+        Args:
+            scores: итоговые очки всех игроков сессии
+            total_questions: количество вопросов квиза
+        """
+        scores = list(scores)
+        return {
+            'total_players': len(scores),
+            'total_questions': total_questions,
+            'total_answers': self.total_answers,
+            'correct_answers': self.correct_answers,
+            'average_score': sum(scores) / len(scores) if scores else 0,
+            'fastest_answer': _answer_data(self.fastest),
+            'slowest_answer': _answer_data(self.slowest),
+            'hardest_question': self.hardest_question(),
+            'question_counts': self.question_counts,
+        }
+
+
+def _answer_data(answer):
+    if answer is None:
+        return None
+    time_taken, player_name, question_text = answer
+    return {
+        'player': player_name,
+        'time': round(time_taken, 2),
+        'question': question_text[:QUESTION_PREVIEW_LENGTH]
+    }
+
+
+# ============================================================================
+# СНИМОК В БД
+# ============================================================================
+
+def freeze(session_id, fields):
+    """Записывает окончательный снимок статистики сессии"""
+    fields = {**fields, 'frozen': True}
+    # Обычно снимка ещё нет: UPDATE вхолостую + INSERT, без транзакции update_or_create
+    if not SessionStats.objects.filter(session_id=session_id).update(updated_at=timezone.now(), **fields):
+        SessionStats.objects.create(session_id=session_id, **fields)
+
+
+def stats_from_db(session):
+    """
+    Поля SessionStats по ответам из БД (2 запроса)
+
+    Для сессий, завершённых без игрового состояния в памяти
+    (досрочно через REST, до появления снимков).
+    """
+    stats = RunningStats()
+    answers = (
+        Answer.objects
+        .filter(player__session=session)
+        .order_by('answered_at', 'id')
+        .values_list(
+            'player__name', 'question_id', 'question__text', 'question__difficulty',
+            'is_correct', 'time_taken'
+        )
+    )
+    for row in answers:
+        stats.add(*row)
+
+    scores = session.players.values_list('score', flat=True)
+    return stats.snapshot(scores, session.quiz.question_count)
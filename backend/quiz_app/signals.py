@@ -0,0 +1,36 @@
+# quiz_app/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Quiz, Question, Choice, CustomAward
+from . import question_payloads, awards
+
+
+def _invalidate_payloads(quiz_id):
+    # После коммита: иначе параллельный запрос успеет закешировать старые данные
+    transaction.on_commit(lambda: question_payloads.invalidate(quiz_id))
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def quiz_changed(sender, instance, **kwargs):
+    """time_per_question квиза входит в time_limit вопросов"""
+    _invalidate_payloads(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    _invalidate_payloads(instance.quiz_id)
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    quiz_id = Question.objects.filter(id=instance.question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        _invalidate_payloads(quiz_id)
+
+
+@receiver([post_save, post_delete], sender=CustomAward)
+def custom_award_changed(sender, instance, **kwargs):
+    transaction.on_commit(awards.invalidate_custom_rules)
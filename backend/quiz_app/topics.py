@@ -0,0 +1,170 @@
+# quiz_app/topics.py
+
+import math
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, List
+
+# ============================================================================
+# НОРМАЛИЗАЦИЯ ТЕМ
+# ============================================================================
+
+# Слова, не влияющие на смысл темы
+STOPWORDS = {
+    'и', 'в', 'во', 'на', 'о', 'об', 'про', 'по', 'из', 'с', 'со', 'для', 'от', 'до',
+    'квиз', 'викторина', 'вопросы', 'тема',
+    'the', 'a', 'an', 'of', 'and', 'about', 'quiz',
+}
+
+# Синонимы, которые не сводятся друг к другу стеммингом
+SYNONYMS = {
+    'кино': 'фильм',
+    'кинофильм': 'фильм',
+    'кинофильмы': 'фильм',
+    'ссср': 'советский',
+    'рф': 'россия',
+    'музыка': 'музыкальный',
+    'песни': 'песня',
+    'зверь': 'животное',
+    'звери': 'животное',
+}
+
+# Окончания для лёгкого стемминга (длинные проверяются первыми)
+_ENDINGS = sorted([
+    'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ости', 'ость',
+    'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ий', 'ый', 'ой', 'ую', 'юю',
+    'ах', 'ях', 'ов', 'ев', 'ей', 'ом', 'ем', 'ам', 'ям', 'ых', 'их',
+    'ы', 'и', 'а', 'я', 'о', 'е', 'у', 'ю', 'ь', 'й',
+], key=len, reverse=True)
+
+_WORD_RE = re.compile(r'[a-zа-я0-9]+')
+
+# Римские числа (века, части, номера): 'xx', 'xix', 'ii'
+_ROMAN_RE = re.compile(r'm{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})')
+
+# Размер символьных n-грамм для векторов тем
+NGRAM_SIZE = 3
+
+# Минимальное сходство слова темы с самым похожим словом другой темы:
+# "История Европы" и "История Азии" различаются целым словом
+WORD_SIMILARITY = 0.6
+
+
+def stem(word):
+    """Отрезает окончание (основа не короче 3 символов)"""
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[:-len(ending)]
+    return word
+
+
+def is_number(token):
+    """Число или римское число ('80', '2010', 'xix')"""
+    return token.isdigit() or bool(_ROMAN_RE.fullmatch(token) and token)
+
+
+def topic_tokens(topic) -> List[str]:
+    """
+    Основы значимых слов темы (отсортированы, без повторов)
+
+    Пример:
+        "Советские фильмы", "советское кино", "Фильмы СССР" → ['советск', 'фильм']
+    """
+    text = topic.lower().replace('ё', 'е')
+    tokens = set()
+    for word in _WORD_RE.findall(text):
+        if word in STOPWORDS or (len(word) < 2 and not is_number(word)):
+            continue
+        tokens.add(stem(SYNONYMS.get(word, word)))
+    return sorted(tokens)
+
+
+def normalize_topic(topic):
+    """Нормализованная тема: основы слов через пробел"""
+    return ' '.join(topic_tokens(topic))
+
+
+# ============================================================================
+# ВЕКТОРЫ И СХОДСТВО
+# ============================================================================
+
+def topic_vector(normalized) -> Dict[str, int]:
+    """
+    Вектор символьных n-грамм нормализованной темы
+
+    Каждое слово обрамляется '#', чтобы n-граммы на границах слов
+    отличались от n-грамм внутри слова.
+    """
+    grams = Counter()
+    for token in normalized.split():
+        grams.update(_token_grams(token))
+    return grams
+
+
+def _token_grams(token):
+    padded = f'#{token}#'
+    if len(padded) <= NGRAM_SIZE:
+        return [padded]
+    return [padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)]
+
+
+def cosine(a, b):
+    """Косинусное сходство двух разреженных векторов"""
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(count * b.get(gram, 0) for gram, count in a.items())
+    if not dot:
+        return 0.0
+    norm_a = math.sqrt(sum(c * c for c in a.values()))
+    norm_b = math.sqrt(sum(c * c for c in b.values()))
+    return dot / (norm_a * norm_b)
+
+
+class TopicMatcher:
+    """
+    Сходство заданной темы с другими нормализованными темами
+
+    Косинус n-грамм сам по себе не различает темы, отличающиеся одним
+    числом или словом ("Музыка 80-х" и "Музыка 90-х" — 0.82), поэтому
+    сначала проверяется, что:
+    - числа и римские числа тем совпадают в точности ('80', '2010', 'xix');
+    - у каждого слова темы с меньшим числом слов есть похожее
+      (WORD_SIMILARITY) слово в другой теме.
+    Иначе сходство 0.
+    """
+
+    def __init__(self, normalized):
+        self.vector = topic_vector(normalized)
+        self.numbers = _numbers(normalized)
+        self.words = _word_vectors(normalized)
+
+    def __bool__(self):
+        return bool(self.vector)
+
+    def similarity(self, normalized):
+        """Сходство с нормализованной темой (0..1)"""
+        if _numbers(normalized) != self.numbers:
+            return 0.0
+
+        words = _word_vectors(normalized)
+        fewer, more = (words, self.words) if len(words) < len(self.words) else (self.words, words)
+        for word in fewer:
+            if not any(cosine(word, other) >= WORD_SIMILARITY for other in more):
+                return 0.0
+
+        return cosine(self.vector, topic_vector(normalized))
+
+
+def _numbers(normalized) -> FrozenSet[str]:
+    return frozenset(token for token in normalized.split() if is_number(token))
+
+
+def _word_vectors(normalized) -> List[Dict[str, int]]:
+    return [Counter(_token_grams(token)) for token in normalized.split() if not is_number(token)]
+
+
+def topic_similarity(topic_a, topic_b):
+    """Сходство двух тем (0..1)"""
+    return TopicMatcher(normalize_topic(topic_a)).similarity(normalize_topic(topic_b))
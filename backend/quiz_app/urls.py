@@ -12,6 +12,7 @@ router.register(r'quizzes', views.QuizViewSet, basename='quiz')
 router.register(r'sessions', views.GameSessionViewSet, basename='session')
 router.register(r'players', views.PlayerViewSet, basename='player')
 router.register(r'answers', views.AnswerViewSet, basename='answer')
+router.register(r'generation-jobs', views.GenerationJobViewSet, basename='generation-job')
 
 urlpatterns = [
     path('', include(router.urls)),
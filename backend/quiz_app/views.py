@@ -6,16 +6,19 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 
-from .models import Quiz, Question, Choice, GameSession, Player, Answer
+from .models import Quiz, Question, Choice, GameSession, Player, Answer, GenerationJob, SessionStats
+from .leaderboard import RankedLeaderboard
+from .question_payloads import question_payload_at
 from .serializers import (
     QuizListSerializer, QuizDetailSerializer, QuizCreateSerializer,
-    QuestionSerializer, QuestionForPlayerSerializer,
+    QuestionSerializer,
     GameSessionSerializer, SessionCreateSerializer,
     PlayerSerializer, AnswerSerializer, AnswerSubmitSerializer,
-    LeaderboardSerializer
+    LeaderboardSerializer, GenerationJobSerializer
 )
 
 
@@ -41,6 +44,13 @@ class QuizViewSet(viewsets.ModelViewSet):
             return QuizCreateSerializer
         return QuizDetailSerializer
 
+    def get_queryset(self):
+        """Для детальной информации — вопросы с вариантами без N+1"""
+        queryset = super().get_queryset()
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            queryset = QuizDetailSerializer.eager_load(queryset)
+        return queryset
+
     def create(self, request, *args, **kwargs):
         """
         Создание квиза
@@ -64,7 +74,7 @@ class QuizViewSet(viewsets.ModelViewSet):
         Получить все вопросы квиза (для админа)
         """
         quiz = self.get_object()
-        questions = quiz.questions.all().order_by('order')
+        questions = QuestionSerializer.eager_load(quiz.questions.all().order_by('order'))
         serializer = QuestionSerializer(questions, many=True)
         return Response(serializer.data)
 
@@ -90,7 +100,7 @@ class QuizViewSet(viewsets.ModelViewSet):
     def generate(self, request):
         '''
         POST /api/quizzes/generate/
-        Генерация квиза с вопросами через LLM
+        Генерация квиза с вопросами через LLM (фоновая задача)
 
         Body:
         {
@@ -100,8 +110,12 @@ class QuizViewSet(viewsets.ModelViewSet):
             "time_per_question": 20,
             "player_count": 4
         }
+
+        Ответ 202: {"job_id": "...", "status": "queued", ...}
+        Статус: GET /api/generation-jobs/{job_id}/
+        или WebSocket ws/generation/{job_id}/ (событие generation_status)
         '''
-        from .generation import generate_and_save_quiz
+        from .jobs import submit_generation
 
         # ИЗМЕНЕНО: принимаем prompt или topic
         topic = request.data.get('prompt') or request.data.get('topic')
@@ -119,33 +133,112 @@ class QuizViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Генерация идёт в пуле потоков, запрос сразу возвращает задачу
+        job = submit_generation(
+            topic=topic,
+            count=count,
+            description=description,
+            time_per_question=time_per_question,
+            player_count=player_count
+        )
+
+        serializer = GenerationJobSerializer(job)
+        return Response(
+            serializer.data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_pack(self, request):
+        '''
+        POST /api/quizzes/import/
+        Импорт квиза из JSON-пака вопросов (формат — packs.import_pack)
+        или файла пака (multipart, поле file; формат — packs.read_pack)
+
+        Ответ 201: квиз с вопросами (как GET /api/quizzes/{id}/),
+        для файла — {"quizzes": [{"id", "title", "question_count"}, ...]}
+        Ответ 400: {"error": "...", "details": [...]}
+        '''
+        from .packs import import_pack, import_pack_file, PackError
+
         try:
-            # Генерируем квиз
-            quiz = generate_and_save_quiz(
-                topic=topic,
-                count=count,
-                description=description,
-                time_per_question=time_per_question,
-                player_count=player_count
+            if 'file' in request.FILES:
+                quizzes = import_pack_file(request.FILES['file'])
+            else:
+                quiz = import_pack(request.data)
+        except PackError as e:
+            return Response(
+                {'error': str(e), 'details': e.details},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-            # Возвращаем созданный квиз
-            serializer = QuizDetailSerializer(quiz)
+        if 'file' in request.FILES:
             return Response(
-                serializer.data,
+                {'quizzes': QuizListSerializer(quizzes, many=True).data},
                 status=status.HTTP_201_CREATED
             )
 
-        except ValueError as e:
-            return Response(
-                {'error': str(e)},  # ИЗМЕНЕНО: detail → error
-                status=status.HTTP_400_BAD_REQUEST  # ИЗМЕНЕНО: 500 → 400
-            )
-        except Exception as e:
-            return Response(
-                {'error': f'Ошибка генерации: {str(e)}'},  # ИЗМЕНЕНО: detail → error
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        quiz = QuizDetailSerializer.eager_load(Quiz.objects.filter(id=quiz.id)).get()
+        serializer = QuizDetailSerializer(quiz)
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_packs(self, request):
+        '''
+        GET /api/quizzes/export/?ids=1,2,3
+        Экспорт квизов в пак (gzip JSON Lines, отдаётся потоком);
+        без ids — все квизы
+        '''
+        quizzes = Quiz.objects.all()
+
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                quizzes = quizzes.filter(id__in=[int(i) for i in ids.split(',')])
+            except ValueError:
+                return Response(
+                    {'error': 'ids — список чисел через запятую'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        return self._pack_response(quizzes, 'quizzes')
+
+    @action(detail=True, methods=['get'], url_path='export')
+    def export_pack(self, request, pk=None):
+        '''
+        GET /api/quizzes/{id}/export/
+        Экспорт одного квиза в пак (gzip JSON Lines)
+        '''
+        quiz = self.get_object()
+        return self._pack_response(Quiz.objects.filter(id=quiz.id), f'quiz-{quiz.id}')
+
+    def _pack_response(self, quizzes, name):
+        """Потоковый ответ с паком квизов"""
+        from .packs import iter_pack_lines, gzip_stream
+
+        response = StreamingHttpResponse(
+            gzip_stream(iter_pack_lines(quizzes)),
+            content_type='application/gzip'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{name}.jsonl.gz"'
+        return response
+
+
+class GenerationJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet для статуса фоновой генерации
+
+    Endpoints:
+    - GET /api/generation-jobs/ - последние задачи
+    - GET /api/generation-jobs/{job_id}/ - статус и прогресс задачи
+    """
+    queryset = GenerationJob.objects.all()
+    serializer_class = GenerationJobSerializer
+    permission_classes = [AllowAny]
+    lookup_field = 'uuid'
 
 
 class GameSessionViewSet(viewsets.ModelViewSet):
@@ -203,15 +296,14 @@ class GameSessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        question = session.get_current_question()
-        if not question:
+        question_data = question_payload_at(session.quiz_id, session.current_question)
+        if not question_data:
             return Response(
                 {'detail': 'Вопросов больше нет'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        serializer = QuestionForPlayerSerializer(question)
-        return Response(serializer.data)
+        return Response(question_data)
 
     @action(detail=True, methods=['get'])
     def leaderboard(self, request, code=None):
@@ -220,24 +312,27 @@ class GameSessionViewSet(viewsets.ModelViewSet):
         Получить таблицу лидеров
         """
         session = self.get_object()
-        players = session.players.all().order_by('-score', 'joined_at')
-
-        leaderboard_data = [
-            {
-                'position': idx + 1,
-                'player_id': player.id,
-                'name': player.name,
-                'score': player.score,
-                'current_streak': player.current_streak,
-                'connected': player.connected,
-                'is_host': player.is_host,
-            }
-            for idx, player in enumerate(players)
-        ]
+        leaderboard_data = RankedLeaderboard.from_players(session.players.all()).top()
 
         serializer = LeaderboardSerializer(leaderboard_data, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def statistics(self, request, code=None):
+        """
+        GET /api/sessions/{code}/statistics/
+        Статистика сессии (для завершённой игры — снимок SessionStats)
+        """
+        from .awards import get_session_statistics
+
+        # Завершённая игра — одна строка снимка
+        snapshot = SessionStats.objects.filter(session__code=code, frozen=True).first()
+        if snapshot is not None:
+            return Response(snapshot.as_dict())
+
+        session = get_object_or_404(GameSession.objects.select_related('quiz'), code=code)
+        return Response(get_session_statistics(session))
+
     @action(detail=True, methods=['get'])
     def disconnected_players(self, request, code=None):
         """
@@ -259,27 +354,29 @@ class GameSessionViewSet(viewsets.ModelViewSet):
         from channels.layers import get_channel_layer
         from asgiref.sync import async_to_sync
 
+        from .game_state import get_game_state
+        from .scheduler import get_scheduler, find_scheduler
+        from .frames import frame
+
         session = self.get_object()
 
+        # Игра идёт в этом процессе — завершает планировщик комнаты:
+        # дописывает ответы, считает награды, замораживает статистику,
+        # выгружает состояние из памяти и рассылает game_over
+        if get_game_state(session.code) is not None or find_scheduler(session.code) is not None:
+            async_to_sync(get_scheduler(session.code).stop)()
+            return Response({
+                'status': 'finished',
+                'code': session.code,
+                'message': 'Сессия завершена'
+            })
+
         # Меняем состояние на finished
         session.state = 'finished'
         session.finished_at = timezone.now()
         session.save()
 
-        # Получаем финальную таблицу лидеров
-        players = session.players.all().order_by('-score', 'joined_at')
-        leaderboard = [
-            {
-                'position': idx + 1,
-                'player_id': player.id,
-                'name': player.name,
-                'score': player.score,
-                'current_streak': player.current_streak,
-                'connected': player.connected,
-                'is_host': player.is_host,
-            }
-            for idx, player in enumerate(players)
-        ]
+        leaderboard = RankedLeaderboard.from_players(session.players.all()).top()
 
         # Broadcast game_over всем подключенным
         try:
@@ -287,11 +384,11 @@ class GameSessionViewSet(viewsets.ModelViewSet):
             room_group_name = f'game_{session.code}'
             async_to_sync(channel_layer.group_send)(
                 room_group_name,
-                {
+                frame({
                     'type': 'game_over',
                     'leaderboard': leaderboard,
                     'awards': {}
-                }
+                })
             )
         except Exception as e:
             print(f"Warning: Could not send WebSocket notification: {e}")
@@ -400,9 +497,15 @@ class PlayerViewSet(viewsets.ModelViewSet):
         """
         POST /api/players/{id}/heartbeat/
         Обновление last_seen (heartbeat)
+
+        last_seen хранится в памяти (presence.tracker), в БД пишется
+        только возвращение игрока после таймаута
         """
+        from .presence import tracker, persist_connected
+
         player = self.get_object()
-        player.update_last_seen()
+        if tracker.touch(player.id, player.session.code):
+            persist_connected(player.id)
 
         return Response({'status': 'ok'})
 
@@ -2,6 +2,7 @@
 Django settings for quiz_project project.
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -78,6 +79,18 @@ CHANNEL_LAYERS = {
     },
 }
 
+# QUIZ_CHANNEL_LAYER=memory — слой каналов в памяти процесса (без Redis):
+# для разработки и нагрузочных тестов одного процесса (diag/load_test.py).
+# Слой привязан к event loop ASGI: события из других потоков (прогресс
+# фоновой генерации, quiz_app/jobs.py) могут не дойти — для них нужен
+# Redis, без него клиент узнаёт статус задачи только опросом REST
+if os.environ.get('QUIZ_CHANNEL_LAYER') == 'memory':
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
+
 # Database
 DATABASES = {
     'default': {
@@ -169,10 +182,81 @@ except:
     OPENAI_API_BASE = "http://localhost:8080/v1"
     OPENAI_MODEL = "Llama-3-8B-Instruct-q4f16_1-MLC"
 
-# Кеширование
+# Кеширование: общий для всех процессов (тот же Redis, что и слой каналов).
+# Payload'ы вопросов и правила наград из админки сбрасываются сигналами
+# в процессе, где прошла правка, — процесс с комнатой должен это увидеть
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    }
+}
+
+# QUIZ_CHANNEL_LAYER=memory — один процесс: кеш тоже в памяти
+if os.environ.get('QUIZ_CHANNEL_LAYER') == 'memory':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
     }
-}
\ No newline at end of file
+# ============================================================================
+# Игровой движок
+# ============================================================================
+
+# Сериализация broadcast-событий через orjson (если установлен: pip install orjson)
+QUIZ_FAST_JSON = False
+
+# Комнаты больше этого размера получают в question_result только топ
+# таблицы лидеров и изменения позиций (leaderboard_changes)
+QUIZ_LEADERBOARD_FULL_LIMIT = 50
+QUIZ_LEADERBOARD_TOP = 10
+
+# Окно склейки обновлений answer_stats (сек)
+QUIZ_STATS_WINDOW = 0.25
+
+# Игрок без ping дольше таймаута считается отключённым (сек);
+# last_seen хранится в памяти, в БД пишутся только переходы
+QUIZ_HEARTBEAT_TIMEOUT = 15
+QUIZ_PRESENCE_SWEEP_INTERVAL = 5
+
+# Фоновая генерация квизов: потоков в пуле и одновременных запросов к LLM
+QUIZ_GENERATION_WORKERS = 2
+QUIZ_LLM_CONCURRENCY = 2
+
+# Потоковая генерация: вопросы сохраняются по мере ответа LLM, игру можно
+# начать до окончания генерации (планировщик догружает новые вопросы)
+QUIZ_STREAM_GENERATION = True
+QUIZ_GENERATION_POLL_INTERVAL = 1
+
+# Вопросов в одном запросе к LLM: части квиза генерируются параллельно
+# (в пределах QUIZ_LLM_CONCURRENCY), повторно — только пустые слоты
+QUIZ_GENERATION_CHUNK_SIZE = 5
+
+# Кеш генерации вопросов (в БД, общий для всех процессов): время жизни
+# записи и границы, при превышении которых вытесняются давно не использованные
+QUIZ_GENERATION_CACHE_TTL = 60 * 60 * 24 * 7
+QUIZ_GENERATION_CACHE_MAX_ENTRIES = 1000
+QUIZ_GENERATION_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Минимальное сходство тем (0..1), при котором квиз собирается из кеша
+# генерации по похожей теме ("советское кино" ~ "Фильмы СССР")
+QUIZ_TOPIC_SIMILARITY = 0.8
+
+# Минимальное сходство темы вопроса из банка с темой нового квиза (0..1);
+# недостающие в банке позиции догенерируются
+QUIZ_BANK_TOPIC_SIMILARITY = 0.7
+
+# Вопросов в одном bulk INSERT при импорте паков квизов (и в одной выборке при экспорте)
+QUIZ_PACK_BATCH_SIZE = 500
+
+# Сколько хранить в кеше готовые payload'ы вопросов квиза (сек);
+# правки квиза, вопросов и вариантов сбрасывают их сразу
+QUIZ_QUESTION_PAYLOAD_TTL = 60 * 60
+
+# Сколько хранить в кеше награды завершённой сессии (сек)
+QUIZ_AWARDS_CACHE_TTL = 60 * 60 * 24
+
+# Сколько хранить в кеше правила наград из админки (сек);
+# правки CustomAward сбрасывают их сразу
+QUIZ_CUSTOM_AWARDS_CACHE_TTL = 60 * 60
@@ -18,6 +18,7 @@ const AdminPanel = ({ onBack }) => {
   const [generatePrompt, setGeneratePrompt] = useState('');
   const [numQuestions, setNumQuestions] = useState(10);
   const [isGenerating, setIsGenerating] = useState(false);
+  const [generationProgress, setGenerationProgress] = useState(0);
   const [apiError, setApiError] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
 
@@ -91,6 +92,42 @@ const AdminPanel = ({ onBack }) => {
     }
   };
 
+  // Ждём окончания фоновой генерации: прогресс приходит по WebSocket,
+  // а статус параллельно опрашивается через REST — события из потока
+  // генерации могут не дойти (слой каналов в памяти без Redis)
+  const waitForGenerationJob = (jobId) => new Promise((resolve, reject) => {
+    let settled = false;
+    const ws = new WebSocket(`${API_CONFIG.WS_BASE_URL}/generation/${jobId}/`);
+
+    const handleStatus = (job) => {
+      if (settled) return;
+      setGenerationProgress(job.progress);
+      if (job.status !== 'done' && job.status !== 'failed') return;
+
+      settled = true;
+      clearInterval(pollTimer);
+      ws.close();
+      if (job.status === 'done') {
+        resolve(job);
+      } else {
+        reject(new Error(job.error || 'Ошибка генерации'));
+      }
+    };
+
+    const pollTimer = setInterval(async () => {
+      try {
+        const response = await fetch(`${API_CONFIG.API_BASE_URL}/generation-jobs/${jobId}/`);
+        if (response.ok) {
+          handleStatus(await response.json());
+        }
+      } catch (error) {
+        console.error('❌ Ошибка получения статуса генерации:', error);
+      }
+    }, 3000);
+
+    ws.onmessage = (event) => handleStatus(JSON.parse(event.data));
+  });
+
   const handleGenerateQuiz = async () => {
     if (!generatePrompt.trim()) {
       alert('Введите описание для генерации квиза');
@@ -98,6 +135,7 @@ const AdminPanel = ({ onBack }) => {
     }
 
     setIsGenerating(true);
+    setGenerationProgress(0);
     try {
       console.log('🎨 Генерация квиза:', generatePrompt);
       const response = await fetch(`${API_CONFIG.API_BASE_URL}/quizzes/generate/`, {
@@ -116,7 +154,10 @@ const AdminPanel = ({ onBack }) => {
         throw new Error(errorData.error || 'Ошибка генерации');
       }
 
-      const data = await response.json();
+      const job = await response.json();
+      console.log('⏳ Задача генерации:', job.job_id);
+
+      const data = await waitForGenerationJob(job.job_id);
       console.log('✅ Квиз сгенерирован:', data);
 
       setGeneratePrompt('');
@@ -352,7 +393,7 @@ const AdminPanel = ({ onBack }) => {
 
           {isGenerating && (
             <div className="mt-4 text-center text-gray-600">
-              <div className="animate-pulse">🤖 AI работает над вашим квизом...</div>
+              <div className="animate-pulse">🤖 AI работает над вашим квизом... {generationProgress}%</div>
             </div>
           )}
         </div>
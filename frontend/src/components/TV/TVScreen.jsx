@@ -79,16 +79,20 @@ function TVScreen({ onBackToWelcome }) {
 
     websocket.on('question', (data) => {
       console.log('❓ TV: Question:', data)
-      setGameState(prev => ({ ...prev, currentQuestion: data.question }))
+      setGameState(prev => ({ ...prev, currentQuestion: data.question, answerDistribution: {} }))
       setCurrentView('question')
     })
 
     websocket.on('answer_stats', (data) => {
       console.log('📊 TV: Answer stats:', data)
+      // Сервер присылает только изменившиеся поля
       setGameState(prev => ({
         ...prev,
-        answeredCount: data.answered,
-        correctCount: data.correct
+        ...(data.answered !== undefined && { answeredCount: data.answered }),
+        ...(data.correct !== undefined && { correctCount: data.correct }),
+        ...(data.distribution !== undefined && {
+          answerDistribution: { ...prev.answerDistribution, ...data.distribution }
+        })
       }))
     })
 